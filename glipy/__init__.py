@@ -1,24 +1,47 @@
 """Provides convenience functions for building Automatons from various I/O formats."""
 
-import random
 import re
 from collections import namedtuple
-
-import requests
+from itertools import groupby
 
 from .automaton import Automaton
-from .cell import Cell, MooreCell
+from .cell import Cell, MooreCell, moore_cell, neighborhood_shape, neumann_cell
 from .coordinate import Coordinate
-from .state import ConwayState
+from .rule import LIFE_STATE_COUNT, Rule, format_rule, parse_rule
+from .soup import soups
+from .state import (
+    CellState,
+    ConwayState,
+    GenerationsState,
+    IsotropicState,
+    LargerThanLifeState,
+)
 
 HTTP_OK = 200
 
 # Stores header data from  properly formatted RLE I/O
 RLEHeader = namedtuple(
     "RLEHeader",
-    ["width", "height", "birth_rules", "survival_rules"],
+    [
+        "width",
+        "height",
+        "birth_rules",
+        "survival_rules",
+        "state_count",
+        "radius",
+        "middle",
+        "neighborhood",
+        "isotropic",
+    ],
+    defaults=[None, None, False, None, False],
 )
 
+# The number of states a single letter (A-X) can encode in multi-state RLE I/O
+RLE_LETTER_STATES = 24
+
+# The longest line written to RLE I/O, as recommended by the format
+RLE_LINE_LENGTH = 70
+
 # Stores data needed to build a life pattern
 PatternData = namedtuple("PatternData", ["states", "xmax", "ymax"])
 
@@ -68,12 +91,88 @@ def from_conway_life(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
     return automaton
 
 
+def parse_rle_header(line: str) -> RLEHeader:
+    """Parse the header line of RLE I/O.
+
+    Args:
+        line (str): The header line from the RLE data
+
+    Raises:
+        ValueError: A malformatted RLE stream was detected
+
+    Returns:
+        RLEHeader
+
+    """
+    data = re.search(r"(x = \d+).*(y = \d+)", line)
+    if data is None:
+        msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
+        raise ValueError(
+            msg,
+        )
+
+    width_match = re.search(r"\d+", data[1])
+    height_match = re.search(r"\d+", data[2])
+    if width_match is None or height_match is None:
+        msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
+        raise ValueError(
+            msg,
+        )
+    width = int(width_match.group(0))
+    height = int(height_match.group(0))
+
+    rules = re.search(r"rule\s*=\s*([^:\s]+)", line)
+    if rules is None:
+        return RLEHeader(width, height, None, None)
+
+    try:
+        rule = parse_rule(rules[1])
+    except ValueError:
+        msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
+        raise ValueError(
+            msg,
+        ) from None
+
+    return RLEHeader(width, height, *rule)
+
+
+def set_rle_rules(header: RLEHeader) -> None:
+    """Set the birth and survival rules (if detected in the header data).
+
+    Args:
+        header (RLEHeader): The header data
+
+    """
+    if header.isotropic:
+        IsotropicState.birth_rules = header.birth_rules
+        IsotropicState.survival_rules = header.survival_rules
+        return
+    if header.radius is not None:
+        LargerThanLifeState.set_rule(
+            header.birth_rules,
+            header.survival_rules,
+            header.state_count or 2,
+        )
+        LargerThanLifeState.middle = header.middle
+        return
+    if header.state_count is not None:
+        GenerationsState.set_rule(
+            header.birth_rules,
+            header.survival_rules,
+            header.state_count,
+        )
+        return
+    ConwayState.birth_rules = header.birth_rules or ConwayState.birth_rules
+    ConwayState.survival_rules = header.survival_rules or ConwayState.survival_rules
+
+
 def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
     """Read lines of a file compliant with Run Length Encoded (RLE).
 
     Args:
         data (str): The RLE data
-        cell_type (type[Cell]): The cell type to use for this automaton.
+        cell_type (type[Cell]): The cell type to use for this automaton. Ignored for Larger than
+        Life rules, which define their own neighborhood.
 
     Raises:
         ValueError: A malformatted RLE stream was detected.
@@ -83,109 +182,69 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
 
     """
 
-    def parse_header(line: str) -> RLEHeader:
-        """Parse header data.
+    def make_state(value: int) -> CellState:
+        """Build the state for a value read from the RLE data (0 is dead, 1 is alive).
 
         Args:
-            line (str): The header line from the RLE data
-
-        Raises:
-            ValueError: A malformatted RLE stream was detected
+            value (int): The value of the state
 
         Returns:
-            RLEHeader
-
-        """
-        data = re.search(r"(x = \d+).*(y = \d+)", line)
-        if data is None:
-            msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
-            raise ValueError(
-                msg,
-            )
-
-        width_match = re.search(r"\d+", data[1])
-        height_match = re.search(r"\d+", data[2])
-        if width_match is None or height_match is None:
-            msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
-            raise ValueError(
-                msg,
-            )
-        width = int(width_match.group(0))
-        height = int(height_match.group(0))
-
-        rules = re.search(r"rule = .*", line)
-        if rules is None:
-            birth_rules = None
-            survival_rules = None
-        else:
-            birth_match = re.search(r"[bB]\d+", line)
-            survival_match = re.search(r"[sS]\d+", line)
-            if birth_match is None or survival_match is None:
-                msg = "I/O has malformatted header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
-                raise ValueError(
-                    msg,
-                )
-
-            birth_rules = [int(n) for n in birth_match.group(0)[1:]]
-            survival_rules = [int(n) for n in survival_match.group(0)[1:]]
-
-        return RLEHeader(width, height, birth_rules, survival_rules)
-
-    def set_birth_rules(header: RLEHeader) -> None:
-        """Set the birth and survival rules (if detected in the header data).
-
-        Args:
-            header (RLEHeader): The header data
+            An IsotropicState, LargerThanLifeState or GenerationsState if the header has one of
+            their rules, else a ConwayState
 
         """
-        ConwayState.birth_rules = header.birth_rules or ConwayState.birth_rules
-        ConwayState.survival_rules = header.survival_rules or ConwayState.survival_rules
+        if header.isotropic:
+            return IsotropicState(alive=value != 0)
+        if header.radius is not None:
+            return LargerThanLifeState(value)
+        if header.state_count is not None:
+            return GenerationsState(value)
+        return ConwayState(alive=value != 0)
 
-    def fill_row(row: list[ConwayState], xmax: int) -> list[ConwayState]:
-        """Fill in missing values for a row with dead ConwayState cells.
+    def fill_row(row: list[CellState], xmax: int) -> list[CellState]:
+        """Fill in missing values for a row with dead cells.
 
         Args:
-            row (List[ConwayState]): The row to fill in
+            row (List[CellState]): The row to fill in
             xmax (int): The intended length of the row
 
         Returns:
             The filled row
 
         """
-        row.extend(ConwayState(alive=False) for _ in range(xmax - len(row) + 1))
+        row.extend(make_state(0) for _ in range(xmax - len(row) + 1))
 
         return row
 
     def fill_rows(
-        states: list[list[ConwayState]],
+        states: list[list[CellState]],
         xmax: int,
         ymax: int,
-    ) -> list[list[ConwayState]]:
-        """Fill in the necessary remaining rows with dead ConwayState cells.
+    ) -> list[list[CellState]]:
+        """Fill in the necessary remaining rows with dead cells.
 
         Args:
-            states (List[List[ConwayState]]): The data to fill
+            states (List[List[CellState]]): The data to fill
             xmax (int): The intended length of a row
             ymax (int): The intended length of the data
 
         """
         states.extend(
-            [
-                [ConwayState(alive=False) for _ in range(xmax + 1)]
-                for _ in range(ymax - len(states) + 1)
-            ],
+            [[make_state(0) for _ in range(xmax + 1)] for _ in range(ymax - len(states) + 1)],
         )
 
         return states
 
-    def parse_states(xmax: int, ymax: int, data: str) -> list[list[ConwayState]]:
+    def parse_states(xmax: int, ymax: int, data: str) -> list[list[CellState]]:
         """Parse state data based on RLE I/O stream content.
 
         TODO: This is perfectly functional, but quite messy. We need to come back and do some
         cleanup
 
         This function searches for characters and spawns cells based on various criteria defined in
-        the RLE standard.
+        the RLE standard. Two state data uses "b" (dead) and "o" (alive). Multi-state data uses
+        "." (dead) and "A" through "X" for states 1-24, with a prefix of "p" through "y" for
+        higher states.
 
         - If a row is not filled before reaching a "$" (new row) delimiter, fill it with dead cells
         - If multiple "$" (new row) characters are detected, fill the previous one with dead cells
@@ -199,35 +258,41 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
             data (str): Concatenated cell data from the rle file
 
         Returns:
-            A list of conway states resembling a 2d matrix
+            A list of cell states resembling a 2d matrix
 
         """
         nums: list[str] = []
-        states: list[list[ConwayState]] = [[]]
+        prefix = 0
+        states: list[list[CellState]] = [[]]
         y = 0
         for c in data:
             if c == "!":
-                if len(states[y]) < xmax:
+                if len(states[y]) <= xmax:
                     states[y] = fill_row(states[y], xmax)
-                if len(states) < ymax:
+                if len(states) <= ymax:
                     states = fill_rows(states, xmax, ymax)
                 return states
 
-            if c in {"o", "b", "$"}:
+            if "p" <= c <= "y":
+                prefix = ord(c) - ord("p") + 1
+
+            elif c in {"o", "b", ".", "$"} or "A" <= c <= "X":
                 n = 1 if len(nums) == 0 else int("".join(nums))
-                if c in {"o", "b"}:
-                    for _ in range(n):
-                        if c == "o":
-                            states[y].append(ConwayState(alive=True))
-                        else:
-                            states[y].append(ConwayState(alive=False))
+                if c != "$":
+                    if c in {"b", "."}:
+                        value = 0
+                    elif c == "o":
+                        value = 1
+                    else:
+                        value = prefix * RLE_LETTER_STATES + ord(c) - ord("A") + 1
+                    states[y].extend(make_state(value) for _ in range(n))
                 else:
                     if len(states[y]) <= xmax:
                         states[y] = fill_row(states[y], xmax)
 
                     for _ in range(n - 1):
                         states.append(
-                            [ConwayState(alive=False) for _ in range(xmax + 1)],
+                            [make_state(0) for _ in range(xmax + 1)],
                         )
                         y += 1
 
@@ -235,6 +300,7 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
                     y += 1
 
                 nums = []
+                prefix = 0
 
             elif c.isdigit():
                 nums.append(c)
@@ -246,7 +312,7 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
         if line.strip().startswith("#"):
             continue
         if "=" in line:
-            header = parse_header(line)
+            header = parse_rle_header(line)
             break
     else:
         msg = "I/O missing header line (see https://conwaylife.com/wiki/Run_Length_Encoded)"
@@ -254,7 +320,9 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
             msg,
         )
 
-    set_birth_rules(header)
+    set_rle_rules(header)
+    if header.radius is not None:
+        cell_type = (moore_cell if header.neighborhood == "M" else neumann_cell)(header.radius)
     data = "".join(line.strip() for line in lines[_row + 1 :])
     states = parse_states(header.width - 1, header.height - 1, data)
 
@@ -268,8 +336,127 @@ def from_conway_rle(data: str, cell_type: type[Cell] = MooreCell) -> Automaton:
     return automaton
 
 
+def get_rle_rule(state_type: type[CellState], cell_type: type[Cell]) -> Rule | None:
+    """Get the rule a state type is currently following (the reverse of 'set_rle_rules').
+
+    Args:
+        state_type (Type[CellState]): The state type
+        cell_type (Type[Cell]): The cell type, which gives the neighborhood of Larger than Life
+        rules
+
+    Returns:
+        Rule, or None if the state type's rule can't be written as a rulestring
+
+    """
+    if issubclass(state_type, IsotropicState):
+        return Rule(state_type.birth_rules, state_type.survival_rules, None, isotropic=True)
+    if issubclass(state_type, LargerThanLifeState):
+        shape = neighborhood_shape(getattr(cell_type, "neighbors", ()))
+        if shape is None:
+            return None
+        return Rule(
+            state_type.birth_rules,
+            state_type.survival_rules,
+            None if state_type.state_count <= LIFE_STATE_COUNT else state_type.state_count,
+            shape[1],
+            state_type.middle,
+            "M" if shape[0] == "moore" else "N",
+        )
+    if issubclass(state_type, GenerationsState):
+        return Rule(state_type.birth_rules, state_type.survival_rules, state_type.state_count)
+    if issubclass(state_type, ConwayState):
+        return Rule(state_type.birth_rules, state_type.survival_rules, None)
+    return None
+
+
+def to_conway_rle(automaton: Automaton) -> str:
+    """Write an automaton's current generation as Run Length Encoded (RLE) I/O.
+
+    States are written by their 'value' attribute (as GenerationsState has) or else their 'alive'
+    attribute (as ConwayState has). The rule is written in the header when the state type has one
+    (see 'get_rle_rule'). The result can be read back with 'from_conway_rle'.
+
+    Args:
+        automaton (Automaton): The automaton to write
+
+    Raises:
+        ValueError: A state has neither a 'value' nor an 'alive' attribute, or is out of range
+
+    Returns:
+        The RLE data
+
+    """
+    rule = get_rle_rule(automaton.state_type, automaton.cell_type)
+    multi_state = rule is not None and rule.state_count is not None
+
+    def symbol(state: CellState) -> str:
+        """Find the symbol RLE uses for a state.
+
+        Args:
+            state (CellState): The state
+
+        Raises:
+            ValueError: The state has no 'value' or 'alive' attribute, or is out of range
+
+        Returns:
+            "b" or "o" for two state rules, or else "." or a letter with an optional prefix
+
+        """
+        value = getattr(state, "value", None)
+        if value is None:
+            alive = getattr(state, "alive", None)
+            if alive is None:
+                msg = f"{type(state).__name__} has no 'value' or 'alive' to write to RLE"
+                raise ValueError(msg)
+            value = int(alive)
+        if not multi_state:
+            if value not in {0, 1}:
+                msg = f"Can't write {type(state).__name__} value {value} to two state RLE"
+                raise ValueError(msg)
+            return "bo"[value]
+        if value == 0:
+            return "."
+        prefix, letter = divmod(value - 1, RLE_LETTER_STATES)
+        if prefix > ord("y") - ord("p") + 1:
+            msg = f"Can't write {type(state).__name__} value {value} to RLE"
+            raise ValueError(msg)
+        return ("" if prefix == 0 else chr(ord("p") + prefix - 1)) + chr(ord("A") + letter)
+
+    dead = "." if multi_state else "b"
+    tokens = []
+    written_y = 0
+    for y, row in enumerate(automaton.read(Coordinate(0, 0), automaton.max_coord)):
+        symbols = [symbol(state) for state in row]
+        while symbols and symbols[-1] == dead:
+            symbols.pop()
+        if not symbols:
+            continue
+        if y > written_y:
+            tokens.append(f"{y - written_y if y - written_y > 1 else ''}$")
+        written_y = y
+        for s, run in groupby(symbols):
+            n = len(list(run))
+            tokens.append(f"{n if n > 1 else ''}{s}")
+    tokens.append("!")
+
+    lines = [f"x = {automaton.xmax + 1}, y = {automaton.ymax + 1}"]
+    if rule is not None:
+        lines[0] += f", rule = {format_rule(rule)}"
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) > RLE_LINE_LENGTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
 def from_rle_url(url: str, cell_type: type[Cell] = MooreCell) -> Automaton:
     """Run a .rle from a remote URL."""
+    # Deferred since requests (and its dependencies) take longer to import than the rest of glipy
+    import requests  # noqa: PLC0415
+
     response = requests.get(url, timeout=5)
     if response.status_code != HTTP_OK:
         msg = f"Error {response.status_code}: {response.reason}"
@@ -279,13 +466,32 @@ def from_rle_url(url: str, cell_type: type[Cell] = MooreCell) -> Automaton:
     return automaton
 
 
-def random_conway(xmax: int, ymax: int, cell_type: type[Cell] = MooreCell) -> Automaton:
-    """Generate a random conway automaton."""
-    automaton: Automaton = Automaton(cell_type, ConwayState(alive=False), xmax, ymax)
-    for y in range(automaton.ymax + 1):
-        for x in range(automaton.xmax + 1):
-            alive = bool(random.randint(0, 1))
-            coord = Coordinate(x, y)
-            s = ConwayState(alive)
-            automaton.set_state(coord, s)
-    return automaton
+def random_conway(  # noqa: PLR0913
+    xmax: int,
+    ymax: int,
+    cell_type: type[Cell] = MooreCell,
+    *,
+    density: float = 0.5,
+    symmetry: str = "C1",
+    seed: int | str | bytes | None = None,
+) -> Automaton:
+    """Generate a random conway automaton.
+
+    Args:
+        xmax (int): The maximum x coordinate
+        ymax (int): The maximum y coordinate
+        cell_type (Type[Cell]): The type of cell to use
+        density (float): The chance of each cell being alive, in steps of 1/256
+        symmetry (str): One of soup.SYMMETRIES. C4 and D8 soups must be square
+        seed (Optional[Union[int, str, bytes]]): Seeds the random number generator, so the same
+        seed produces the same automaton
+
+    Returns:
+        Automaton
+
+    """
+    width = xmax + 1
+    soup = next(soups(width, ymax + 1, density, symmetry, seed))
+    states = (ConwayState(alive=False), ConwayState(alive=True))
+    grid = [list(map(states.__getitem__, soup[y : y + width])) for y in range(0, len(soup), width)]
+    return Automaton(cell_type, grid, xmax, ymax)
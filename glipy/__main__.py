@@ -0,0 +1,5 @@
+"""Runs glipy's command line interface (see the cli module)."""
+
+from .cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,232 @@
+"""Encodes generations as ANSI escape sequences, ready to be written to a terminal.
+
+Each palette color's escape sequence is rendered once, and runs of cells sharing a color are
+written as a single span, so the cost of a frame grows with the number of color changes rather
+than the number of cells. Runs are found by a regular expression over each row's color indexes
+(see Automaton.codes), which keeps the per-cell work out of Python.
+
+After the first frame, only the parts of each row that changed since the previous frame are
+written, each preceded by a cursor movement.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .automaton import Automaton
+    from .color import Color
+
+# Moves the cursor to a row and column (1-based)
+CURSOR = "\x1b[{};{}H"
+# Resets every attribute
+RESET = b"\x1b[0m"
+# Resets the background to the terminal's default
+DEFAULT_BACKGROUND = b"\x1b[49m"
+# Draws the upper half of a character cell in the foreground color
+UPPER_HALF = "▀".encode()
+
+# Unchanged cells shorter than this are rewritten rather than skipped with a cursor movement,
+# which costs about as many bytes
+MIN_GAP = 4
+
+# Matches a run of equal bytes, or of equal pairs of bytes (for half blocks)
+_RUN = re.compile(rb"(.)\1*", re.DOTALL)
+_PAIR_RUN = re.compile(rb"(..)\1*", re.DOTALL)
+# Matches a run of changed cells, after XORing a line with its previous frame
+_CHANGED = re.compile(rb"[^\0]+")
+
+
+def rgb(color: Color) -> tuple[int, int, int]:
+    """Split a color into its red, green and blue channels.
+
+    Args:
+        color (Color): The color
+
+    Returns:
+        A tuple of channels, from 0 to 255
+
+    """
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+def changed_spans(previous: bytes, current: bytes, step: int = 1) -> list[slice]:
+    """Find the parts of a line that differ from the previous frame.
+
+    Changes separated by fewer than MIN_GAP unchanged characters are merged into one span.
+
+    Args:
+        previous (bytes): The line's color indexes in the previous frame
+        current (bytes): The line's color indexes in this frame
+        step (int): The number of color indexes per character (2 for half blocks)
+
+    Returns:
+        A list of slices into the line, in characters
+
+    """
+    if previous == current:
+        return []
+    # XOR the lines as integers, leaving a nonzero byte wherever a color index changed
+    changed = (int.from_bytes(previous) ^ int.from_bytes(current)).to_bytes(len(current))
+    if step > 1:
+        changed = (int.from_bytes(changed[0::2]) | int.from_bytes(changed[1::2])).to_bytes(
+            len(current) // 2,
+        )
+    spans: list[slice] = []
+    for run in _CHANGED.finditer(changed):
+        if spans and run.start() - spans[-1].stop < MIN_GAP:
+            spans[-1] = slice(spans[-1].start, run.end())
+        else:
+            spans.append(slice(run.start(), run.end()))
+    return spans
+
+
+class FrameEncoder:
+    """Turns an automaton's generations into bytes that draw them on an ANSI terminal.
+
+    By default, each cell is drawn as 'cell_width' spaces on its color's background. With
+    'half_blocks', each character holds two cells (one above the other) by drawing an upper half
+    block in the top cell's color over the bottom cell's, doubling the rows that fit on screen.
+    Colors are written as 24-bit escape sequences.
+
+    Attributes:
+        automaton (Automaton): The automaton being drawn
+        half_blocks (bool): Whether each character holds two rows of cells
+        cell_width (int): The number of characters each cell takes, without half blocks
+        origin (Tuple[int, int]): The terminal row and column (1-based) of the top left cell
+
+    """
+
+    def __init__(
+        self,
+        automaton: Automaton,
+        half_blocks: bool = False,
+        cell_width: int = 2,
+        origin: tuple[int, int] = (1, 1),
+    ) -> None:
+        """Initialize an instance of the FrameEncoder class.
+
+        Args:
+            automaton (Automaton): The automaton to draw
+            half_blocks (bool): Whether each character holds two rows of cells
+            cell_width (int): The number of characters each cell takes, without half blocks
+            origin (Tuple[int, int]): The terminal row and column (1-based) of the top left cell
+
+        """
+        self.automaton = automaton
+        self.half_blocks = half_blocks
+        self.cell_width = 1 if half_blocks else cell_width
+        self.origin = origin
+        self._palette: tuple[Color, ...] = ()
+        self._background: list[bytes] = []
+        self._foreground: list[bytes] = []
+        self._previous: list[bytes] | None = None
+
+    def reset(self) -> None:
+        """Make the next frame redraw every cell, such as after the terminal was cleared."""
+        self._previous = None
+
+    def encode(self) -> bytes:
+        """Encode the automaton's current generation.
+
+        The first frame (and the first after 'reset', or after the palette changes) draws every
+        cell. Later frames only redraw the cells that changed since the frame before.
+
+        Returns:
+            The bytes to write to the terminal
+
+        """
+        palette = self.automaton.palette
+        if palette != self._palette:
+            self._render_palette(palette)
+        lines = self._lines()
+        previous = self._previous
+        if previous is not None and len(previous) != len(lines):
+            previous = None
+        step = 2 if self.half_blocks else 1
+        # With half blocks, an odd final row has nothing below it
+        bottomless = self.half_blocks and self.automaton.ymax % 2 == 0
+
+        out = bytearray()
+        row, column = self.origin
+        for y, line in enumerate(lines):
+            if previous is None:
+                spans = [slice(0, len(line) // step)]
+            else:
+                spans = changed_spans(previous[y], line, step)
+            for span in spans:
+                out += CURSOR.format(row + y, column + span.start * self.cell_width).encode()
+                part = line[span.start * step : span.stop * step]
+                self._encode_span(out, part, bottomless=bottomless and y == len(lines) - 1)
+        if out:
+            out += RESET
+        self._previous = lines
+        return bytes(out)
+
+    def _render_palette(self, palette: tuple[Color, ...]) -> None:
+        """Render the escape sequence of every palette color.
+
+        Args:
+            palette (Tuple[Color, ...]): The automaton's palette
+
+        """
+        channels = [rgb(color) for color in palette]
+        self._background = [b"\x1b[48;2;%d;%d;%dm" % c for c in channels]
+        self._foreground = [b"\x1b[38;2;%d;%d;%dm" % c for c in channels]
+        self._palette = palette
+        self._previous = None
+
+    def _lines(self) -> list[bytes]:
+        """Split the current generation into the lines drawn on screen.
+
+        With half blocks, each line interleaves the color indexes of two rows (top, bottom, top,
+        bottom...). An odd final row is paired with itself, and drawn without a bottom half.
+
+        Returns:
+            A bytes object of color indexes per line
+
+        """
+        codes = self.automaton.codes.tobytes()
+        width = self.automaton.xmax + 1
+        rows = [codes[y : y + width] for y in range(0, len(codes), width)]
+        if not self.half_blocks:
+            return rows
+        lines = []
+        for y in range(0, len(rows), 2):
+            top = rows[y]
+            bottom = rows[y + 1] if y + 1 < len(rows) else top
+            line = bytearray(2 * width)
+            line[0::2] = top
+            line[1::2] = bottom
+            lines.append(bytes(line))
+        return lines
+
+    def _encode_span(self, out: bytearray, line: bytes, bottomless: bool = False) -> None:
+        """Write the escape sequences and characters for part of a line.
+
+        Args:
+            out (bytearray): The buffer to write to
+            line (bytes): The color indexes of the cells to draw (interleaved for half blocks)
+            bottomless (bool): Whether to leave the bottom halves of half blocks undrawn
+
+        """
+        background, foreground = self._background, self._foreground
+        if not self.half_blocks:
+            blank = b" " * self.cell_width
+            for run in _RUN.finditer(line):
+                out += background[run.group()[0]]
+                out += blank * len(run.group())
+            return
+
+        if bottomless:
+            out += DEFAULT_BACKGROUND
+        for run in _PAIR_RUN.finditer(line):
+            top, bottom = run.group(1)
+            count = len(run.group()) // 2
+            if bottomless:
+                out += foreground[top] + UPPER_HALF * count
+            elif top == bottom:
+                out += background[top] + b" " * count
+            else:
+                out += foreground[top] + background[bottom] + UPPER_HALF * count
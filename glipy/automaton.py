@@ -2,29 +2,111 @@
 
 from __future__ import annotations
 
-import cProfile
 import sys
 import time
+from array import array
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Generic, Self, TypeVar, cast
+from typing import TYPE_CHECKING, Generic, TypeVar, cast
 
 from .cell import Cell
+from .compact import CompactStates, widen
 from .coordinate import Coordinate
+from .registry import get_engine
 from .state import CellState
+from .topology import DEAD_EDGES, TOPOLOGIES, neighbor_map
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator, Sequence
+
+    import numpy as np
+
+    from .color import Color
+    from .engine import Engine
+    from .history import History
+    from .recorder import Recorder
 
 C = TypeVar("C", bound=Cell)
 S = TypeVar("S", bound=CellState)
 
+# The ways 'Automaton.paste' can combine a pattern with what's already there
+PASTE_MODES = ("overwrite", "or", "xor")
+# The most colors a palette can hold, since 'codes' stores each cell's color index in one byte
+MAX_COLORS = 256
+
+
+def _span(start: int, length: int, size: int, wrap: bool) -> tuple[list[int], int]:
+    """Find where a run of cells lands along one axis of an automaton.
+
+    Args:
+        start (int): Where the first cell would land. May be negative
+        length (int): The number of cells in the run
+        size (int): The size of the automaton along this axis
+        wrap (bool): Whether cells past the edges wrap around (True) or are dropped (False)
+
+    Returns:
+        The index each kept cell lands at, and the index of the first kept cell within the run
+
+    """
+    if wrap:
+        return [(start + i) % size for i in range(min(length, size))], 0
+    first = max(start, 0)
+    return list(range(first, min(start + length, size))), first - start
+
+
+class _ColorIndex(dict["Color", int]):
+    """Maps each color to the first index it appears at in a palette, adding missing colors.
+
+    Only the first MAX_COLORS colors of the palette can be looked up. Any other color raises
+    ValueError, before it's written anywhere.
+    """
+
+    def __init__(self, colors: Sequence[Color], extra: list[Color]) -> None:
+        """Initialize an instance of the _ColorIndex class.
+
+        Args:
+            colors (Sequence[Color]): The state type's colors
+            extra (List[Color]): Colors already added past the state type's, which any new ones
+            are appended to
+
+        """
+        super().__init__()
+        palette = [*colors, *extra]
+        for i, color in enumerate(palette[:MAX_COLORS]):
+            self.setdefault(color, i)
+        self._size = len(palette)
+        self._extra = extra
+
+    def __missing__(self, color: Color) -> int:
+        """Add a color to the end of the palette.
+
+        Args:
+            color (Color): A color the palette doesn't have
+
+        Raises:
+            ValueError: The palette is full
+
+        Returns:
+            The color's new index
+
+        """
+        if self._size >= MAX_COLORS:
+            msg = f"Can't use color {color!r}: a palette holds at most {MAX_COLORS} colors"
+            raise ValueError(msg)
+        index = self[color] = self._size
+        self._size += 1
+        self._extra.append(color)
+        return index
+
 
 @dataclass
 class StateData:
     """Used to simplify access of neighbors and state data in an Automaton instance.
 
     Args:
-        neighbors (List[Coordinate]): A list of the neighbor's coordinates to access
+        neighbors (List[Coordinate]): A list of the neighbor's coordinates to access. Left empty by
+        automata whose state type provides an engine, since they never read it. Neighbors past a
+        dead edge (see the topology module) are at (0, ymax + 1), just past the last cell, which
+        is always in the background state
         state (CellState): An instance of a a CellState
 
     """
@@ -43,51 +125,107 @@ class Automaton(Generic[C, S]):
     Attributes:
         generation (int): The generation we're at in the simulation
         cell_type (Type[Cell]) The type of Cell the automaton is working with
+        topology (str): How the edges of the board join (see the topology module)
         xmax (int): The maximum x coordinate
         ymax (int): The maximum y coordinate
         max_coord (Coordinate): The maximum valid coordinate found in the grid
         midpoint (Coordinate): The midpoint of the matrix
-        matrix (CellMatrix): The underlying cell matrix
+        matrix (CellMatrix): The underlying cell matrix. For compact automata, a snapshot
+        codes (memoryview): A read-only (ymax + 1, xmax + 1) view of each cell's color index
+        palette (Tuple[Color, ...]): The colors the values in 'codes' refer to
+        population (int): The number of live cells
+        births (int): The number of cells that became live in the last generation
+        deaths (int): The number of live cells that stopped being live in the last generation
+        row_population (memoryview): A read-only view of the number of live cells in each row
+        column_population (memoryview): A read-only view of the number of live cells in each
+        column
+        bounding_box (Optional[Tuple[Coordinate, Coordinate]]): The corners of the smallest
+        rectangle holding every live cell
+        history (Optional[History]): Records every generation once set (see the history module)
+        recorder (Optional[Recorder]): Records the statistics of every generation once set (see
+        the recorder module)
 
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         cell_type: type[Cell],
         initial_state: CellState | Sequence[Sequence[CellState]],
         xmax: int,
         ymax: int,
+        compact: bool = False,
+        *,
+        topology: str = "torus",
     ) -> None:
         """Initialize an instance of the Simulation class.
 
+        Compact automata store states as indexes into a palette of the distinct states in use
+        (see CompactStates) instead of one StateData per cell, and each cell's neighbors as
+        positions in an array instead of a list of coordinates. This takes one to two orders of
+        magnitude less memory, but requires hashable states that compare by value, and 'matrix'
+        becomes a snapshot that is rebuilt on every access.
+
+        Cell types that list their neighbors as offsets in a 'neighbors' class attribute (as
+        MooreCell and NeumannCell do) have their neighbors found from maps precompiled for the
+        topology. Other cell types call 'get_neighbors', and only support a torus.
+
         Args:
             cell_type (Type[Cell]): The type of cell the simulation should use when determining
             neighbors
             initial_state (CellState): The initial state of a cell the matrix should be filled with
             xmax (Optional[int]): The xmax value to use for the automaton
             ymax (Optional[int]): The ymax value to use for the automaton
+            compact (bool): Whether to store states compactly
+            topology (str): One of topology.TOPOLOGIES
+
+        Raises:
+            ValueError: The topology is not valid, or not supported by the cell type
 
         """
+        if topology not in TOPOLOGIES:
+            msg = f"Invalid topology: '{topology}' (expected one of {', '.join(TOPOLOGIES)})"
+            raise ValueError(msg)
+        if topology != "torus" and not isinstance(getattr(cell_type, "neighbors", None), tuple):
+            msg = f"{cell_type.__name__} must list its neighbors as offsets in 'neighbors'"
+            raise ValueError(msg)
         self.generation = 0
+        self.history: History | None = None
+        self.recorder: Recorder | None = None
         self.cell_type = cell_type
+        self.topology = topology
         self.xmax = xmax
         self.ymax = ymax
 
         self.max_coord = Coordinate(self.xmax, self.ymax)
         self.midpoint = Coordinate(self.xmax // 2, self.ymax // 2)
 
-        self.matrix: list[list[StateData]] = []
+        self._matrix: list[list[StateData]] = []
+        self._compact: CompactStates | None = None
+        self._neighbor_index = array("I")
+        self._neighbor_starts = array("I")
+        self._codes = array("B", bytes((self.xmax + 1) * (self.ymax + 1)))
+        # Whether each cell is live, meaning not in the state type's default state. Kept apart from
+        # '_codes', since a live state may share the background's color
+        self._live = array("B", bytes(len(self._codes)))
+        # Colors of states that aren't listed in 'colors', given the indexes after them
+        self._extra_colors: list[Color] = []
+        self._engine: Engine | None = None
+        self._engine_codes: np.ndarray
+        self._stale = False
+
+        # Live cell statistics, kept up to date by every method that writes to '_live' (see
+        # 'population'). The bounding box is found from the row/column counts when it's dirty
+        self._population = 0
+        self._row_population = array("I", [0]) * (self.ymax + 1)
+        self._column_population = array("I", [0]) * (self.xmax + 1)
+        self._bounds: tuple[Coordinate, Coordinate] | None = None
+        self._bounds_dirty = True
+        self._births = 0
+        self._deaths = 0
 
         if isinstance(initial_state, list):
             self._state_type = type(initial_state[0][0])
-            for y in range(self.ymax + 1):
-                self.matrix.append([])
-                for x in range(self.xmax + 1):
-                    coord = Coordinate(x, y)
-                    c = self.cell_type(coord)
-                    neighbors = c.get_neighbors(self.max_coord)
-                    state = initial_state[y][x]
-                    self.matrix[y].append(StateData(neighbors, state))
+            rows = initial_state
         else:
             # I don't like this [cast] solution very much, but mypy and our code analysis tools
             # should catch improper arg. usage upstream from here. If we don't use cast here,
@@ -97,38 +235,327 @@ class Automaton(Generic[C, S]):
             # from our conditional logic above, so if we're here it must be CellState compliant.
             initial_state = cast("CellState", initial_state)
             self._state_type = type(initial_state)
-            for y in range(self.ymax + 1):
-                self.matrix.append([])
-                for x in range(self.xmax + 1):
-                    coord = Coordinate(x, y)
-                    c = self.cell_type(coord)
-                    neighbors = c.get_neighbors(self.max_coord)
-                    self.matrix[y].append(StateData(neighbors, initial_state))
+            rows = [[initial_state] * (self.xmax + 1)] * (self.ymax + 1)
+
+        # State types that provide their own engine never need neighbor lists unless the engine is
+        # dropped, so they are left empty until then (see _ensure_neighbors). Compact automata
+        # always wait until neighbors are needed
+        has_engine = hasattr(self._state_type, "make_engine")
+        self._neighbors_ready = False
+        if compact:
+            if isinstance(initial_state, list):
+                self._compact = CompactStates(state for row in rows for state in row)
+            else:
+                self._compact = CompactStates.filled(initial_state, len(self._codes))
+        else:
+            self._matrix = [
+                [StateData([], rows[y][x]) for x in range(self.xmax + 1)]
+                for y in range(self.ymax + 1)
+            ]
+
+        self._encode_all()
+        if (not has_engine or not self.compile()) and not compact:
+            self._ensure_neighbors()
+
+    @property
+    def matrix(self) -> list[list[StateData]]:
+        """The underlying cell matrix, brought up to date if an engine has evolved it.
+
+        For compact automata, this is a new matrix (without neighbor lists) on every access, so
+        changing it has no effect unless it's assigned back.
+        """
+        self._sync()
+        if self._compact is not None:
+            states = iter(self._compact)
+            return [
+                [StateData([], next(states)) for _ in range(self.xmax + 1)]
+                for _ in range(self.ymax + 1)
+            ]
+        return self._matrix
+
+    def _sync(self) -> None:
+        """Bring the stored states up to date if an engine has changed its codes since."""
+        if not self._stale:
+            return
+        states = cast("Engine", self._engine).states
+        if self._compact is not None:
+            self._compact.load(states, self._engine_codes.tobytes())
+        else:
+            codes = iter(self._engine_codes.tolist())
+            for row in self._matrix:
+                for data in row:
+                    data.state = states[next(codes)]
+        self._stale = False
+
+    def _states(self) -> Iterator[CellState]:
+        """Iterate on the state of every cell, row by row.
+
+        Returns:
+            An iterator of states
+
+        """
+        self._sync()
+        if self._compact is not None:
+            return iter(self._compact)
+        return (data.state for row in self._matrix for data in row)
+
+    @matrix.setter
+    def matrix(self, matrix: list[list[StateData]]) -> None:
+        """Replace the underlying cell matrix.
+
+        Args:
+            matrix (List[List[StateData]]): The new matrix
+
+        """
+        self._stale = False
+        if self._compact is not None:
+            self._compact = CompactStates(data.state for row in matrix for data in row)
+        else:
+            self._matrix = matrix
+            self._neighbors_ready = True
+        self._encode_all()
+        if self._engine is not None:
+            self._load_engine()
+
+    def compile(self, max_states: int | None = None) -> bool:
+        """Evolve with an engine instead of calling 'change_state' once per cell.
+
+        If the state type provides its own engine through a 'make_engine' class method (as
+        GenerationsState does), that engine is used. Otherwise, a transition table is compiled.
+        This works for cell states that are hashable, compare by value, have a finite number of
+        reachable states and ignore the order of their neighbors. The table is built by probing
+        'change_state' for every combination of state and neighbor counts, so it reflects any
+        class-level rules (such as ConwayState.birth_rules) as they were at compile time.
+
+        A table needs (neighbors + 1) ** states entries per state, so the number of states is
+        capped by table.MAX_TABLE_SIZE: at most 6 for Moore neighborhoods and 8 for Von Neumann
+        ones (see table.state_limit).
+
+        Args:
+            max_states (Optional[int]): The number of distinct states to give up compiling a
+            table after. Defaults to, and can't exceed, the cap for the neighborhood
+
+        Returns:
+            True if an engine is in use, or False if the automaton will keep evolving by calling
+            'change_state' (the state type can't be compiled)
+
+        """
+        # Deferred so numpy is only imported by automata that use an engine
+        from .table import CompileError, TransitionTable  # noqa: PLC0415
+
+        self._sync()
+        make_engine = getattr(self._state_type, "make_engine", None)
+        engine = None
+        if make_engine is not None:
+            engine = make_engine(self.cell_type, self.max_coord, self.topology)
+        if engine is None:
+            positions = self._neighbor_positions()
+            neighbor_counts = {len(neighbors) for neighbors in positions}
+            if len(neighbor_counts) != 1:
+                return False
+            # Cells past a dead edge are always in the background state, which must be in the table
+            edge = self._state_type() if self.topology in DEAD_EDGES else None
+            seeds = self._states() if edge is None else [*self._states(), edge]
+            try:
+                table = TransitionTable.compile(seeds, neighbor_counts.pop(), max_states)
+            except CompileError:
+                return False
+            engine = get_engine("table")(table, positions, edge)
+
+        self._engine = engine
+        self._load_engine()
+        return self._engine is not None
+
+    def decompile(self) -> None:
+        """Stop using an engine, and evolve by calling 'change_state' (see 'compile')."""
+        if self._engine is not None:
+            self._drop_engine()
+
+    def _ensure_neighbors(self) -> None:
+        """Fill in the neighbor lists of the matrix if they were deferred for an engine.
+
+        Compact automata store every cell's neighbors in one flat array of positions instead,
+        where the neighbors of the cell at position i are found between '_neighbor_starts[i]' and
+        '_neighbor_starts[i + 1]'.
+        """
+        if self._neighbors_ready:
+            return
+        width = self.xmax + 1
+        offsets = getattr(self.cell_type, "neighbors", None)
+        if isinstance(offsets, tuple):
+            maps = [neighbor_map(offset, self.max_coord, self.topology) for offset in offsets]
+            positions: Iterable[Sequence[int]] = zip(*maps, strict=True)
+        else:
+            positions = (
+                [nc.y * width + nc.x for nc in self.cell_type(coord).get_neighbors(self.max_coord)]
+                for coord in (Coordinate(x, y) for y in range(self.ymax + 1) for x in range(width))
+            )
+
+        if self._compact is not None:
+            index = array("I")
+            starts = array("I", [0])
+            for neighbors in positions:
+                index.extend(neighbors)
+                starts.append(len(index))
+            self._neighbor_index, self._neighbor_starts = index, starts
+        else:
+            # Neighbors share one coordinate per position, including the one past the last cell
+            coords = [Coordinate(i % width, i // width) for i in range(len(self._codes) + 1)]
+            cells = (data for row in self._matrix for data in row)
+            for data, neighbors in zip(cells, positions, strict=True):
+                data.neighbors = [coords[i] for i in neighbors]
+        self._neighbors_ready = True
+
+    def _neighbor_positions(self) -> list[Sequence[int]]:
+        """Find the position of each cell's neighbors, counting row by row.
 
-        self._current_row = 0
-        self._current_col = 0
+        Returns:
+            A sequence of positions for each cell
+
+        """
+        self._ensure_neighbors()
+        if self._compact is not None:
+            index, starts = self._neighbor_index, self._neighbor_starts
+            return [index[starts[i] : starts[i + 1]] for i in range(len(starts) - 1)]
+        width = self.xmax + 1
+        return [
+            [nc.y * width + nc.x for nc in data.neighbors] for row in self._matrix for data in row
+        ]
+
+    def _load_engine(self) -> None:
+        """Encode the matrix's states with the engine, dropping it if one can't be represented."""
+        if self._engine is None:
+            return
+        codes = self._engine.encode_all(self._states())
+        if codes is None:
+            self._engine = None
+            return
+        self._engine_codes = codes
 
     def evolve(self) -> None:
         """Evolves the simulation once.
 
         Visits each cell in the 2d matrix and retrieves its new state by passing its neighbor
         states to the change_state
-        method.
+        method. If an engine is in use (see 'compile'), it evolves the whole matrix at once
+        instead. The new generation is recorded in 'history' and 'recorder', if they're set.
+
+        Raises:
+            ValueError: A new state's color doesn't fit in the palette (see MAX_COLORS). The
+            automaton is left at the generation it was at
         """
+        if self._engine is not None:
+            self._evolve_engine()
+        else:
+            self._ensure_neighbors()
+            try:
+                if self._compact is not None:
+                    self._evolve_compact()
+                else:
+                    self._evolve_matrix()
+            except ValueError:
+                # A new state's color didn't fit in the palette. The stored states are still the
+                # last generation's, so 'codes' and the statistics are rewritten from them
+                self._encode_all()
+                raise
+        if self.history is not None:
+            self.history.record()
+        if self.recorder is not None:
+            self.recorder.record()
+
+    def _evolve_matrix(self) -> None:
+        """Evolve the simulation once, calling 'change_state' for each StateData in the matrix."""
         next_generation: list[list[StateData]] = []
+        # The cell past the last one stands in for every cell past a dead edge
+        matrix = [*self._matrix, [StateData([], self._state_type())]]
+        color_index = self._color_index()
+        codes, live = self._codes, self._live
+        background = self._state_type()
+        rows, columns = self._reset_population()
+        births = deaths = 0
+        i = 0
         for y in range(self.ymax + 1):
             next_generation.append([])
             for x in range(self.xmax + 1):
-                coord = Coordinate(x, y)
-                data = self.matrix[coord.y][coord.x]
+                data = matrix[y][x]
                 neighbor_states = []
                 for nc in data.neighbors:
-                    neighbor_state = self.matrix[nc.y][nc.x].state
+                    neighbor_state = matrix[nc.y][nc.x].state
                     neighbor_states.append(neighbor_state)
                 new_state = data.state.change_state(neighbor_states)
                 next_generation[y].append(StateData(data.neighbors, new_state))
+                was_live = live[i]
+                codes[i] = color_index[new_state.color]
+                is_live = live[i] = new_state != background
+                if is_live:
+                    rows[y] += 1
+                    columns[x] += 1
+                    births += not was_live
+                elif was_live:
+                    deaths += 1
+                i += 1
+
+        self._matrix = next_generation
+        self._population = sum(rows)
+        self._births, self._deaths = births, deaths
+        self.generation += 1
+
+    def _evolve_compact(self) -> None:
+        """Evolve the simulation once, reading and writing palette indexes."""
+        compact = cast("CompactStates", self._compact)
+        palette = compact.palette
+        cells = compact.cells
+        # The code past the last cell stands in for every cell past a dead edge
+        lookup = cells.tolist()
+        background = compact.encode(self._state_type())
+        lookup.append(background if self.topology in DEAD_EDGES else 0)
+        next_cells = array(cells.typecode, bytes(len(cells) * cells.itemsize))
+        capacity = 1 << (8 * next_cells.itemsize)
+        index, starts = self._neighbor_index, self._neighbor_starts
+        color_index = self._color_index()
+        codes, live = self._codes, self._live
+        rows, columns = self._reset_population()
+        births = deaths = 0
+        width = self.xmax + 1
+        for i, code in enumerate(cells):
+            neighbor_states = [palette[lookup[j]] for j in index[starts[i] : starts[i + 1]]]
+            new_state = palette[code].change_state(neighbor_states)
+            new_code = compact.encode(new_state)
+            if new_code >= capacity:
+                next_cells = widen(next_cells, len(palette))
+                capacity = 1 << (8 * next_cells.itemsize)
+            next_cells[i] = new_code
+            was_live = live[i]
+            codes[i] = color_index[new_state.color]
+            is_live = live[i] = new_code != background
+            if is_live:
+                rows[i // width] += 1
+                columns[i % width] += 1
+                births += not was_live
+            elif was_live:
+                deaths += 1
 
-        self.matrix = next_generation
+        compact.cells = next_cells
+        self._population = sum(rows)
+        self._births, self._deaths = births, deaths
+        self.generation += 1
+
+    def _evolve_engine(self) -> None:
+        """Evolve the simulation once using the engine."""
+        from .engine import turnover  # noqa: PLC0415
+
+        engine = cast("Engine", self._engine)
+        previous, population = bytes(self._live), self._population
+        codes, self._engine_codes = self._engine_codes, engine.step(self._engine_codes)
+        try:
+            self._paint()
+        except ValueError:
+            self._engine_codes = codes
+            raise
+        changed = turnover(previous, self._live)
+        # Every birth or death changes a cell, and births minus deaths is the change in population
+        self._births = (changed + self._population - population) // 2
+        self._deaths = changed - self._births
         self.generation += 1
 
     def set_state(self, coord: Coordinate, state: CellState) -> None:
@@ -138,22 +565,418 @@ class Automaton(Generic[C, S]):
             coord (Coordinate): The coordinate to spawn a cell state at
             state (CellState): The state of the cell
 
+        Raises:
+            ValueError: The state's color doesn't fit in the palette (see MAX_COLORS). The cell is
+            left as it was
+
+        """
+        i = coord.y * (self.xmax + 1) + coord.x
+        self._set_code(coord, self._color_index()[state.color], state != self._state_type())
+        if self._engine is not None:
+            code = self._engine.encode(state)
+            if code is not None:
+                self._engine_codes[i] = code
+                if not self._stale:
+                    self._put(coord, state)
+                return
+            self._drop_engine()
+        self._put(coord, state)
+
+    def _get(self, coord: Coordinate) -> CellState:
+        """Return the stored state of a cell, which may be out of date if '_stale' is set.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+
+        Returns:
+            CellState
+
+        """
+        if self._compact is not None:
+            return self._compact[coord.y * (self.xmax + 1) + coord.x]
+        return self._matrix[coord.y][coord.x].state
+
+    def _put(self, coord: Coordinate, state: CellState) -> None:
+        """Store the state of a cell, without updating 'codes' or the engine.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+            state (CellState): The cell's new state
+
         """
-        self.matrix[coord.y][coord.x].state = state
+        if self._compact is not None:
+            self._compact[coord.y * (self.xmax + 1) + coord.x] = state
+        else:
+            self._matrix[coord.y][coord.x].state = state
+
+    def _drop_engine(self) -> None:
+        """Stop using the engine, after bringing the stored states up to date with it."""
+        self._sync()
+        self._engine = None
+
+    def snapshot(self) -> CompactStates:
+        """Copy the state of every cell, row by row, to be restored later (see 'restore').
+
+        Returns:
+            CompactStates
+
+        """
+        if self._engine is not None:
+            snapshot = CompactStates(())
+            snapshot.load(self._engine.states, self._engine_codes.tobytes())
+            return snapshot
+        if self._compact is not None:
+            return self._compact.copy()
+        return CompactStates(self._states())
+
+    def restore(self, snapshot: CompactStates) -> None:
+        """Set the state of every cell from a snapshot. The generation is left as it is.
+
+        Args:
+            snapshot (CompactStates): The state of every cell, row by row (see 'snapshot')
+
+        """
+        ys, xs = list(range(self.ymax + 1)), list(range(self.xmax + 1))
+        if self._engine is not None:
+            translation = self._engine.encode_all(snapshot.palette)
+            if translation is not None:
+                import numpy as np  # noqa: PLC0415
+
+                cells = np.frombuffer(snapshot.cells, dtype=f"u{snapshot.cells.itemsize}")
+                self._blit(ys, xs, translation[cells].reshape(len(ys), len(xs)), "overwrite")
+                return
+            self._drop_engine()
+        if self._compact is not None:
+            self._compact = snapshot.copy()
+            self._encode_all()
+            return
+        states = list(snapshot)
+        rows = [states[i : i + len(xs)] for i in range(0, len(states), len(xs))]
+        self._write(ys, xs, rows, "overwrite")
 
     def spawn(self, midpoint: Coordinate, pattern: Automaton) -> None:
-        """Spawn another automaton within this one."""
-        for y in range(pattern.ymax + 1):
-            for x in range(pattern.xmax + 1):
+        """Spawn another automaton within this one, wrapping around the edges (see 'paste')."""
+        self.paste(pattern, midpoint)
+
+    def paste(
+        self,
+        pattern: Automaton,
+        origin: Coordinate,
+        mode: str = "overwrite",
+        wrap: bool = True,
+    ) -> None:
+        """Copy another automaton's states into this one, with its top left corner at 'origin'.
+
+        Modes compare states against the default state of this automaton's state type (the
+        background):
+            - "overwrite" copies every state
+            - "or" copies every state that isn't the background
+            - "xor" copies every state that isn't the background onto background cells, and sets
+              cells that are already something else to the background
+
+        If this automaton has an engine and can represent the pattern's states, the region is
+        written as a whole with array indexing rather than cell by cell.
+
+        Args:
+            pattern (Automaton): The automaton to copy
+            origin (Coordinate): Where the pattern's top left corner goes. May be negative
+            mode (str): One of "overwrite", "or" or "xor"
+            wrap (bool): Whether cells past the edges wrap around to the other side (True), or
+            are dropped (False)
+
+        Raises:
+            ValueError: The mode is not valid
+
+        """
+        if mode not in PASTE_MODES:
+            msg = f"Invalid paste mode: '{mode}' (expected one of {', '.join(PASTE_MODES)})"
+            raise ValueError(msg)
+
+        ys, source_y = _span(origin.y, pattern.ymax + 1, self.ymax + 1, wrap)
+        xs, source_x = _span(origin.x, pattern.xmax + 1, self.xmax + 1, wrap)
+        if not ys or not xs:
+            return
+        start = Coordinate(source_x, source_y)
+        end = Coordinate(source_x + len(xs) - 1, source_y + len(ys) - 1)
+
+        if self._engine is not None:
+            source = pattern._region_codes(start, end, self._engine)
+            if source is not None:
+                self._blit(ys, xs, source, mode)
+                return
+            self._drop_engine()
+
+        self._write(ys, xs, pattern.read(start, end), mode)
+
+    def read(self, start: Coordinate, end: Coordinate) -> list[list[CellState]]:
+        """Return the states in a rectangle, row by row.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        Returns:
+            A list of rows of states
+
+        """
+        if self._stale:
+            engine = cast("Engine", self._engine)
+            grid = self._engine_codes.reshape(self.ymax + 1, self.xmax + 1)
+            region = grid[start.y : end.y + 1, start.x : end.x + 1].tolist()
+            return [[engine.states[code] for code in row] for row in region]
+        if self._compact is not None:
+            palette, cells = self._compact.palette, self._compact.cells
+            width = self.xmax + 1
+            return [
+                [palette[code] for code in cells[y * width + start.x : y * width + end.x + 1]]
+                for y in range(start.y, end.y + 1)
+            ]
+        return [
+            [data.state for data in row[start.x : end.x + 1]]
+            for row in self._matrix[start.y : end.y + 1]
+        ]
+
+    def write(self, origin: Coordinate, rows: list[list[CellState]]) -> None:
+        """Overwrite a rectangle with rows of states (the reverse of 'read').
+
+        States past the edges are dropped. Like 'paste', the rectangle is written as a whole if
+        this automaton has an engine that can represent every state.
+
+        Args:
+            origin (Coordinate): Where the top left state goes
+            rows (List[List[CellState]]): The states to write, row by row
+
+        """
+        self.write_regions([(origin, rows)])
+
+    def write_regions(self, regions: Iterable[tuple[Coordinate, list[list[CellState]]]]) -> None:
+        """Overwrite several rectangles with rows of states (see 'write').
+
+        With an engine, every rectangle is written into the engine's codes before 'codes' and the
+        live cell statistics are rewritten, so they're only rewritten once rather than once per
+        rectangle.
+
+        Args:
+            regions (Iterable[Tuple[Coordinate, List[List[CellState]]]]): Where each rectangle's
+            top left state goes, and its states, row by row
+
+        """
+        clipped = []
+        for origin, rows in regions:
+            if not rows:
+                continue
+            ys, source_y = _span(origin.y, len(rows), self.ymax + 1, wrap=False)
+            xs, source_x = _span(origin.x, len(rows[0]), self.xmax + 1, wrap=False)
+            if ys and xs:
+                kept = rows[source_y : source_y + len(ys)]
+                clipped.append((ys, xs, [row[source_x : source_x + len(xs)] for row in kept]))
+        if not clipped:
+            return
+
+        if self._engine is not None:
+            engine = self._engine
+            sources = []
+            for ys, xs, rows in clipped:
+                codes = engine.encode_all(state for row in rows for state in row)
+                if codes is None:
+                    break
+                sources.append(codes.reshape(len(ys), len(xs)))
+            else:
+                grid = self._engine_codes.reshape(self.ymax + 1, self.xmax + 1)
+                for (ys, xs, _), source in zip(clipped, sources, strict=True):
+                    engine.blit(grid, (ys, xs), source, "overwrite", None)
+                self._paint()
+                return
+            self._drop_engine()
+
+        for ys, xs, rows in clipped:
+            self._write(ys, xs, rows, "overwrite")
+
+    def extract(self, start: Coordinate, end: Coordinate) -> Automaton:
+        """Copy a rectangle of this automaton into a new automaton of the same cell type.
+
+        The copy is compact if this automaton is.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        Returns:
+            Automaton
+
+        """
+        return Automaton(
+            self.cell_type,
+            self.read(start, end),
+            end.x - start.x,
+            end.y - start.y,
+            compact=self._compact is not None,
+            topology=self.topology,
+        )
+
+    def fill(
+        self,
+        state: CellState,
+        start: Coordinate | None = None,
+        end: Coordinate | None = None,
+    ) -> None:
+        """Set every cell in a rectangle (or the whole automaton) to a state.
+
+        Args:
+            state (CellState): The state to fill with
+            start (Optional[Coordinate]): The top left corner of the rectangle. Defaults to (0, 0)
+            end (Optional[Coordinate]): The bottom right corner of the rectangle (inclusive).
+            Defaults to the max coordinate
+
+        """
+        start = start or Coordinate(0, 0)
+        end = end or self.max_coord
+        ys = list(range(max(start.y, 0), min(end.y, self.ymax) + 1))
+        xs = list(range(max(start.x, 0), min(end.x, self.xmax) + 1))
+        if not ys or not xs:
+            return
+
+        if self._engine is not None:
+            code = self._engine.encode(state)
+            if code is not None:
+                self._blit(ys, xs, code, "overwrite")
+                return
+            self._drop_engine()
+
+        self._write(ys, xs, [[state] * len(xs)] * len(ys), "overwrite")
+
+    def clear(self, start: Coordinate | None = None, end: Coordinate | None = None) -> None:
+        """Set the Automaton's underlying matrix (or a rectangle of it) to the default state type.
+
+        Args:
+            start (Optional[Coordinate]): The top left corner of the rectangle. Defaults to (0, 0)
+            end (Optional[Coordinate]): The bottom right corner of the rectangle (inclusive).
+            Defaults to the max coordinate
+
+        """
+        self.fill(self._state_type(), start, end)
+
+    def _region_codes(
+        self,
+        start: Coordinate,
+        end: Coordinate,
+        engine: Engine,
+    ) -> np.ndarray | None:
+        """Encode the states in a rectangle with another automaton's engine.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+            engine (Engine): The engine to encode with
+
+        Returns:
+            A 2 dimensional array of codes, or None if the engine can't represent every state
+
+        """
+        if self._engine is None:
+            rows = self.read(start, end)
+            codes = engine.encode_all(state for row in rows for state in row)
+            return None if codes is None else codes.reshape(len(rows), -1)
+
+        translation = engine.translate(self._engine)
+        if translation is None:
+            return None
+        grid = self._engine_codes.reshape(self.ymax + 1, self.xmax + 1)
+        region: np.ndarray = translation[grid[start.y : end.y + 1, start.x : end.x + 1]]
+        return region
+
+    def _blit(self, ys: list[int], xs: list[int], source: np.ndarray | int, mode: str) -> None:
+        """Write engine codes into a region (see 'paste' for modes).
+
+        Args:
+            ys (List[int]): The rows of the region
+            xs (List[int]): The columns of the region
+            source (Union[np.ndarray, int]): The codes to write, or one code for every cell
+            mode (str): One of "overwrite", "or" or "xor"
+
+        """
+        engine = cast("Engine", self._engine)
+        background = engine.encode(self._state_type())
+        grid = self._engine_codes.reshape(self.ymax + 1, self.xmax + 1)
+        engine.blit(grid, (ys, xs), source, mode, background)
+        self._paint()
+
+    def _paint(self) -> None:
+        """Rewrite 'codes' and the live cell statistics after the engine's codes have changed."""
+        from .engine import census  # noqa: PLC0415
+
+        engine = cast("Engine", self._engine)
+        engine.paint(self._engine_codes, self._color_index(), self._codes)
+        background = engine.encode(self._state_type())
+        engine.mark(self._engine_codes, background, self._live)
+        self._population = census(
+            self._live,
+            self.xmax + 1,
+            self._row_population,
+            self._column_population,
+        )
+        self._bounds_dirty = True
+        self._stale = True
+
+    def _write(self, ys: list[int], xs: list[int], rows: list[list[CellState]], mode: str) -> None:
+        """Write states into a region of the matrix (see 'paste' for modes).
+
+        Args:
+            ys (List[int]): The rows of the region
+            xs (List[int]): The columns of the region
+            rows (List[List[CellState]]): The states to write, row by row
+            mode (str): One of "overwrite", "or" or "xor"
+
+        """
+        background = self._state_type()
+        color_index = self._color_index()
+        for y, row in zip(ys, rows, strict=True):
+            for x, state in zip(xs, row, strict=True):
+                if mode != "overwrite" and state == background:
+                    continue
                 coord = Coordinate(x, y)
-                offset = Coordinate(x, y) + midpoint
-                self.set_state(offset, pattern.matrix[coord.y][coord.x].state)
+                new_state = state
+                if mode == "xor" and self._get(coord) != background:
+                    new_state = background
+                # Looked up first, so a color that doesn't fit leaves the cell as it was
+                code = color_index[new_state.color]
+                self._put(coord, new_state)
+                self._set_code(coord, code, new_state != background)
 
-    def clear(self) -> None:
-        """Set the Automaton's underlying matrix to the default state type."""
-        for y in range(self.ymax + 1):
-            for x in range(self.xmax + 1):
-                self.matrix[y][x].state = self._state_type()
+    def _set_code(self, coord: Coordinate, code: int, is_live: bool) -> None:
+        """Set the color index of one cell and whether it's live, updating the statistics to match.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+            code (int): The cell's new color index
+            is_live (bool): Whether the cell's new state differs from the background state
+
+        """
+        i = coord.y * (self.xmax + 1) + coord.x
+        was_live = bool(self._live[i])
+        self._codes[i] = code
+        self._live[i] = is_live
+        if was_live == is_live:
+            return
+
+        change = 1 if is_live else -1
+        self._population += change
+        self._row_population[coord.y] += change
+        self._column_population[coord.x] += change
+        if self._bounds_dirty:
+            return
+        if not is_live:
+            # Only a cell on the edge of the box can shrink it, which empties its row or column
+            if not self._row_population[coord.y] or not self._column_population[coord.x]:
+                self._bounds_dirty = True
+        elif self._bounds is None:
+            self._bounds = (coord, coord)
+        else:
+            low, high = self._bounds
+            self._bounds = (
+                Coordinate(min(low.x, coord.x), min(low.y, coord.y)),
+                Coordinate(max(high.x, coord.x), max(high.y, coord.y)),
+            )
 
     def run(
         self,
@@ -173,6 +996,8 @@ class Automaton(Generic[C, S]):
 
         """
         if debug is True:
+            import cProfile  # noqa: PLC0415
+
             cProfile.runctx(
                 "eval('self.run(refresh_rate, generations, False)')",
                 globals(),
@@ -201,6 +1026,26 @@ class Automaton(Generic[C, S]):
         except KeyboardInterrupt:
             sys.exit(0)
 
+    @property
+    def state_type(self) -> type[CellState]:
+        """The type of cell state the automaton is working with.
+
+        Returns:
+            The state type
+
+        """
+        return self._state_type
+
+    @property
+    def engine(self) -> Engine | None:
+        """The engine evolving the automaton, or None if it calls 'change_state' (see 'compile').
+
+        Returns:
+            The engine, or None
+
+        """
+        return self._engine
+
     @property
     def colors(self) -> Sequence[str]:
         """For renderers, this property can be used to retrieve a state type's colors.
@@ -222,16 +1067,165 @@ class Automaton(Generic[C, S]):
         """
         self._state_type.set_colors(colors)
 
-    def __iter__(self) -> Self:
-        """Iterate on the automaton's cells."""
-        return self
+    @property
+    def codes(self) -> memoryview:
+        """A zero-copy view of each cell's index into 'palette', shaped (ymax + 1, xmax + 1).
 
-    def __next__(self) -> Cell:
-        """Call next on the iterator."""
-        if self._current_row < len(self.matrix):
-            result = self.matrix[self._current_row]
-            self._current_row += 1
-            return result
+        The view supports the buffer protocol, so 'numpy.asarray(automaton.codes)' shares memory
+        with the automaton instead of copying it. It stays current as the automaton evolves.
 
-        self._current_row = 0
-        raise StopIteration
+        Returns:
+            A read-only, 2 dimensional memoryview of unsigned bytes
+
+        """
+        view = memoryview(self._codes).toreadonly()
+        return view.cast("B", (self.ymax + 1, self.xmax + 1))
+
+    @property
+    def live(self) -> memoryview:
+        """A zero-copy view of whether each cell is live, shaped (ymax + 1, xmax + 1).
+
+        A cell is live when its state differs from the state type's default state, whatever its
+        color. Like 'codes', the view stays current as the automaton evolves.
+
+        Returns:
+            A read-only, 2 dimensional memoryview of unsigned bytes, 1 for live cells and 0 for
+            the rest
+
+        """
+        view = memoryview(self._live).toreadonly()
+        return view.cast("B", (self.ymax + 1, self.xmax + 1))
+
+    @property
+    def palette(self) -> tuple[Color, ...]:
+        """The colors referenced by 'codes'. Follows changes made through the 'colors' setter.
+
+        States whose colors aren't in 'colors' have their colors added after the rest.
+
+        Returns:
+            A tuple of colors, indexed by the values found in 'codes'
+
+        """
+        return (*self.colors, *self._extra_colors)
+
+    @property
+    def population(self) -> int:
+        """The number of live cells, kept up to date as the automaton changes.
+
+        A cell is live if its state differs from the state type's default state (such as a dead
+        ConwayState), so every state of a multi-state rule other than the default counts, even
+        one drawn in the default state's color.
+
+        Returns:
+            The number of live cells
+
+        """
+        return self._population
+
+    @property
+    def births(self) -> int:
+        """The number of cells that became live in the last generation.
+
+        Cells changed between generations (such as by 'set_state') aren't counted.
+
+        Returns:
+            The number of births
+
+        """
+        return self._births
+
+    @property
+    def deaths(self) -> int:
+        """The number of live cells that stopped being live in the last generation.
+
+        Returns:
+            The number of deaths
+
+        """
+        return self._deaths
+
+    @property
+    def row_population(self) -> memoryview:
+        """A zero-copy, read-only view of the number of live cells in each row.
+
+        Returns:
+            A memoryview of (ymax + 1) unsigned ints
+
+        """
+        return memoryview(self._row_population).toreadonly()
+
+    @property
+    def column_population(self) -> memoryview:
+        """A zero-copy, read-only view of the number of live cells in each column.
+
+        Returns:
+            A memoryview of (xmax + 1) unsigned ints
+
+        """
+        return memoryview(self._column_population).toreadonly()
+
+    @property
+    def bounding_box(self) -> tuple[Coordinate, Coordinate] | None:
+        """The top left and bottom right corners of the smallest rectangle holding every live cell.
+
+        Births extend the box as they happen. After a generation (or a death on its edge), it is
+        found from 'row_population' and 'column_population' rather than by scanning every cell.
+
+        Returns:
+            A pair of coordinates (inclusive), or None if no cells are live
+
+        """
+        if self._bounds_dirty:
+            ys = [y for y, count in enumerate(self._row_population) if count]
+            xs = [x for x, count in enumerate(self._column_population) if count]
+            self._bounds = (Coordinate(xs[0], ys[0]), Coordinate(xs[-1], ys[-1])) if ys else None
+            self._bounds_dirty = False
+        return self._bounds
+
+    def _color_index(self) -> dict[Color, int]:
+        """Map each color to the first index it appears at in 'palette'.
+
+        Colors that aren't in the palette yet are added to it the first time they're looked up,
+        so states whose colors are missing from 'colors' can still be stored.
+
+        Returns:
+            A dict of color -> index
+
+        """
+        return _ColorIndex(self.colors, self._extra_colors)
+
+    def _reset_population(self) -> tuple[array, array]:
+        """Zero the live cell statistics before they're recounted.
+
+        Returns:
+            The per-row and per-column counts, to be filled in
+
+        """
+        rows, columns = self._row_population, self._column_population
+        rows[:] = array("I", [0]) * len(rows)
+        columns[:] = array("I", [0]) * len(columns)
+        self._population = 0
+        self._bounds_dirty = True
+        return rows, columns
+
+    def _encode_all(self) -> None:
+        """Rewrite the color index and liveness of every cell from the states in the matrix."""
+        color_index = self._color_index()
+        codes, live = self._codes, self._live
+        background = self._state_type()
+        rows, columns = self._reset_population()
+        width = self.xmax + 1
+        for i, state in enumerate(self._states()):
+            codes[i] = color_index[state.color]
+            is_live = live[i] = state != background
+            if is_live:
+                rows[i // width] += 1
+                columns[i % width] += 1
+        self._population = sum(rows)
+
+    def __iter__(self) -> Iterator[list[StateData]]:
+        """Iterate on the rows of the automaton's matrix.
+
+        Each call returns an independent iterator, so nested or concurrent iteration is safe.
+        """
+        return iter(self.matrix)
@@ -1,5 +1,6 @@
 """Contains classes and functionality for cells."""
 
+from functools import cache
 from typing import Protocol
 
 from .coordinate import Coordinate
@@ -92,31 +93,12 @@ class MooreCell:
             A list of the cell's neighbors
 
         """
-        neighbors = []
-        for nc in self.neighbors:
-            n = nc + self.coord
-            if n.x < 0 and n.y < 0:
-                n = Coordinate(max_coord.x, max_coord.y)
-            elif n.x > max_coord.x and n.y > max_coord.y:
-                n = Coordinate(0, 0)
-            elif n.x < 0 and n.y > max_coord.y:
-                n = Coordinate(max_coord.x, 0)
-            elif n.y < 0 and n.x > max_coord.x:
-                n = Coordinate(0, max_coord.y)
-            elif n.x > max_coord.x:
-                n = Coordinate(0, n.y)
-            elif n.y < 0:
-                n = Coordinate(n.x, max_coord.y)
-            elif n.y > max_coord.y:
-                n = Coordinate(n.x, 0)
-            elif n.x < 0:
-                n = Coordinate(max_coord.x, n.y)
-            elif n.x > max_coord.x:
-                n = Coordinate(0, n.y)
-
-            neighbors.append(n)
-
-        return neighbors
+        width = max_coord.x + 1
+        height = max_coord.y + 1
+        return [
+            Coordinate((self.coord.x + nc.x) % width, (self.coord.y + nc.y) % height)
+            for nc in self.neighbors
+        ]
 
 
 class NeumannCell:
@@ -161,28 +143,136 @@ class NeumannCell:
             A list of the cell's neighbors
 
         """
-        neighbors = []
-        for nc in self.neighbors:
-            n = nc + self.coord
-            if n.x < 0 and n.y < 0:
-                n = Coordinate(max_coord.x, max_coord.y)
-            elif n.x > max_coord.x and n.y > max_coord.y:
-                n = Coordinate(0, 0)
-            elif n.x < 0 and n.y > max_coord.y:
-                n = Coordinate(max_coord.x, 0)
-            elif n.y < 0 and n.x > max_coord.x:
-                n = Coordinate(0, max_coord.y)
-            elif n.x > max_coord.x:
-                n = Coordinate(0, n.y)
-            elif n.y < 0:
-                n = Coordinate(n.x, max_coord.y)
-            elif n.y > max_coord.y:
-                n = Coordinate(n.x, 0)
-            elif n.x < 0:
-                n = Coordinate(max_coord.x, n.y)
-            elif n.x > max_coord.x:
-                n = Coordinate(0, n.y)
-
-            neighbors.append(n)
-
-        return neighbors
+        width = max_coord.x + 1
+        height = max_coord.y + 1
+        return [
+            Coordinate((self.coord.x + nc.x) % width, (self.coord.y + nc.y) % height)
+            for nc in self.neighbors
+        ]
+
+
+def moore_offsets(radius: int) -> tuple[Coordinate, ...]:
+    """Return the offsets of every cell within a square of a given radius, excluding the center.
+
+    Args:
+        radius (int): The number of cells the neighborhood reaches in each direction
+
+    Returns:
+        A tuple of offsets, ordered row by row
+
+    """
+    return tuple(
+        Coordinate(x, y)
+        for y in range(-radius, radius + 1)
+        for x in range(-radius, radius + 1)
+        if (x, y) != (0, 0)
+    )
+
+
+def neumann_offsets(radius: int) -> tuple[Coordinate, ...]:
+    """Return the offsets of every cell within a diamond of a given radius, excluding the center.
+
+    Args:
+        radius (int): The number of cells the neighborhood reaches in each direction
+
+    Returns:
+        A tuple of offsets, ordered row by row
+
+    """
+    return tuple(
+        offset for offset in moore_offsets(radius) if abs(offset.x) + abs(offset.y) <= radius
+    )
+
+
+def neighborhood_shape(offsets: tuple[Coordinate, ...]) -> tuple[str, int] | None:
+    """Identify a neighborhood that fills a square ("moore") or a diamond ("neumann").
+
+    Args:
+        offsets (Tuple[Coordinate, ...]): The position of each neighbor relative to its cell
+
+    Returns:
+        The shape and radius of the neighborhood, or None if it is neither shape
+
+    """
+    if not offsets:
+        return None
+    radius = max(max(abs(offset.x), abs(offset.y)) for offset in offsets)
+    if set(offsets) == set(moore_offsets(radius)):
+        return "moore", radius
+    if set(offsets) == set(neumann_offsets(radius)):
+        return "neumann", radius
+    return None
+
+
+class RangeCell:
+    """A cell whose neighborhood reaches any distance, wrapping around the edges of the grid.
+
+    Use 'moore_cell' or 'neumann_cell' to get a cell type for a given radius. Engines that count
+    neighbors in bulk (such as those used by LargerThanLifeState) never call 'get_neighbors', so
+    large neighborhoods don't cost memory per cell.
+
+    Attributes:
+        radius (int): The number of cells the neighborhood reaches in each direction
+        neighbors (Tuple[Coordinate, ...]): The offset of each neighbor from the cell
+
+    """
+
+    radius: int = 1
+    neighbors: tuple[Coordinate, ...] = moore_offsets(1)
+
+    def __init__(self, coord: Coordinate) -> None:
+        """Initialize an instance of the RangeCell class."""
+        self.coord = coord
+
+    def get_neighbors(self, max_coord: Coordinate) -> list[Coordinate]:
+        """Get neighbors based on the max coord, wrapping around the other side of the grid.
+
+        Args:
+            max_coord (Coordinate): The maximum coordinate found in the underlying Automaton
+
+        Returns:
+            A list of the cell's neighbors
+
+        """
+        width = max_coord.x + 1
+        height = max_coord.y + 1
+        return [
+            Coordinate((self.coord.x + nc.x) % width, (self.coord.y + nc.y) % height)
+            for nc in self.neighbors
+        ]
+
+
+@cache
+def moore_cell(radius: int) -> type[RangeCell]:
+    """Return a cell type whose neighbors fill a square reaching 'radius' cells from the center.
+
+    Args:
+        radius (int): The number of cells the neighborhood reaches in each direction
+
+    Returns:
+        A subclass of RangeCell
+
+    """
+    return type(
+        f"MooreCell{radius}",
+        (RangeCell,),
+        {"radius": radius, "neighbors": moore_offsets(radius)},
+    )
+
+
+@cache
+def neumann_cell(radius: int) -> type[RangeCell]:
+    """Return a cell type whose neighbors fill a diamond reaching 'radius' cells from the center.
+
+    Args:
+        radius (int): The number of cells the neighborhood reaches in each direction
+
+    Returns:
+        A subclass of RangeCell
+
+    """
+    return type(
+        f"NeumannCell{radius}",
+        (RangeCell,),
+        {"radius": radius, "neighbors": neumann_offsets(radius)},
+    )
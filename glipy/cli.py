@@ -0,0 +1,332 @@
+"""Runs automata from pattern files without rendering, for batch jobs (see 'python -m glipy -h').
+
+Snapshots are written as RLE, or in a binary format made of a header (BINARY_HEADER: the magic
+bytes b"GLPY", then the width, height and generation as little endian unsigned ints) followed by
+each cell's color index (see Automaton.codes), row by row. Binary snapshots written to standard
+output are concatenated, and can be split by reading each header.
+
+Snapshots can also be written as PPM, PGM or PNG images, or as the frames of one animated GIF per
+pattern (see the image module).
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from . import from_conway_life, from_conway_rle, to_conway_rle
+from .image import GifWriter, write_pgm, write_png, write_ppm
+from .registry import get_engine
+from .state import (
+    RULE_ATTRIBUTES,
+    ConwayState,
+    GenerationsState,
+    IsotropicState,
+    LargerThanLifeState,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from .automaton import Automaton
+
+# The header written before each binary snapshot
+BINARY_HEADER = struct.Struct("<4sIIQ")
+BINARY_MAGIC = b"GLPY"
+
+# The image writers, by snapshot format
+IMAGE_WRITERS = {"ppm": write_ppm, "pgm": write_pgm, "png": write_png}
+
+# The pattern file loaders, by file extension
+LOADERS = {
+    ".rle": from_conway_rle,
+    ".life": from_conway_life,
+    ".lif": from_conway_life,
+}
+
+# The state types whose class-level rules loading a pattern may change
+RULE_STATE_TYPES = (ConwayState, GenerationsState, LargerThanLifeState, IsotropicState)
+
+
+def save_rules() -> Callable[[], None]:
+    """Record the class-level rules of every state type that loading a pattern may change.
+
+    Rules are kept on the state types rather than on automata, so each pattern must start from the
+    same rules: a pattern without a rule in its header would otherwise run the previous one's.
+
+    Returns:
+        A function that restores the rules as they were recorded
+
+    """
+    saved = [(state_type, dict(vars(state_type))) for state_type in RULE_STATE_TYPES]
+
+    def restore() -> None:
+        for state_type, attributes in saved:
+            for name in RULE_ATTRIBUTES:
+                if name in attributes:
+                    setattr(state_type, name, attributes[name])
+                elif name in vars(state_type):
+                    delattr(state_type, name)
+
+    return restore
+
+
+def load_pattern(path: Path) -> Automaton:
+    """Build an automaton from a pattern file.
+
+    Args:
+        path (Path): The path to a .rle, .life or .lif file
+
+    Raises:
+        ValueError: The file type isn't supported, or the file couldn't be parsed
+
+    Returns:
+        Automaton
+
+    """
+    loader = LOADERS.get(path.suffix.lower())
+    if loader is None:
+        msg = f"Unsupported pattern file type: '{path.suffix}' (expected {', '.join(LOADERS)})"
+        raise ValueError(msg)
+    return loader(path.read_text())
+
+
+def write_snapshot(
+    automaton: Automaton,
+    stream: IO[bytes],
+    snapshot_format: str,
+    scale: int = 1,
+) -> None:
+    """Write an automaton's current generation to a binary stream.
+
+    Args:
+        automaton (Automaton): The automaton
+        stream (IO[bytes]): The stream to write to
+        snapshot_format (str): "rle", "binary", or an image format from IMAGE_WRITERS
+        scale (int): The width and height of each cell in images, in pixels
+
+    """
+    if snapshot_format in IMAGE_WRITERS:
+        IMAGE_WRITERS[snapshot_format](automaton, stream, scale)
+        return
+    if snapshot_format == "rle":
+        stream.write(f"#C generation {automaton.generation}\n".encode())
+        stream.write(to_conway_rle(automaton).encode())
+        return
+    stream.write(
+        BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            automaton.xmax + 1,
+            automaton.ymax + 1,
+            automaton.generation,
+        ),
+    )
+    stream.write(automaton.codes)
+
+
+def run_pattern(path: Path, args: argparse.Namespace) -> None:
+    """Run one pattern file, writing its snapshots and logging its throughput.
+
+    If the pattern fails, the output file it was writing (a snapshot or a GIF) is removed rather
+    than left incomplete. Snapshots it finished writing are kept.
+
+    Args:
+        path (Path): The pattern file
+        args (argparse.Namespace): The parsed command line arguments
+
+    Raises:
+        ValueError: The pattern can't be evolved by the engine named in the arguments
+
+    """
+    automaton = load_pattern(path)
+    if args.engine == "python":
+        automaton.decompile()
+    else:
+        automaton.compile()
+        if args.engine != "auto" and type(automaton.engine) is not get_engine(args.engine):
+            msg = f"The '{args.engine}' engine can't evolve this pattern's rule"
+            raise ValueError(msg)
+    cells = (automaton.xmax + 1) * (automaton.ymax + 1)
+    every = args.snapshot_every or args.generations
+    width = len(str(args.generations))
+
+    # GIF snapshots are the frames of one animation, which stays open until the pattern is done
+    resources = ExitStack()
+    animation: GifWriter | None = None
+    animation_path: Path | None = None
+    if args.format == "gif":
+        if args.output is None:
+            stream = sys.stdout.buffer
+        else:
+            animation_path = args.output / f"{path.stem}.gif"
+            stream = resources.enter_context(animation_path.open("wb"))
+        animation = resources.enter_context(GifWriter(stream, scale=args.scale))
+
+    def snapshot() -> None:
+        """Write a snapshot of the current generation, to a file or to standard output."""
+        if animation is not None:
+            animation.write(automaton)
+            return
+        if args.output is None:
+            write_snapshot(automaton, sys.stdout.buffer, args.format, args.scale)
+            sys.stdout.buffer.flush()
+            return
+        suffix = {"rle": "rle", "binary": "bin"}.get(args.format, args.format)
+        name = f"{path.stem}.{automaton.generation:0{width}d}.{suffix}"
+        snapshot_path = args.output / name
+        try:
+            with snapshot_path.open("wb") as stream:
+                write_snapshot(automaton, stream, args.format, args.scale)
+        except BaseException:
+            snapshot_path.unlink(missing_ok=True)
+            raise
+
+    def log(elapsed: float) -> None:
+        """Log the throughput so far to standard error.
+
+        Args:
+            elapsed (float): The number of seconds spent evolving so far
+
+        """
+        if args.quiet:
+            return
+        rate = automaton.generation / elapsed if elapsed else float("inf")
+        print(  # noqa: T201
+            f"{path.name}: generation {automaton.generation}/{args.generations}, "
+            f"{rate:.1f} generations/s, {rate * cells:.3g} cells/s, "
+            f"population {automaton.population}",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    try:
+        with resources:
+            if args.snapshot_every or not args.generations:
+                snapshot()
+            elapsed = 0.0
+            while automaton.generation < args.generations:
+                start = time.perf_counter()
+                for _ in range(min(every, args.generations - automaton.generation)):
+                    automaton.evolve()
+                elapsed += time.perf_counter() - start
+                snapshot()
+                log(elapsed)
+    except BaseException:
+        # The animation is closed by now, but only holds the frames written before the failure
+        if animation_path is not None:
+            animation_path.unlink(missing_ok=True)
+        raise
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser.
+
+    Returns:
+        argparse.ArgumentParser
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="glipy",
+        description="Run cellular automata from pattern files without rendering.",
+    )
+    parser.add_argument("patterns", nargs="+", type=Path, help="pattern files (.rle, .life)")
+    parser.add_argument(
+        "-g",
+        "--generations",
+        type=int,
+        default=100,
+        help="the number of generations to run (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-s",
+        "--snapshot-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="write a snapshot every N generations, and of the pattern before it runs "
+        "(default: only after the last generation)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("rle", "binary", "ppm", "pgm", "png", "gif"),
+        default="rle",
+        help="the snapshot format. 'gif' writes every snapshot of a pattern as the frames of one "
+        "animation (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        metavar="PIXELS",
+        help="the width and height of each cell in image snapshots (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="a directory to write one file per snapshot to (default: standard output)",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        default="auto",
+        metavar="ENGINE",
+        help="'auto' evolves with an engine whenever the rule allows it, 'python' always calls "
+        "change_state, and an engine's name (see glipy.registry) fails any pattern that engine "
+        "doesn't evolve (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="don't log throughput to standard error",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv (Optional[Sequence[str]]): The arguments, defaulting to those of the process
+
+    Returns:
+        The exit status
+
+    """
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.generations < 0 or args.snapshot_every < 0:
+        parser.error("--generations and --snapshot-every can't be negative")
+    if args.scale < 1:
+        parser.error("--scale must be at least 1")
+    if args.engine not in {"auto", "python"}:
+        # Checked here rather than with 'choices', since listing the engines reads every installed
+        # package's entry points (see registry.engine_names), which would slow down every start
+        try:
+            get_engine(args.engine)
+        except ValueError as e:
+            parser.error(f"argument -e/--engine: {e}")
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    # A pattern that fails is reported, and the rest of the batch still runs
+    failed = False
+    restore_rules = save_rules()
+    try:
+        for path in args.patterns:
+            restore_rules()
+            try:
+                run_pattern(path, args)
+            except (OSError, ValueError) as e:
+                print(f"{parser.prog}: error: {path}: {e}", file=sys.stderr, flush=True)  # noqa: T201
+                failed = True
+    finally:
+        restore_rules()
+    return 1 if failed else 0
@@ -38,3 +38,25 @@ class Color(str):
 
         hex_color = f"#{hex_color}"
         return super().__new__(cls, hex_color)
+
+
+def gradient(start: Color, end: Color, steps: int) -> list[Color]:
+    """Blend evenly from one color to another.
+
+    Args:
+        start (Color): The first color
+        end (Color): The last color
+        steps (int): The number of colors to return, including 'start' and 'end'
+
+    Returns:
+        A list of colors
+
+    """
+    first = [int(start[i : i + 2], 16) for i in range(1, HEX_LENGTH, 2)]
+    last = [int(end[i : i + 2], 16) for i in range(1, HEX_LENGTH, 2)]
+    colors = []
+    for step in range(steps):
+        t = step / max(steps - 1, 1)
+        channels = (round(a + (b - a) * t) for a, b in zip(first, last, strict=True))
+        colors.append(Color("".join(f"{c:02x}" for c in channels)))
+    return colors
@@ -0,0 +1,167 @@
+"""Stores a grid of cell states compactly, as indexes into a palette of distinct states."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from .state import CellState
+
+# The array typecodes used for indexes, narrowest first, and how many states each can index
+INDEX_TYPECODES = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+
+def widen(cells: array, size: int) -> array:
+    """Return an index array that can hold a given palette size, converting it if it can't.
+
+    Args:
+        cells (array): The array of indexes
+        size (int): The number of states the palette holds
+
+    Raises:
+        OverflowError: No typecode can index that many states
+
+    Returns:
+        The array itself if it's wide enough, or else a wider copy
+
+    """
+    for typecode, limit in INDEX_TYPECODES:
+        if size <= limit:
+            return cells if cells.itemsize >= array(typecode).itemsize else array(typecode, cells)
+    msg = f"Too many distinct states to index ({size})"
+    raise OverflowError(msg)
+
+
+class CompactStates:
+    """A flat, row by row sequence of hashable cell states.
+
+    Each distinct state (by equality) is kept once in 'palette', and each cell holds the index of
+    its state in an array('B'), switching to array('H') once there are more than 256 distinct
+    states (and array('I') past 65536). States that stop being used are kept in the palette.
+
+    Attributes:
+        palette (List[CellState]): The distinct states, indexed by the values in 'cells'
+        cells (array): The index of each cell's state
+
+    """
+
+    def __init__(self, states: Iterable[CellState]) -> None:
+        """Initialize an instance of the CompactStates class.
+
+        Args:
+            states (Iterable[CellState]): Each cell's state, row by row
+
+        Raises:
+            TypeError: A state is not hashable
+
+        """
+        self.palette: list[CellState] = []
+        self._index: dict[CellState, int] = {}
+        self.cells = array("B")
+        for state in states:
+            code = self.encode(state)
+            self.cells = widen(self.cells, len(self.palette))
+            self.cells.append(code)
+
+    @classmethod
+    def filled(cls, state: CellState, size: int) -> CompactStates:
+        """Create a sequence where every cell holds the same state.
+
+        Args:
+            state (CellState): The state
+            size (int): The number of cells
+
+        Returns:
+            CompactStates
+
+        """
+        compact = cls(())
+        compact.encode(state)
+        compact.cells = array("B", bytes(size))
+        return compact
+
+    def encode(self, state: CellState) -> int:
+        """Find the palette index of a state, adding it to the palette if it's new.
+
+        The caller is responsible for widening 'cells' if the palette has grown (see 'widen').
+
+        Args:
+            state (CellState): The state
+
+        Raises:
+            TypeError: The state is not hashable
+
+        Returns:
+            The state's index
+
+        """
+        try:
+            code = self._index.get(state)
+        except TypeError:
+            msg = f"{type(state).__name__} must be hashable to be stored compactly"
+            raise TypeError(msg) from None
+        if code is None:
+            code = self._index[state] = len(self.palette)
+            self.palette.append(state)
+        return code
+
+    def load(self, states: Sequence[CellState], codes: Iterable[int]) -> None:
+        """Replace every cell with states from another palette, such as an engine's.
+
+        Args:
+            states (Sequence[CellState]): The other palette
+            codes (Iterable[int]): Each cell's index into the other palette (a bytes-like object
+            of unsigned bytes, or an array of any index typecode, is copied without decoding it)
+
+        """
+        self.palette = list(states)
+        self._index = {state: code for code, state in reversed(list(enumerate(states)))}
+        cells = array(codes.typecode, codes) if isinstance(codes, array) else array("B", codes)
+        self.cells = widen(cells, len(self.palette))
+
+    def copy(self) -> CompactStates:
+        """Copy the sequence. The states themselves are shared, not copied.
+
+        Returns:
+            CompactStates
+
+        """
+        compact = type(self)(())
+        compact.load(self.palette, self.cells)
+        return compact
+
+    def __getitem__(self, i: int) -> CellState:
+        """Return the state of a cell.
+
+        Args:
+            i (int): The cell's position, row by row
+
+        Returns:
+            CellState
+
+        """
+        return self.palette[self.cells[i]]
+
+    def __setitem__(self, i: int, state: CellState) -> None:
+        """Set the state of a cell.
+
+        Args:
+            i (int): The cell's position, row by row
+            state (CellState): The cell's new state
+
+        """
+        code = self.encode(state)
+        self.cells = widen(self.cells, len(self.palette))
+        self.cells[i] = code
+
+    def __iter__(self) -> Iterator[CellState]:
+        """Iterate on the state of every cell, row by row."""
+        palette = self.palette
+        return (palette[code] for code in self.cells)
+
+    def __len__(self) -> int:
+        """Return the number of cells."""
+        return len(self.cells)
@@ -0,0 +1,557 @@
+"""Evolves an automaton as a grid of tiles, each owned by a separate worker process.
+
+Each worker keeps its tile in a local automaton with a one-cell border (the halo) that mirrors the
+edges of the neighboring tiles. Every generation, workers send their edges to their neighbors
+over TCP or Unix sockets, write the edges they receive into their halo, and then evolve. The
+torus wraps across tiles, so the result matches evolving the whole automaton in one process.
+
+A coordinator (DistributedAutomaton) hands out the tiles, acts as a barrier between batches of
+generations, and gathers snapshots. Workers are started as local processes by default, but can
+run on other machines instead:
+
+    python -m glipy.distributed HOST PORT --bind WORKER_HOST
+
+with the coordinator's authentication key (see DistributedAutomaton.authkey) in the
+GLIPY_AUTHKEY environment variable, as hex.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from itertools import product
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from .automaton import Automaton
+from .compact import CompactStates
+from .coordinate import Coordinate
+from .state import RULE_ATTRIBUTES
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .cell import Cell
+    from .state import CellState
+
+# The directions a tile exchanges its edges in, as (dx, dy) steps between tiles
+DIRECTIONS = tuple((dx, dy) for dy, dx in product((-1, 0, 1), repeat=2) if (dx, dy) != (0, 0))
+
+# The environment variable remote workers read the coordinator's authentication key from
+AUTHKEY_VARIABLE = "GLIPY_AUTHKEY"
+
+# Stores everything a worker needs to build its tile. 'states' holds the tile's states row by row
+# (without a halo), 'rule' maps the name of each of the state type's class-level rule attributes
+# (see state.RULE_ATTRIBUTES) to its value, 'neighbors' maps each direction to the rank of the
+# worker in that direction, and 'socket_dir' is where Unix socket workers listen (None for TCP)
+TileSetup = namedtuple(
+    "TileSetup",
+    [
+        "rank",
+        "cell_type",
+        "origin",
+        "width",
+        "height",
+        "states",
+        "rule",
+        "neighbors",
+        "socket_dir",
+    ],
+)
+
+
+def split(size: int, parts: int) -> list[tuple[int, int]]:
+    """Split a length into nearly equal parts.
+
+    Args:
+        size (int): The length to split
+        parts (int): The number of parts
+
+    Returns:
+        The start and length of each part
+
+    """
+    base, extra = divmod(size, parts)
+    spans = []
+    start = 0
+    for i in range(parts):
+        length = base + (i < extra)
+        spans.append((start, length))
+        start += length
+    return spans
+
+
+def edge(width: int, height: int, direction: tuple[int, int]) -> tuple[Coordinate, Coordinate]:
+    """Find the edge of a tile that its neighbor in a direction needs, in halo coordinates.
+
+    Args:
+        width (int): The width of the tile
+        height (int): The height of the tile
+        direction (Tuple[int, int]): The direction of the neighbor
+
+    Returns:
+        The top left and bottom right corners of the edge (inclusive)
+
+    """
+    dx, dy = direction
+    x0, x1 = {-1: (1, 1), 0: (1, width), 1: (width, width)}[dx]
+    y0, y1 = {-1: (1, 1), 0: (1, height), 1: (height, height)}[dy]
+    return Coordinate(x0, y0), Coordinate(x1, y1)
+
+
+def halo(width: int, height: int, direction: tuple[int, int]) -> Coordinate:
+    """Find where an edge sent in a direction lands in the receiving tile's halo.
+
+    Args:
+        width (int): The width of the receiving tile
+        height (int): The height of the receiving tile
+        direction (Tuple[int, int]): The direction the edge was sent in
+
+    Returns:
+        The top left corner of the edge, in the receiving tile's halo coordinates
+
+    """
+    dx, dy = direction
+    return Coordinate({1: 0, 0: 1, -1: width + 1}[dx], {1: 0, 0: 1, -1: height + 1}[dy])
+
+
+class Tile:
+    """A worker's tile, and its connections to the workers that own the neighboring tiles.
+
+    Attributes:
+        setup (TileSetup): The tile's setup, as sent by the coordinator
+        automaton (Automaton): The tile, surrounded by a one-cell halo
+        peers (Dict[int, Connection]): A connection to each neighboring worker, by rank
+
+    """
+
+    def __init__(self, setup: TileSetup) -> None:
+        """Initialize an instance of the Tile class.
+
+        Args:
+            setup (TileSetup): The tile's setup, as sent by the coordinator
+
+        """
+        self.setup = setup
+        states = list(setup.states)
+        # Workers that weren't forked from the coordinator start with the default rules
+        state_type = type(states[0])
+        for name, value in setup.rule.items():
+            setattr(state_type, name, value)
+        background = state_type()
+        rows = [[background] * (setup.width + 2) for _ in range(setup.height + 2)]
+        for y in range(setup.height):
+            rows[y + 1][1 : setup.width + 1] = states[y * setup.width : (y + 1) * setup.width]
+        self.automaton: Automaton = Automaton(
+            setup.cell_type,
+            rows,
+            setup.width + 1,
+            setup.height + 1,
+            compact=True,
+        )
+        self.automaton.compile()
+        self.peers: dict[int, Connection] = {}
+
+    def connect(self, listener: Listener, addresses: dict[int, Any], authkey: bytes) -> None:
+        """Connect to every neighboring worker.
+
+        Each worker connects to the neighbors with a lower rank and accepts connections from
+        those with a higher rank, so no two workers wait on each other.
+
+        Args:
+            listener (Listener): This worker's listener
+            addresses (Dict[int, Any]): The address of each worker's listener, by rank
+            authkey (bytes): The authentication key shared by every worker
+
+        """
+        rank = self.setup.rank
+        others = set(self.setup.neighbors.values()) - {rank}
+        for peer in sorted(p for p in others if p < rank):
+            connection = Client(addresses[peer], authkey=authkey)
+            connection.send(rank)
+            self.peers[peer] = connection
+        for _ in range(sum(p > rank for p in others)):
+            connection = listener.accept()
+            self.peers[connection.recv()] = connection
+
+    def exchange(self) -> None:
+        """Send this tile's edges to its neighbors, and write theirs into the halo."""
+        setup = self.setup
+        outgoing: dict[int, list[tuple[tuple[int, int], CompactStates]]] = {}
+        for direction, peer in setup.neighbors.items():
+            start, end = edge(setup.width, setup.height, direction)
+            states = [state for row in self.automaton.read(start, end) for state in row]
+            outgoing.setdefault(peer, []).append((direction, CompactStates(states)))
+
+        # Sending happens on another thread, so large edges can't fill both ends' socket buffers
+        # while each side waits for the other to read
+        received = outgoing.pop(setup.rank, [])
+        errors: list[Exception] = []
+
+        def send() -> None:
+            try:
+                for peer, edges in outgoing.items():
+                    self.peers[peer].send(edges)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        sender = threading.Thread(target=send)
+        sender.start()
+        try:
+            for peer in outgoing:
+                received.extend(self.peers[peer].recv())
+        finally:
+            sender.join()
+        # Raising closes this worker's connections (see 'run_worker'), so the neighbors that
+        # didn't get their edges stop waiting for them
+        if errors:
+            raise errors[0]
+
+        regions = []
+        for direction, compact in received:
+            start, end = edge(setup.width, setup.height, (-direction[0], -direction[1]))
+            width = end.x - start.x + 1
+            states = list(compact)
+            rows = [states[i : i + width] for i in range(0, len(states), width)]
+            regions.append((halo(setup.width, setup.height, direction), rows))
+        self.automaton.write_regions(regions)
+
+    def evolve(self, generations: int) -> None:
+        """Evolve the tile, exchanging edges before every generation.
+
+        Args:
+            generations (int): The number of generations to evolve
+
+        """
+        for _ in range(generations):
+            self.exchange()
+            self.automaton.evolve()
+
+    def population(self) -> int:
+        """Count the live cells in the tile, not counting the halo.
+
+        Returns:
+            The number of live cells
+
+        """
+        automaton, width, height = self.automaton, self.setup.width, self.setup.height
+        # The rows inside the tile still include a halo cell at each end
+        live = automaton.live
+        halo = sum(live[y, x] for y in range(1, height + 1) for x in (0, width + 1))
+        return sum(automaton.row_population[1 : height + 1]) - halo
+
+    def states(self) -> CompactStates:
+        """Return the tile's states, without the halo.
+
+        Returns:
+            The states, row by row
+
+        """
+        rows = self.automaton.read(
+            Coordinate(1, 1),
+            Coordinate(self.setup.width, self.setup.height),
+        )
+        return CompactStates(state for row in rows for state in row)
+
+
+def run_worker(address: Any, authkey: bytes, host: str = "127.0.0.1") -> None:  # noqa: ANN401
+    """Connect to a coordinator and run the tile it hands out until it says to stop.
+
+    Args:
+        address (Any): The coordinator's address, as a path (Unix sockets) or (host, port) (TCP)
+        authkey (bytes): The coordinator's authentication key
+        host (str): The host this worker listens for its neighbors on (TCP only)
+
+    """
+    with Client(address, authkey=authkey) as control:
+        setup: TileSetup = control.recv()
+        peers: dict[int, Connection] = {}
+        try:
+            tile = Tile(setup)
+            peers = tile.peers
+            if setup.socket_dir is None:
+                listener = Listener((host, 0), authkey=authkey)
+            else:
+                path = str(Path(setup.socket_dir) / f"worker{setup.rank}.sock")
+                listener = Listener(path, authkey=authkey)
+            with listener:
+                control.send(listener.address)
+                tile.connect(listener, control.recv(), authkey)
+            control.send(("ready",))
+
+            while True:
+                command, *args = control.recv()
+                if command == "step":
+                    tile.evolve(args[0])
+                    control.send(("done", tile.population()))
+                elif command == "gather":
+                    control.send(("states", tile.states()))
+                else:
+                    break
+        except Exception as e:  # noqa: BLE001
+            control.send(("error", f"worker {setup.rank}: {type(e).__name__}: {e}"))
+        finally:
+            # Closing the connections wakes up any neighbor still waiting on this worker's edges
+            for connection in peers.values():
+                connection.close()
+
+
+class DistributedAutomaton:
+    """Evolves an automaton as a grid of tiles, each owned by a worker process.
+
+    The cell type's neighbors must all be within one cell (as with MooreCell and NeumannCell),
+    since tiles only exchange one-cell edges. States are sent between processes with pickle, so
+    the state type must be importable by the workers. The rule the state type follows when the
+    tiles are handed out is sent along with them (see state.RULE_ATTRIBUTES), so workers that
+    weren't forked from this process follow it too.
+
+    Attributes:
+        cell_type (Type[Cell]): The type of cell the automaton is working with
+        state_type (Type[CellState]): The type of cell state the automaton is working with
+        xmax (int): The maximum x coordinate
+        ymax (int): The maximum y coordinate
+        topology (str): How the edges of the automaton join, which is always "torus"
+        tiles (Tuple[int, int]): The number of tiles across and down
+        generation (int): The generation we're at in the simulation
+        population (int): The number of live cells, as of the last batch of generations
+        authkey (bytes): The key workers authenticate with
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        automaton: Automaton,
+        tiles: tuple[int, int] = (2, 2),
+        family: str = "AF_INET",
+        host: str = "127.0.0.1",
+        spawn: bool = True,
+        *,
+        start_method: str | None = None,
+    ) -> None:
+        """Initialize an instance of the DistributedAutomaton class, and start its workers.
+
+        Args:
+            automaton (Automaton): The automaton to split into tiles. Its current generation is
+            copied, so it can be discarded afterwards
+            tiles (Tuple[int, int]): The number of tiles across and down
+            family (str): "AF_INET" for TCP sockets, or "AF_UNIX" for Unix sockets
+            host (str): The host the coordinator (and local workers) listen on, for TCP
+            spawn (bool): Whether to start a local process for each tile. If False, the
+            coordinator waits for workers to connect from elsewhere (see 'run_worker')
+            start_method (Optional[str]): How local workers are started ("fork", "spawn" or
+            "forkserver"), defaulting to multiprocessing's default for the platform
+
+        Raises:
+            ValueError: The tiles don't fit the automaton, the automaton isn't a torus, the cell
+            type's neighbors reach further than one cell, or the family is unknown
+
+        """
+        if automaton.topology != "torus":
+            # Tiles fill their halos from the neighboring tiles, wrapping across the board
+            msg = f"Only a torus can be split into tiles, not a {automaton.topology}"
+            raise ValueError(msg)
+        offsets = getattr(automaton.cell_type, "neighbors", ())
+        if any(max(abs(offset.x), abs(offset.y)) > 1 for offset in offsets):
+            msg = f"{automaton.cell_type.__name__} has neighbors further than one cell away"
+            raise ValueError(msg)
+        if not (0 < tiles[0] <= automaton.xmax + 1 and 0 < tiles[1] <= automaton.ymax + 1):
+            msg = f"Can't split a {automaton.xmax + 1}x{automaton.ymax + 1} automaton into {tiles}"
+            raise ValueError(msg)
+        if family not in {"AF_INET", "AF_UNIX"}:
+            msg = f"Unknown socket family: '{family}' (expected AF_INET or AF_UNIX)"
+            raise ValueError(msg)
+
+        self.cell_type: type[Cell] = automaton.cell_type
+        self.state_type = automaton.state_type
+        self.xmax = automaton.xmax
+        self.ymax = automaton.ymax
+        self.topology = automaton.topology
+        self.tiles = tiles
+        self.generation = automaton.generation
+        self.population = automaton.population
+        self.authkey = os.urandom(32)
+
+        self._socket_dir = tempfile.mkdtemp() if family == "AF_UNIX" else None
+        if self._socket_dir is None:
+            self._listener = Listener((host, 0), authkey=self.authkey)
+        else:
+            address = str(Path(self._socket_dir) / "coordinator.sock")
+            self._listener = Listener(address, authkey=self.authkey)
+        self._workers: list[Connection] = []
+        self._processes: list[multiprocessing.Process] = []
+
+        count = tiles[0] * tiles[1]
+        if spawn:
+            context = multiprocessing.get_context(start_method)
+            for _ in range(count):
+                process = context.Process(
+                    target=run_worker,
+                    args=(self._listener.address, self.authkey, host),
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+        try:
+            self._start(automaton)
+        except BaseException:
+            self.close()
+            raise
+
+    def _start(self, automaton: Automaton) -> None:
+        """Accept a connection from each worker, and hand out the tiles.
+
+        Args:
+            automaton (Automaton): The automaton to split into tiles
+
+        """
+        columns = split(self.xmax + 1, self.tiles[0])
+        rows = split(self.ymax + 1, self.tiles[1])
+        rule = {
+            name: getattr(self.state_type, name)
+            for name in RULE_ATTRIBUTES
+            if hasattr(self.state_type, name)
+        }
+        for rank in range(self.tiles[0] * self.tiles[1]):
+            worker = self._listener.accept()
+            self._workers.append(worker)
+            ty, tx = divmod(rank, self.tiles[0])
+            (x, width), (y, height) = columns[tx], rows[ty]
+            region = automaton.read(Coordinate(x, y), Coordinate(x + width - 1, y + height - 1))
+            neighbors = {
+                (dx, dy): (ty + dy) % self.tiles[1] * self.tiles[0] + (tx + dx) % self.tiles[0]
+                for dx, dy in DIRECTIONS
+            }
+            worker.send(
+                TileSetup(
+                    rank,
+                    self.cell_type,
+                    Coordinate(x, y),
+                    width,
+                    height,
+                    CompactStates(state for row in region for state in row),
+                    rule,
+                    neighbors,
+                    self._socket_dir,
+                ),
+            )
+
+        addresses = dict(enumerate(self._receive()))
+        for worker in self._workers:
+            worker.send(addresses)
+        self._receive()
+
+    def _receive(self) -> list[Any]:
+        """Wait for a reply from every worker (the barrier between commands).
+
+        Raises:
+            RuntimeError: A worker failed, or disconnected
+
+        Returns:
+            Each worker's reply, by rank
+
+        """
+        replies = []
+        for rank, worker in enumerate(self._workers):
+            try:
+                reply = worker.recv()
+            except EOFError:
+                msg = f"Worker {rank} disconnected"
+                raise RuntimeError(msg) from None
+            if isinstance(reply, tuple) and reply and reply[0] == "error":
+                raise RuntimeError(reply[1])
+            replies.append(reply)
+        return replies
+
+    def evolve(self, generations: int = 1) -> None:
+        """Evolve every tile, returning once they have all finished.
+
+        Args:
+            generations (int): The number of generations to evolve
+
+        """
+        for worker in self._workers:
+            worker.send(("step", generations))
+        self.population = sum(population for _, population in self._receive())
+        self.generation += generations
+
+    def gather(self, compact: bool = False) -> Automaton:
+        """Collect every tile into a single automaton (a snapshot of the current generation).
+
+        Args:
+            compact (bool): Whether the snapshot stores its states compactly
+
+        Returns:
+            Automaton
+
+        """
+        for worker in self._workers:
+            worker.send(("gather",))
+        grid: list[list[CellState]] = [[] for _ in range(self.ymax + 1)]
+        rows = split(self.ymax + 1, self.tiles[1])
+        columns = split(self.xmax + 1, self.tiles[0])
+        for rank, (_, states) in enumerate(self._receive()):
+            ty, tx = divmod(rank, self.tiles[0])
+            (y, height), (_, width) = rows[ty], columns[tx]
+            flat = list(states)
+            for i in range(height):
+                grid[y + i].extend(flat[i * width : (i + 1) * width])
+
+        automaton: Automaton = Automaton(
+            self.cell_type,
+            grid,
+            self.xmax,
+            self.ymax,
+            compact,
+            topology=self.topology,
+        )
+        automaton.generation = self.generation
+        return automaton
+
+    def close(self) -> None:
+        """Stop the workers and release the sockets."""
+        for worker in self._workers:
+            with contextlib.suppress(OSError):
+                worker.send(("stop",))
+            worker.close()
+        self._workers = []
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._listener.close()
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    def __enter__(self) -> Self:
+        """Use the automaton as a context manager, which closes it on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the automaton."""
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a glipy worker for a remote coordinator.")
+    parser.add_argument("host", help="the coordinator's host")
+    parser.add_argument("port", type=int, help="the coordinator's port")
+    parser.add_argument(
+        "--bind",
+        default="127.0.0.1",
+        help="the address this worker listens on, which its neighbors must be able to reach",
+    )
+    args = parser.parse_args()
+    run_worker((args.host, args.port), bytes.fromhex(os.environ[AUTHKEY_VARIABLE]), args.bind)
@@ -0,0 +1,250 @@
+"""Evolves one dimensional, two state automata with three cell neighborhoods (elementary rules).
+
+An elementary rule is numbered 0 to 255 (Wolfram's numbering): bit n of the number is a cell's
+next state when its left neighbor, itself and its right neighbor, read as a binary number, make
+n. Rule 30 and rule 110 are the best known.
+
+The row of cells is stored as a single Python integer, where bit i is cell i, so every cell is
+evolved at once by a handful of shifts and bitwise operations on the whole row, each a loop over
+machine words in C. The rule is applied as three levels of multiplexers, choosing between its
+bits by the right neighbor, the cell and the left neighbor in turn:
+
+    mux(select, a, b) = b ^ (select & (a ^ b))
+
+which picks a's bits where select is set, and b's elsewhere.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .color import Color
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+BOUNDARIES = ("wrap", "fixed")
+# The color of dead and live cells, indexed by the values found in 'codes'
+COLORS = (Color("#315771"), Color("#F6AE2D"))
+
+# Turns the characters of a binary number into cells, and back
+_TO_CELLS = bytes.maketrans(b"01", b"\0\1")
+_FROM_CELLS = bytes.maketrans(b"\0\1", b"01")
+
+
+def pack(cells: bytes) -> int:
+    """Pack a row of cells into an integer, where bit i is cell i.
+
+    Args:
+        cells (bytes): Each cell's state, 0 (dead) or 1 (alive)
+
+    Returns:
+        int
+
+    """
+    if not cells:
+        return 0
+    return int(cells.translate(_FROM_CELLS)[::-1], 2)
+
+
+def unpack(row: int, width: int) -> bytes:
+    """Unpack an integer into a row of cells (the reverse of 'pack').
+
+    Args:
+        row (int): The packed row
+        width (int): The number of cells
+
+    Returns:
+        Each cell's state, 0 (dead) or 1 (alive)
+
+    """
+    return format(row, f"0{width}b").encode()[::-1].translate(_TO_CELLS)
+
+
+@dataclass(frozen=True)
+class Spacetime:
+    """The generations of a one dimensional automaton, one row per generation, top to bottom.
+
+    Spacetime diagrams can be exported like an automaton (see the image module).
+
+    Attributes:
+        codes (memoryview): A read-only (ymax + 1, xmax + 1) view of each cell's state
+        palette (Tuple[Color, ...]): The colors of dead and live cells
+        xmax (int): The maximum x coordinate
+        ymax (int): The maximum y coordinate (the number of generations, less one)
+
+    """
+
+    codes: memoryview
+    palette: tuple[Color, ...]
+    xmax: int
+    ymax: int
+
+
+class ElementaryAutomaton:
+    """A row of cells that evolves by an elementary rule.
+
+    The row either wraps around (its first and last cells are neighbors), or has a fixed
+    boundary: a cell past each end that is always in the same state.
+
+    Attributes:
+        rule (int): The rule's number, from 0 to 255
+        width (int): The number of cells
+        boundary (str): One of BOUNDARIES
+        edge (int): The state of the cells past each end with a fixed boundary
+        generation (int): The generation we're at in the simulation
+        row (int): The packed cells, where bit i is cell i
+        xmax (int): The maximum x coordinate
+        ymax (int): The maximum y coordinate, always 0
+        population (int): The number of live cells
+        codes (memoryview): A read-only (1, width) view of each cell's state
+        palette (Tuple[Color, ...]): The colors of dead and live cells
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rule: int,
+        width: int,
+        cells: Iterable[int] | None = None,
+        *,
+        boundary: str = "wrap",
+        edge: int = 0,
+        palette: tuple[Color, ...] = COLORS,
+    ) -> None:
+        """Initialize an instance of the ElementaryAutomaton class.
+
+        Args:
+            rule (int): The rule's number, from 0 to 255
+            width (int): The number of cells
+            cells (Optional[Iterable[int]]): Each cell's state, 0 (dead) or 1 (alive), such as a
+            soup (see the soup module). Defaults to a single live cell in the middle
+            boundary (str): One of BOUNDARIES
+            edge (int): The state of the cells past each end with a fixed boundary
+            palette (Tuple[Color, ...]): The colors of dead and live cells
+
+        Raises:
+            ValueError: A parameter is out of range
+
+        """
+        if not 0 <= rule <= 255:  # noqa: PLR2004
+            msg = f"Elementary rules are numbered from 0 to 255 (got {rule})"
+            raise ValueError(msg)
+        if width < 1:
+            msg = f"The row must have at least 1 cell (got {width})"
+            raise ValueError(msg)
+        if boundary not in BOUNDARIES:
+            msg = f"Invalid boundary: '{boundary}' (expected one of {', '.join(BOUNDARIES)})"
+            raise ValueError(msg)
+        if edge not in {0, 1}:
+            msg = f"The edge state must be 0 or 1 (got {edge})"
+            raise ValueError(msg)
+        self.rule = rule
+        self.width = width
+        self.boundary = boundary
+        self.edge = edge
+        self.palette = palette
+        self.generation = 0
+        self._mask = (1 << width) - 1
+        if cells is None:
+            self.row = 1 << width // 2
+        else:
+            cells = bytes(cells)
+            if len(cells) != width:
+                msg = f"Expected {width} cells (got {len(cells)})"
+                raise ValueError(msg)
+            self.row = pack(cells)
+
+    @property
+    def xmax(self) -> int:
+        """The maximum x coordinate."""
+        return self.width - 1
+
+    @property
+    def ymax(self) -> int:
+        """The maximum y coordinate, always 0."""
+        return 0
+
+    @property
+    def population(self) -> int:
+        """The number of live cells."""
+        return self.row.bit_count()
+
+    @property
+    def cells(self) -> bytes:
+        """Each cell's state, 0 (dead) or 1 (alive)."""
+        return unpack(self.row, self.width)
+
+    @property
+    def codes(self) -> memoryview:
+        """A read-only (1, width) view of each cell's state, for exporters (see Automaton.codes).
+
+        Returns:
+            A read-only, 2 dimensional memoryview of unsigned bytes
+
+        """
+        return memoryview(self.cells).cast("B", (1, self.width))
+
+    def __getitem__(self, x: int) -> int:
+        """Return the state of a cell, 0 (dead) or 1 (alive)."""
+        if not 0 <= x < self.width:
+            msg = f"Cell {x} is outside the row (0 to {self.width - 1})"
+            raise IndexError(msg)
+        return self.row >> x & 1
+
+    def __setitem__(self, x: int, state: int) -> None:
+        """Set the state of a cell, 0 (dead) or 1 (alive)."""
+        if not 0 <= x < self.width:
+            msg = f"Cell {x} is outside the row (0 to {self.width - 1})"
+            raise IndexError(msg)
+        self.row = self.row & ~(1 << x) | (1 if state else 0) << x
+
+    def evolve(self, generations: int = 1) -> None:
+        """Evolve the row once, or a number of times.
+
+        Args:
+            generations (int): The number of generations
+
+        """
+        row, mask, top = self.row, self._mask, self.width - 1
+        wrap = self.boundary == "wrap"
+        left_edge, right_edge = self.edge, self.edge << top
+        # The rule's bits as rows where every cell is 0 or 1, by whether the right neighbor is
+        # dead (b0) or alive (b1), for each pair of left neighbor and cell states
+        bits = [mask if self.rule >> n & 1 else 0 for n in range(8)]
+        pairs = [(b0, b0 ^ b1) for b0, b1 in zip(bits[0::2], bits[1::2], strict=True)]
+        for _ in range(generations):
+            if wrap:
+                left_edge, right_edge = row >> top, (row & 1) << top
+            # Cell i's left neighbor is cell i - 1, and its right neighbor is cell i + 1
+            left = (row << 1 | left_edge) & mask
+            right = row >> 1 | right_edge
+            # Choose by the right neighbor's state, then the cell's own, then the left neighbor's
+            p0, p1, p2, p3 = (b0 ^ (right & flip) for b0, flip in pairs)
+            low = p0 ^ (row & (p1 ^ p0))
+            high = p2 ^ (row & (p3 ^ p2))
+            row = low ^ (left & (high ^ low))
+        self.row = row
+        self.generation += generations
+
+    def spacetime(self, generations: int) -> Spacetime:
+        """Evolve the row, collecting every generation into a spacetime diagram.
+
+        Args:
+            generations (int): The number of generations to evolve
+
+        Returns:
+            A diagram of generations + 1 rows, starting with the current generation
+
+        """
+        diagram = bytearray(self.cells)
+        for _ in range(generations):
+            self.evolve()
+            diagram += self.cells
+        return Spacetime(
+            memoryview(bytes(diagram)).cast("B", (generations + 1, self.width)),
+            self.palette,
+            self.width - 1,
+            generations,
+        )
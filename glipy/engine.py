@@ -0,0 +1,541 @@
+"""Contains engines, which evolve an automaton in bulk rather than one cell at a time."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .cell import neighborhood_shape
+from .topology import padding_map
+
+if TYPE_CHECKING:
+    from array import array
+    from collections.abc import Iterable, Sequence
+
+    from .color import Color
+    from .coordinate import Coordinate
+    from .state import CellState, GenerationsState, IsotropicState, LargerThanLifeState
+    from .table import TransitionTable
+
+
+class Engine:
+    """The base class for engines.
+
+    An engine holds an automaton's states as a flat, row major array of codes, where each code is
+    an index into the 'states' attribute. Subclasses implement 'step'.
+
+    Attributes:
+        states (Tuple[CellState, ...]): The distinct states, indexed by their code
+
+    """
+
+    def __init__(self, states: tuple[CellState, ...]) -> None:
+        """Initialize an instance of the Engine class.
+
+        Args:
+            states (Tuple[CellState, ...]): The distinct states, indexed by their code
+
+        """
+        self.states = states
+        self._codes = {state: code for code, state in enumerate(states)}
+
+    def encode(self, state: CellState) -> int | None:
+        """Return the code of a state, or None if the engine can't represent it.
+
+        Args:
+            state (CellState): The state to look up
+
+        Returns:
+            The state's code, if any
+
+        """
+        try:
+            return self._codes.get(state)
+        except TypeError:
+            return None
+
+    def encode_all(self, states: Iterable[CellState]) -> np.ndarray | None:
+        """Encode a sequence of states, such as every state in a matrix (row by row).
+
+        Args:
+            states (Iterable[CellState]): The states to encode
+
+        Returns:
+            A flat array of state codes, or None if the engine can't represent one of the states
+
+        """
+        codes = [self.encode(state) for state in states]
+        if None in codes:
+            return None
+        return np.array(codes, dtype=np.uint8)
+
+    def paint(self, codes: np.ndarray, color_index: dict[Color, int], out: array) -> None:
+        """Write the color index of each cell's state into a buffer.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+            color_index (Dict[Color, int]): Maps each color to its index
+            out (array): The buffer of color indices to write to
+
+        """
+        colors = np.array([color_index[state.color] for state in self.states], dtype=np.uint8)
+        np.frombuffer(out, dtype=np.uint8)[:] = colors[codes]
+
+    def mark(self, codes: np.ndarray, background: int | None, out: array) -> None:
+        """Write whether each cell is live, meaning not in the background state, into a buffer.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+            background (Optional[int]): The code of the background state, or None if the engine
+            can't represent it
+            out (array): The buffer to write 1 (live) or 0 to
+
+        """
+        np.frombuffer(out, dtype=np.uint8)[:] = codes != background
+
+    def translate(self, other: Engine) -> np.ndarray | None:
+        """Build a table that converts another engine's codes into this engine's codes.
+
+        Args:
+            other (Engine): The engine whose codes should be converted
+
+        Returns:
+            An array indexed by the other engine's codes, or None if this engine can't represent
+            one of its states
+
+        """
+        codes = self.encode_all(other.states)
+        if codes is None:
+            return None
+        return codes
+
+    def blit(
+        self,
+        grid: np.ndarray,
+        region: tuple[list[int], list[int]],
+        source: np.ndarray | int,
+        mode: str,
+        background: int | None,
+    ) -> None:
+        """Write codes into a region of a grid of codes, in place.
+
+        Args:
+            grid (np.ndarray): A 2 dimensional view of each cell's state code
+            region (Tuple[List[int], List[int]]): The rows and columns of the region
+            source (Union[np.ndarray, int]): The codes to write, or one code for every cell
+            mode (str): One of "overwrite", "or" or "xor" (see Automaton.paste)
+            background (Optional[int]): The code of the background state, if this engine has one
+
+        """
+        index = np.ix_(*region)
+        if mode == "overwrite" or background is None:
+            grid[index] = source
+            return
+        source = np.broadcast_to(source, (len(region[0]), len(region[1])))
+        target = grid[index]
+        written = source != background
+        if mode == "xor":
+            occupied = target != background
+            target[written & occupied] = background
+            written &= ~occupied
+        target[written] = source[written]
+        grid[index] = target
+
+    def step(self, codes: np.ndarray) -> np.ndarray:
+        """Compute the next generation of codes.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+
+        Returns:
+            The flat array of each cell's next state code
+
+        """
+        raise NotImplementedError
+
+
+class TableEngine(Engine):
+    """Evolves any cell type by looking up each cell's neighborhood in a TransitionTable."""
+
+    def __init__(
+        self,
+        table: TransitionTable,
+        positions: Sequence[Sequence[int]],
+        edge: CellState | None = None,
+    ) -> None:
+        """Initialize an instance of the TableEngine class.
+
+        Args:
+            table (TransitionTable): The compiled transitions
+            positions (Sequence[Sequence[int]]): The position of each cell's neighbors, counting
+            row by row
+            edge (Optional[CellState]): The state of the cells past a dead edge, which are at the
+            position just past the last cell (see the topology module). It must be in the table
+
+        """
+        super().__init__(table.states)
+        self.table = table
+        self._neighbor_index = np.array(positions, dtype=np.intp)
+        self._edge = None if edge is None else self.encode(edge)
+
+    def step(self, codes: np.ndarray) -> np.ndarray:
+        """Compute the next generation of codes.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+
+        Returns:
+            The flat array of each cell's next state code
+
+        """
+        return self.table.step(codes, self._neighbor_index, self._edge)
+
+
+def padding(max_coord: Coordinate, radius: int, topology: str) -> tuple[np.ndarray, np.ndarray]:
+    """Precompute where the cells added past a grid's edges are copied from (see 'pad').
+
+    Args:
+        max_coord (Coordinate): The maximum coordinate of the grid
+        radius (int): The number of cells added past each edge
+        topology (str): One of topology.TOPOLOGIES
+
+    Returns:
+        The position of each added cell in the padded grid, and of the cell it copies, leaving
+        out those past a dead edge (see topology.padding_map)
+
+    """
+    height, width = max_coord.y + 1, max_coord.x + 1
+    shape = (height + 2 * radius, width + 2 * radius)
+    sources = np.array(padding_map(max_coord, radius, topology), dtype=np.intp).reshape(shape)
+    border = sources < height * width
+    border[radius : radius + height, radius : radius + width] = False
+    targets = np.flatnonzero(border)
+    # Positions in the grid, moved to where those cells are in the padded grid
+    ys, xs = np.divmod(sources.reshape(-1)[targets], width)
+    return targets, (ys + radius) * shape[1] + xs + radius
+
+
+def pad(grid: np.ndarray, radius: int, border: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Copy a grid with cells added past its edges, following the grid's topology.
+
+    Only the added cells are gathered, so padding costs little more than copying the grid. Cells
+    past a dead edge are 0.
+
+    Args:
+        grid (np.ndarray): A 2 dimensional array
+        radius (int): The number of cells added past each edge
+        border (Tuple[np.ndarray, np.ndarray]): Where the added cells are copied from (see
+        'padding')
+
+    Returns:
+        The padded grid
+
+    """
+    height, width = grid.shape
+    padded = np.zeros((height + 2 * radius, width + 2 * radius), dtype=grid.dtype)
+    padded[radius : radius + height, radius : radius + width] = grid
+    flat = padded.reshape(-1)
+    targets, sources = border
+    flat[targets] = flat[sources]
+    return padded
+
+
+def count_neighbors(padded: np.ndarray, offsets: Iterable[Coordinate], radius: int) -> np.ndarray:
+    """Count each cell's live neighbors.
+
+    Args:
+        padded (np.ndarray): A 2 dimensional array of 0 (dead) or 1 (alive), with 'radius' cells
+        added past each edge (see 'pad')
+        offsets (Iterable[Coordinate]): The position of each neighbor relative to its cell
+        radius (int): The number of cells added past each edge
+
+    Returns:
+        A 2 dimensional array of neighbor counts
+
+    """
+    height, width = padded.shape[0] - 2 * radius, padded.shape[1] - 2 * radius
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for offset in offsets:
+        y, x = radius + offset.y, radius + offset.x
+        counts += padded[y : y + height, x : x + width]
+    return counts
+
+
+def census(live: array, width: int, rows: array, columns: array) -> int:
+    """Count the live cells, by row and by column.
+
+    Args:
+        live (array): The flat buffer of whether each cell is live (see 'Engine.mark')
+        width (int): The number of cells in a row
+        rows (array): An array('I') to write the count of each row to
+        columns (array): An array('I') to write the count of each column to
+
+    Returns:
+        The total count
+
+    """
+    grid = np.frombuffer(live, dtype=np.bool_).reshape(-1, width)
+    row_counts = grid.sum(axis=1)
+    np.frombuffer(rows, dtype=np.uintc)[:] = row_counts
+    np.frombuffer(columns, dtype=np.uintc)[:] = grid.sum(axis=0)
+    return int(row_counts.sum())
+
+
+def turnover(previous: bytes, live: array) -> int:
+    """Count the cells that became live, or stopped being live, since a previous generation.
+
+    Args:
+        previous (bytes): Whether each cell was live in the previous generation
+        live (array): The flat buffer of whether each cell is live now
+
+    Returns:
+        The number of cells whose liveness changed
+
+    """
+    was_live = np.frombuffer(previous, dtype=np.uint8)
+    return int(np.count_nonzero(was_live != np.frombuffer(live, dtype=np.uint8)))
+
+
+def summed_area_table(grid: np.ndarray) -> np.ndarray:
+    """Build a table where [y, x] holds the sum of every value in grid[:y, :x].
+
+    Args:
+        grid (np.ndarray): A 2 dimensional array
+
+    Returns:
+        A 2 dimensional array, one larger than 'grid' in each dimension
+
+    """
+    table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int32)
+    np.cumsum(grid, axis=0, dtype=np.int32, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def square_sum(padded: np.ndarray, radius: int) -> np.ndarray:
+    """Count the live cells in the square around each cell, including the cell itself.
+
+    The count is read from a summed-area table in four lookups, however large the radius.
+
+    Args:
+        padded (np.ndarray): A 2 dimensional array of 0 (dead) or 1 (alive), with 'radius' cells
+        added past each edge (see 'pad')
+        radius (int): The number of cells the square reaches in each direction
+
+    Returns:
+        A 2 dimensional array of counts
+
+    """
+    height, width = padded.shape[0] - 2 * radius, padded.shape[1] - 2 * radius
+    side = 2 * radius + 1
+    table = summed_area_table(padded)
+    return (
+        table[side : side + height, side : side + width]
+        - table[:height, side : side + width]
+        - table[side : side + height, :width]
+        + table[:height, :width]
+    )
+
+
+def diamond_sum(padded: np.ndarray, radius: int) -> np.ndarray:
+    """Count the live cells in the diamond around each cell, including the cell itself.
+
+    Rotating the grid 45 degrees (u = x + y, v = x - y) turns every diamond into a square, which
+    is read from a summed-area table of the rotated grid in four lookups, however large the radius.
+
+    Args:
+        padded (np.ndarray): A 2 dimensional array of 0 (dead) or 1 (alive), with 'radius' cells
+        added past each edge (see 'pad')
+        radius (int): The number of cells the diamond reaches in each direction
+
+    Returns:
+        A 2 dimensional array of counts
+
+    """
+    padded_height, padded_width = padded.shape
+    ys, xs = np.indices(padded.shape)
+    rotated = np.zeros((padded_height + padded_width,) * 2, dtype=np.uint8)
+    rotated[xs + ys, xs - ys + padded_height - 1] = padded
+    table = summed_area_table(rotated)
+
+    ys, xs = np.indices((padded_height - 2 * radius, padded_width - 2 * radius))
+    u = xs + ys + radius
+    v = xs - ys + padded_height - 1 - radius
+    side = 2 * radius + 1
+    return table[u + side, v + side] - table[u, v + side] - table[u + side, v] + table[u, v]
+
+
+class GenerationsEngine(Engine):
+    """Evolves a GenerationsState automaton, including its refractory (dying) states, in bulk.
+
+    The rules are read from the state type every generation, so changes made to its class
+    attributes take effect the same way they do for 'change_state'.
+    """
+
+    def __init__(
+        self,
+        state_type: type[GenerationsState],
+        offsets: tuple[Coordinate, ...],
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> None:
+        """Initialize an instance of the GenerationsEngine class.
+
+        Args:
+            state_type (Type[GenerationsState]): The state type to read rules from
+            offsets (Tuple[Coordinate, ...]): The position of each neighbor relative to its cell
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        """
+        super().__init__(tuple(state_type(value) for value in range(state_type.state_count)))
+        self.state_type = state_type
+        self.offsets = offsets
+        self.shape = (max_coord.y + 1, max_coord.x + 1)
+        self.max_count = len(offsets)
+        self.radius = max((max(abs(o.x), abs(o.y)) for o in offsets), default=0)
+        self._padding = padding(max_coord, self.radius, topology)
+
+    def count(self, alive: np.ndarray) -> np.ndarray:
+        """Count each cell's live neighbors.
+
+        Args:
+            alive (np.ndarray): A 2 dimensional array of 0 (dead) or 1 (alive)
+
+        Returns:
+            A 2 dimensional array of neighbor counts
+
+        """
+        return count_neighbors(pad(alive, self.radius, self._padding), self.offsets, self.radius)
+
+    def step(self, codes: np.ndarray) -> np.ndarray:
+        """Compute the next generation of codes.
+
+        A state's code is its value: 0 is dead, 1 is alive and anything greater is dying.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+
+        Returns:
+            The flat array of each cell's next state code
+
+        """
+        grid = codes.reshape(self.shape)
+        counts = self.count((grid == 1).view(np.uint8))
+
+        rules = np.zeros((2, self.max_count + 1), dtype=bool)
+        rules[0, [r for r in self.state_type.birth_rules if r <= self.max_count]] = True
+        rules[1, [r for r in self.state_type.survival_rules if r <= self.max_count]] = True
+
+        # Every live or dying cell ages by one, wrapping back to dead after the last state
+        next_grid = grid + 1
+        next_grid[next_grid >= self.state_type.state_count] = 0
+        next_grid[(grid == 0) & ~rules[0, counts]] = 0
+        next_grid[(grid == 1) & rules[1, counts]] = 1
+        return next_grid.reshape(-1)
+
+
+class LargerThanLifeEngine(GenerationsEngine):
+    """Evolves a LargerThanLifeState automaton, counting neighbors with summed-area tables.
+
+    The cost per cell doesn't depend on the radius of the neighborhood, and neighbor lists are
+    never built.
+    """
+
+    def __init__(
+        self,
+        state_type: type[LargerThanLifeState],
+        offsets: tuple[Coordinate, ...],
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> None:
+        """Initialize an instance of the LargerThanLifeEngine class.
+
+        Args:
+            state_type (Type[LargerThanLifeState]): The state type to read rules from
+            offsets (Tuple[Coordinate, ...]): The position of each neighbor relative to its cell.
+            These must fill a square or a diamond (see 'neighborhood_shape')
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        Raises:
+            ValueError: The neighborhood is not a square or a diamond
+
+        """
+        super().__init__(state_type, offsets, max_coord, topology)
+        shape = neighborhood_shape(offsets)
+        if shape is None:
+            msg = "Larger than Life neighborhoods must be a square or a diamond"
+            raise ValueError(msg)
+        self.neighborhood, self.radius = shape
+        self.max_count = len(offsets) + 1
+
+    def count(self, alive: np.ndarray) -> np.ndarray:
+        """Count each cell's live neighbors, including the cell itself if 'middle' is set.
+
+        Args:
+            alive (np.ndarray): A 2 dimensional array of 0 (dead) or 1 (alive)
+
+        Returns:
+            A 2 dimensional array of neighbor counts
+
+        """
+        padded = pad(alive, self.radius, self._padding)
+        if self.neighborhood == "moore":
+            counts = square_sum(padded, self.radius)
+        else:
+            counts = diamond_sum(padded, self.radius)
+        if not self.state_type.middle:
+            counts -= alive
+        return counts
+
+
+class IsotropicEngine(Engine):
+    """Evolves an IsotropicState automaton by looking up 3x3 neighborhoods in a 512 entry table.
+
+    The rules are read from the state type every generation, so changes made to its class
+    attributes take effect the same way they do for 'change_state'.
+    """
+
+    def __init__(
+        self,
+        state_type: type[IsotropicState],
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> None:
+        """Initialize an instance of the IsotropicEngine class.
+
+        Args:
+            state_type (Type[IsotropicState]): The state type to read rules from
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        """
+        super().__init__((state_type(alive=False), state_type(alive=True)))
+        self.state_type = state_type
+        self.shape = (max_coord.y + 1, max_coord.x + 1)
+        self._padding = padding(max_coord, 1, topology)
+
+    def step(self, codes: np.ndarray) -> np.ndarray:
+        """Compute the next generation of codes (0 is dead, 1 is alive).
+
+        Each cell's 9 bit neighborhood index (see rule.CENTER_BIT) is built for the whole grid at
+        once, then used to index the table.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+
+        Returns:
+            The flat array of each cell's next state code
+
+        """
+        height, width = self.shape
+        padded = pad(codes.reshape(self.shape).astype(np.uint16), 1, self._padding)
+        index = np.zeros(self.shape, dtype=np.uint16)
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                neighbors = padded[dy + 1 : dy + 1 + height, dx + 1 : dx + 1 + width]
+                index |= neighbors << (3 * (dy + 1) + dx + 1)
+        table = np.frombuffer(self.state_type.table(), dtype=np.uint8)
+        return table[index].reshape(-1)
@@ -0,0 +1,328 @@
+"""Evolves patterns on a board that grows and shrinks with them, instead of a fixed torus.
+
+A GrowingAutomaton keeps its cells in an ordinary Automaton sized to fit the live cells, with a
+margin of background cells around them at least as wide as a neighborhood. Since a pattern grows
+by at most that much per generation, it never reaches far enough to wrap around the torus. Before
+each generation, the board is reallocated at twice the size the live cells need if they have come
+too close to an edge, or once they need less than a quarter of it. Since the new board leaves
+room for the pattern to grow by half again, a pattern that keeps growing is copied a logarithmic
+number of times.
+
+Coordinates are unbounded and stay the same across reallocations: 'origin' tracks where the
+board's top left cell is.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .automaton import Automaton
+from .coordinate import Coordinate
+
+if TYPE_CHECKING:
+    from .cell import Cell
+    from .color import Color
+    from .state import CellState
+
+# The smallest width or height the board shrinks to
+MIN_SIZE = 16
+# How many times the space the live cells need the board is reallocated at. Once they need less
+# than 1 / SHRINK of it, it's reallocated smaller
+GROWTH = 2
+SHRINK = 4
+
+
+class GrowingAutomaton:
+    """An automaton on an unbounded board, which is only as large as its live cells need.
+
+    Cells outside the board are in the state type's default state (the background), which must
+    stay that way when all of its neighbors are too: rules with births on 0 neighbors (B0) can't
+    be evolved on a growing board. Like Automaton, a cell is live if its state differs from the
+    background.
+
+    Attributes:
+        cell_type (Type[Cell]): The type of cell the automaton is working with
+        automaton (Automaton): The board the cells are currently kept in. It's replaced when the
+        board is reallocated
+        origin (Coordinate): The coordinate of the board's top left cell
+        min_size (int): The smallest width or height the board shrinks to
+        generation (int): The generation we're at in the simulation
+        population (int): The number of live cells
+        bounding_box (Optional[Tuple[Coordinate, Coordinate]]): The corners of the smallest
+        rectangle holding every live cell
+        xmax (int): The board's maximum x coordinate, counting from 'origin'
+        ymax (int): The board's maximum y coordinate, counting from 'origin'
+        codes (memoryview): A read-only view of each of the board's cells' color index
+        palette (Tuple[Color, ...]): The colors the values in 'codes' refer to
+
+    """
+
+    def __init__(
+        self,
+        cell_type: type[Cell],
+        state_type: type[CellState],
+        compact: bool = False,
+        min_size: int = MIN_SIZE,
+    ) -> None:
+        """Initialize an instance of the GrowingAutomaton class, with no live cells.
+
+        Args:
+            cell_type (Type[Cell]): The type of cell the automaton should use
+            state_type (Type[CellState]): The type of state the automaton holds. Its default
+            state is the background
+            compact (bool): Whether to store states compactly (see Automaton)
+            min_size (int): The smallest width or height the board shrinks to
+
+        Raises:
+            TypeError: The cell type doesn't list its neighbors as offsets
+
+        """
+        offsets = getattr(cell_type, "neighbors", None)
+        if not isinstance(offsets, tuple):
+            msg = f"{cell_type.__name__} must list its neighbors as offsets in 'neighbors'"
+            raise TypeError(msg)
+        self.cell_type = cell_type
+        self.min_size = min_size
+        self._state_type = state_type
+        self._compact = compact
+        self._compiled = False
+        self._max_states: int | None = None
+        self._radius = max((max(abs(o.x), abs(o.y)) for o in offsets), default=0)
+        self.origin = Coordinate(-(min_size // 2), -(min_size // 2))
+        self.automaton: Automaton = Automaton(
+            cell_type,
+            state_type(),
+            min_size - 1,
+            min_size - 1,
+            compact=compact,
+        )
+
+    @property
+    def generation(self) -> int:
+        """The generation we're at in the simulation."""
+        return self.automaton.generation
+
+    @property
+    def population(self) -> int:
+        """The number of live cells."""
+        return self.automaton.population
+
+    @property
+    def bounding_box(self) -> tuple[Coordinate, Coordinate] | None:
+        """The top left and bottom right corners of the smallest rectangle holding every live cell.
+
+        Returns:
+            A pair of coordinates (inclusive), or None if no cells are live
+
+        """
+        bounds = self.automaton.bounding_box
+        if bounds is None:
+            return None
+        return bounds[0] + self.origin, bounds[1] + self.origin
+
+    @property
+    def xmax(self) -> int:
+        """The board's maximum x coordinate, counting from 'origin'."""
+        return self.automaton.xmax
+
+    @property
+    def ymax(self) -> int:
+        """The board's maximum y coordinate, counting from 'origin'."""
+        return self.automaton.ymax
+
+    @property
+    def codes(self) -> memoryview:
+        """A read-only (ymax + 1, xmax + 1) view of each of the board's cells' color index.
+
+        The board's top left cell is at 'origin'. Views taken before a generation belong to the
+        old board if it has been reallocated since.
+
+        Returns:
+            A read-only, 2 dimensional memoryview of unsigned bytes
+
+        """
+        return self.automaton.codes
+
+    @property
+    def palette(self) -> tuple[Color, ...]:
+        """The colors the values in 'codes' refer to."""
+        return self.automaton.palette
+
+    def compile(self, max_states: int | None = None) -> bool:
+        """Evolve with an engine, now and after every reallocation (see Automaton.compile).
+
+        Transition tables are compiled again for the states on the board after each reallocation.
+
+        Args:
+            max_states (Optional[int]): The most distinct states a transition table can be
+            compiled for (see Automaton.compile)
+
+        Returns:
+            Whether an engine is in use
+
+        """
+        self._compiled = True
+        self._max_states = max_states
+        return self.automaton.compile(max_states)
+
+    def decompile(self) -> None:
+        """Stop using an engine (see Automaton.decompile)."""
+        self._compiled = False
+        self.automaton.decompile()
+
+    def evolve(self) -> None:
+        """Evolve the automaton once, after reallocating the board if the live cells need it."""
+        self._fit()
+        self.automaton.evolve()
+
+    def run(self, generations: int) -> None:
+        """Evolve the automaton a number of times.
+
+        Args:
+            generations (int): The number of generations
+
+        """
+        for _ in range(generations):
+            self.evolve()
+
+    def get_state(self, coord: Coordinate) -> CellState:
+        """Return the state of a cell.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+
+        Returns:
+            CellState
+
+        """
+        return self.read(coord, coord)[0][0]
+
+    def set_state(self, coord: Coordinate, state: CellState) -> None:
+        """Set the state of a cell, growing the board if it's outside.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+            state (CellState): The cell's new state
+
+        """
+        self._include(coord, coord)
+        self.automaton.set_state(coord - self.origin, state)
+
+    def paste(self, pattern: Automaton, origin: Coordinate, mode: str = "overwrite") -> None:
+        """Copy another automaton's states into this one, growing the board to fit them.
+
+        Args:
+            pattern (Automaton): The automaton to copy
+            origin (Coordinate): Where the pattern's top left corner goes
+            mode (str): One of "overwrite", "or" or "xor" (see Automaton.paste)
+
+        """
+        self._include(origin, origin + pattern.max_coord)
+        self.automaton.paste(pattern, origin - self.origin, mode, wrap=False)
+
+    def spawn(self, midpoint: Coordinate, pattern: Automaton) -> None:
+        """Spawn another automaton within this one (see 'paste')."""
+        self.paste(pattern, midpoint)
+
+    def read(self, start: Coordinate, end: Coordinate) -> list[list[CellState]]:
+        """Return the states in a rectangle, row by row. It may reach past the board.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        Returns:
+            A list of rows of states
+
+        """
+        background = self._state_type()
+        rows = [[background] * (end.x - start.x + 1) for _ in range(end.y - start.y + 1)]
+        top_left = Coordinate(max(start.x, self.origin.x), max(start.y, self.origin.y))
+        bottom_right = Coordinate(
+            min(end.x, self.origin.x + self.xmax),
+            min(end.y, self.origin.y + self.ymax),
+        )
+        if top_left.x > bottom_right.x or top_left.y > bottom_right.y:
+            return rows
+        region = self.automaton.read(top_left - self.origin, bottom_right - self.origin)
+        left = top_left.x - start.x
+        for y, row in enumerate(region, top_left.y - start.y):
+            rows[y][left : left + len(row)] = row
+        return rows
+
+    def _include(self, start: Coordinate, end: Coordinate) -> None:
+        """Reallocate the board if a rectangle isn't on it.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        """
+        top_left, bottom_right = self.origin, self.origin + self.automaton.max_coord
+        if (
+            top_left.x <= start.x
+            and top_left.y <= start.y
+            and end.x <= bottom_right.x
+            and end.y <= bottom_right.y
+        ):
+            return
+        bounds = self.bounding_box
+        if bounds is not None:
+            start = Coordinate(min(start.x, bounds[0].x), min(start.y, bounds[0].y))
+            end = Coordinate(max(end.x, bounds[1].x), max(end.y, bounds[1].y))
+        self._reallocate(start, end)
+
+    def _fit(self) -> None:
+        """Reallocate the board if the live cells are too close to its edges, or too small for it.
+
+        The live cells must be at least a neighborhood's reach from every edge, so the cells born
+        next generation (and their neighbors) don't wrap around.
+        """
+        board = self.automaton
+        bounds = board.bounding_box
+        if bounds is None:
+            if board.xmax + 1 > self.min_size or board.ymax + 1 > self.min_size:
+                self._reallocate(self.origin, self.origin)
+            return
+        top_left, bottom_right = bounds
+        margin = self._radius
+        width, height = board.xmax + 1, board.ymax + 1
+        needed_x = bottom_right.x - top_left.x + 1 + 2 * margin
+        needed_y = bottom_right.y - top_left.y + 1 + 2 * margin
+        if (
+            min(top_left.x, top_left.y) < margin
+            or width - 1 - bottom_right.x < margin
+            or height - 1 - bottom_right.y < margin
+            or (width > self.min_size and needed_x * SHRINK <= width)
+            or (height > self.min_size and needed_y * SHRINK <= height)
+        ):
+            self._reallocate(top_left + self.origin, bottom_right + self.origin)
+
+    def _reallocate(self, start: Coordinate, end: Coordinate) -> None:
+        """Move the live cells to a new board, centered on a rectangle and its margins.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        """
+        board = self.automaton
+        span_x, span_y = end.x - start.x + 1, end.y - start.y + 1
+        width = max(self.min_size, GROWTH * (span_x + 2 * self._radius))
+        height = max(self.min_size, GROWTH * (span_y + 2 * self._radius))
+        origin = Coordinate(start.x - (width - span_x) // 2, start.y - (height - span_y) // 2)
+        resized: Automaton = Automaton(
+            self.cell_type,
+            self._state_type(),
+            width - 1,
+            height - 1,
+            compact=self._compact,
+        )
+        resized.generation = board.generation
+        bounds = board.bounding_box
+        if bounds is not None:
+            resized.write(bounds[0] + self.origin - origin, board.read(*bounds))
+        if self._compiled:
+            resized.compile(self._max_states)
+        self.automaton = resized
+        self.origin = origin
@@ -0,0 +1,356 @@
+"""Records an automaton's generations, so it can be rewound or replayed from any of them.
+
+A History stores each generation as the cells that changed since the one before (a delta), and
+every so often as a full copy of the board (a keyframe). Generations are rebuilt from the nearest
+keyframe before them, so seeking costs the size of one board plus the changes replayed since.
+Cells are stored as indexes into the history's own palette of states (see CompactStates), and
+changes are found by XORing one generation's indexes with the next, as with ANSI frame diffing.
+
+Once the history outgrows its memory budget, the oldest keyframes are dropped along with the
+deltas that depend on them.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, NamedTuple
+
+from .compact import CompactStates, widen
+
+if TYPE_CHECKING:
+    from .automaton import Automaton
+    from .state import CellState
+
+# The default memory budget, in bytes
+DEFAULT_MAX_BYTES = 64 << 20
+# The default number of generations between keyframes
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+# The memory each run of changed cells takes besides its cells. Runs separated by fewer unchanged
+# bytes than this are stored as one
+RUN_BYTES = 8
+
+# Finds the runs of changed bytes, after XORing a generation with the one before, merging runs
+# separated by fewer than RUN_BYTES unchanged bytes
+_RUNS = re.compile(rb"[^\0](?:\0{0,%d}[^\0])*" % (RUN_BYTES - 1)).finditer
+
+
+class Delta(NamedTuple):
+    """The cells that changed between two generations.
+
+    Attributes:
+        starts (array): The first cell of each run of changed cells, row by row
+        lengths (array): The number of cells in each run
+        values (array): The new index of every changed cell, run after run
+
+    """
+
+    starts: array
+    lengths: array
+    values: array
+
+    @property
+    def nbytes(self) -> int:
+        """The memory taken by the delta's arrays."""
+        return sum(len(part) * part.itemsize for part in self)
+
+
+class Segment(NamedTuple):
+    """A keyframe, and the deltas that follow it.
+
+    Attributes:
+        generation (int): The generation of the keyframe
+        keyframe (array): The index of every cell's state, row by row
+        deltas (List[Delta]): The changes leading to each following generation
+
+    """
+
+    generation: int
+    keyframe: array
+    deltas: list[Delta]
+
+    @property
+    def last(self) -> int:
+        """The last generation in the segment."""
+        return self.generation + len(self.deltas)
+
+
+def diff(previous: array, current: array) -> Delta:
+    """Find the cells that differ between two generations.
+
+    Args:
+        previous (array): The indexes of the earlier generation
+        current (array): The indexes of the later generation, with the same typecode
+
+    Returns:
+        Delta
+
+    """
+    size = current.itemsize
+    before, after = previous.tobytes(), current.tobytes()
+    changed = (int.from_bytes(before) ^ int.from_bytes(after)).to_bytes(len(after))
+    # Round each run out to whole indexes
+    runs = [(start // size, -(-end // size)) for start, end in map(re.Match.span, _RUNS(changed))]
+    values = array(current.typecode)
+    values.frombytes(b"".join(after[start * size : end * size] for start, end in runs))
+    return Delta(
+        array("I", [start for start, _ in runs]),
+        array("I", [end - start for start, end in runs]),
+        values,
+    )
+
+
+def apply(cells: array, delta: Delta) -> None:
+    """Apply the changes of a delta to a generation, in place.
+
+    Args:
+        cells (array): The indexes of the generation before the delta
+        delta (Delta): The changes
+
+    """
+    offset = 0
+    for start, length in zip(delta.starts, delta.lengths, strict=True):
+        cells[start : start + length] = delta.values[offset : offset + length]
+        offset += length
+
+
+class History:
+    """A bounded record of an automaton's generations.
+
+    Creating a History attaches it to the automaton (see Automaton.history), which then records
+    each generation as it evolves. Seeking to an earlier generation restores the board without
+    forgetting the later ones, until the automaton evolves from there: the generations after it
+    are then replaced, as with an editor's undo history.
+
+    Attributes:
+        automaton (Automaton): The automaton being recorded
+        max_bytes (int): The memory budget. The keyframe of the current segment is kept even if
+        it's over budget on its own
+        keyframe_interval (int): The most generations between keyframes
+        palette (List[CellState]): The distinct states recorded, indexed by the values stored
+
+    """
+
+    def __init__(
+        self,
+        automaton: Automaton,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ) -> None:
+        """Initialize an instance of the History class, recording the current generation.
+
+        Args:
+            automaton (Automaton): The automaton to record
+            max_bytes (int): The memory budget
+            keyframe_interval (int): The most generations between keyframes
+
+        Raises:
+            ValueError: The keyframe interval is less than 1
+
+        """
+        if keyframe_interval < 1:
+            msg = f"The keyframe interval must be at least 1 (got {keyframe_interval})"
+            raise ValueError(msg)
+        self.automaton = automaton
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self._states = CompactStates(())
+        self._segments: deque[Segment] = deque()
+        self._last = array("B")
+        self._nbytes = 0
+        automaton.history = self
+        self.record()
+
+    @property
+    def palette(self) -> list[CellState]:
+        """The distinct states recorded, indexed by the values stored."""
+        return self._states.palette
+
+    @property
+    def generations(self) -> range:
+        """The generations that can be sought."""
+        if not self._segments:
+            return range(0)
+        return range(self._segments[0].generation, self._segments[-1].last + 1)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory taken by the recorded keyframes and deltas."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        """Return the number of generations recorded."""
+        return len(self.generations)
+
+    def __contains__(self, generation: object) -> bool:
+        """Return whether a generation can be sought."""
+        return generation in self.generations
+
+    def detach(self) -> None:
+        """Stop recording the automaton's generations. The recorded ones can still be read."""
+        if self.automaton.history is self:
+            self.automaton.history = None
+
+    def record(self) -> None:
+        """Record the automaton's current generation.
+
+        Recorded generations from the current one onwards are replaced. The automaton calls this
+        after each generation, so it's only needed after editing cells directly.
+        """
+        generation = self.automaton.generation
+        if self._segments and generation <= self._segments[-1].last:
+            self._truncate(generation)
+        cells = self._encode()
+        segment = self._segments[-1] if self._segments else None
+        if (
+            segment is not None
+            and generation == segment.last + 1
+            and len(segment.deltas) + 1 < self.keyframe_interval
+            and cells.typecode == self._last.typecode
+        ):
+            delta = diff(self._last, cells)
+            # Past a point, a delta costs more to store and replay than a keyframe
+            if delta.nbytes * 2 <= len(cells) * cells.itemsize:
+                segment.deltas.append(delta)
+                self._nbytes += delta.nbytes
+                self._last = cells
+                self._evict()
+                return
+        self._segments.append(Segment(generation, cells, []))
+        self._nbytes += len(cells) * cells.itemsize
+        self._last = array(cells.typecode, cells)
+        self._evict()
+
+    def get(self, generation: int) -> CompactStates:
+        """Rebuild a recorded generation, without restoring it.
+
+        Args:
+            generation (int): The generation
+
+        Raises:
+            ValueError: The generation isn't recorded (or has been evicted)
+
+        Returns:
+            The state of every cell, row by row (see Automaton.restore)
+
+        """
+        snapshot = CompactStates(())
+        snapshot.load(self._states.palette, self._rebuild(generation))
+        return snapshot
+
+    def seek(self, generation: int) -> None:
+        """Restore the automaton to a recorded generation.
+
+        Args:
+            generation (int): The generation
+
+        Raises:
+            ValueError: The generation isn't recorded (or has been evicted)
+
+        """
+        self.automaton.restore(self.get(generation))
+        self.automaton.generation = generation
+
+    def rewind(self, n: int = 1) -> None:
+        """Restore the automaton to the generation n generations before the current one.
+
+        Args:
+            n (int): The number of generations to step back
+
+        Raises:
+            ValueError: That generation isn't recorded (or has been evicted)
+
+        """
+        self.seek(self.automaton.generation - n)
+
+    def _encode(self) -> array:
+        """Translate the automaton's current generation into indexes into 'palette'.
+
+        Returns:
+            The index of every cell's state, row by row
+
+        """
+        snapshot = self.automaton.snapshot()
+        table = [self._states.encode(state) for state in snapshot.palette]
+        size = len(self._states.palette)
+        if snapshot.cells.typecode == "B" and size <= 1 << 8:
+            translation = bytes(table) + bytes(256 - len(table))
+            return array("B", snapshot.cells.tobytes().translate(translation))
+        cells = widen(array("B"), size)
+        cells.extend(map(table.__getitem__, snapshot.cells))
+        return cells
+
+    def _find(self, generation: int) -> Segment:
+        """Find the segment holding a generation.
+
+        Args:
+            generation (int): The generation
+
+        Raises:
+            ValueError: The generation isn't recorded (or has been evicted)
+
+        Returns:
+            Segment
+
+        """
+        for segment in reversed(self._segments):
+            if segment.generation <= generation <= segment.last:
+                return segment
+        generations = self.generations
+        if not generations:
+            msg = f"Generation {generation} isn't recorded (nothing is)"
+        else:
+            msg = (
+                f"Generation {generation} isn't recorded "
+                f"(from {generations.start} to {generations.stop - 1})"
+            )
+        raise ValueError(msg)
+
+    def _rebuild(self, generation: int) -> array:
+        """Rebuild a generation by replaying deltas over the keyframe before it.
+
+        Args:
+            generation (int): The generation
+
+        Raises:
+            ValueError: The generation isn't recorded (or has been evicted)
+
+        Returns:
+            The index of every cell's state, row by row
+
+        """
+        segment = self._find(generation)
+        cells = array(segment.keyframe.typecode, segment.keyframe)
+        for delta in segment.deltas[: generation - segment.generation]:
+            apply(cells, delta)
+        return cells
+
+    def _truncate(self, generation: int) -> None:
+        """Forget the recorded generations from one onwards.
+
+        Args:
+            generation (int): The first generation to forget
+
+        """
+        segments = self._segments
+        while segments and segments[-1].generation >= generation:
+            segment = segments.pop()
+            self._nbytes -= len(segment.keyframe) * segment.keyframe.itemsize
+            self._nbytes -= sum(delta.nbytes for delta in segment.deltas)
+        if not segments:
+            return
+        segment = segments[-1]
+        while segment.last >= generation:
+            self._nbytes -= segment.deltas.pop().nbytes
+        # Deltas are relative to the last generation recorded
+        self._last = self._rebuild(segment.last)
+
+    def _evict(self) -> None:
+        """Drop the oldest segments until the history is within its memory budget."""
+        segments = self._segments
+        while self._nbytes > self.max_bytes and len(segments) > 1:
+            segment = segments.popleft()
+            self._nbytes -= len(segment.keyframe) * segment.keyframe.itemsize
+            self._nbytes -= sum(delta.nbytes for delta in segment.deltas)
@@ -0,0 +1,361 @@
+"""Writes generations as PPM, PGM or PNG images, and as animated GIFs, without dependencies.
+
+Images are built from each cell's color index (see Automaton.codes) and the automaton's palette,
+one row at a time, so memory use doesn't grow with the size of the board or the length of an
+animation. Color indexes are mapped to pixels with bytes.translate and slice assignment, which
+keeps the per-cell work out of Python.
+
+PNG images use the palette directly (indexed color), and are compressed with zlib as rows are
+written. GIF frames are stored as literal LZW codes: a clear code every GIF_CHUNK pixels keeps the
+code width at 8 bits, so each pixel is written as its own byte. Frames are about as large as the
+board, so prefer PNG sequences for long runs of large boards.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import IO, TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from types import TracebackType
+
+    from .automaton import Automaton
+    from .color import Color
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# The most compressed data written in one IDAT chunk
+PNG_CHUNK = 1 << 16
+
+# GIF pixels are written with a minimum code size of 7, so the code width stays at 8 bits for as
+# long as the decoder's table has room. Palettes are padded to GIF_COLORS entries
+GIF_CODE_SIZE = 7
+GIF_COLORS = 1 << GIF_CODE_SIZE
+GIF_CLEAR = GIF_COLORS
+GIF_END = GIF_COLORS + 1
+# The most pixels written between clear codes: each code after the first adds a table entry,
+# and the table must stay below 256 entries
+GIF_CHUNK = GIF_COLORS - 2
+# The most bytes in a GIF data sub-block
+GIF_BLOCK = 255
+
+
+def rgb_table(palette: Sequence[Color]) -> tuple[bytes, bytes, bytes]:
+    """Build translation tables from color indexes to each color channel.
+
+    Args:
+        palette (Sequence[Color]): The colors, indexed by the values found in Automaton.codes
+
+    Returns:
+        Tables of 256 bytes each, for bytes.translate, mapping a color index to its red, green
+        and blue channel
+
+    """
+    tables = (bytearray(256), bytearray(256), bytearray(256))
+    for i, color in enumerate(palette):
+        for table, start in zip(tables, (1, 3, 5), strict=True):
+            table[i] = int(color[start : start + 2], 16)
+    return bytes(tables[0]), bytes(tables[1]), bytes(tables[2])
+
+
+def gray_table(palette: Sequence[Color]) -> bytes:
+    """Build a translation table from color indexes to their luma (ITU-R BT.601).
+
+    Args:
+        palette (Sequence[Color]): The colors, indexed by the values found in Automaton.codes
+
+    Returns:
+        A table of 256 bytes, for bytes.translate
+
+    """
+    red, green, blue = rgb_table(palette)
+    return bytes(
+        round(0.299 * r + 0.587 * g + 0.114 * b) for r, g, b in zip(red, green, blue, strict=True)
+    )
+
+
+def rows(automaton: Automaton, scale: int = 1) -> Iterator[bytes]:
+    """Iterate on the color indexes of each row of pixels, one row at a time.
+
+    Args:
+        automaton (Automaton): The automaton
+        scale (int): The width and height of each cell, in pixels
+
+    Raises:
+        ValueError: The scale is less than 1
+
+    Returns:
+        The color index of each pixel, row by row
+
+    """
+    if scale < 1:
+        msg = f"The scale must be at least 1 (got {scale})"
+        raise ValueError(msg)
+    return _rows(automaton, scale)
+
+
+def _rows(automaton: Automaton, scale: int) -> Iterator[bytes]:
+    """Iterate on the color indexes of each row of pixels (see 'rows').
+
+    Args:
+        automaton (Automaton): The automaton
+        scale (int): The width and height of each cell, in pixels
+
+    Yields:
+        The color index of each pixel in a row
+
+    """
+    codes = automaton.codes.cast("B")
+    width = automaton.xmax + 1
+    scaled = bytearray(width * scale)
+    for start in range(0, len(codes), width):
+        row = codes[start : start + width]
+        if scale == 1:
+            yield row.tobytes()
+            continue
+        for offset in range(scale):
+            scaled[offset::scale] = row
+        line = bytes(scaled)
+        for _ in range(scale):
+            yield line
+
+
+def write_ppm(automaton: Automaton, stream: IO[bytes], scale: int = 1) -> None:
+    """Write the current generation as a binary PPM (P6) image.
+
+    Args:
+        automaton (Automaton): The automaton
+        stream (IO[bytes]): The stream to write to
+        scale (int): The width and height of each cell, in pixels
+
+    """
+    red, green, blue = rgb_table(automaton.palette)
+    width = (automaton.xmax + 1) * scale
+    stream.write(b"P6\n%d %d\n255\n" % (width, (automaton.ymax + 1) * scale))
+    pixels = bytearray(width * 3)
+    for row in rows(automaton, scale):
+        pixels[0::3] = row.translate(red)
+        pixels[1::3] = row.translate(green)
+        pixels[2::3] = row.translate(blue)
+        stream.write(pixels)
+
+
+def write_pgm(automaton: Automaton, stream: IO[bytes], scale: int = 1) -> None:
+    """Write the current generation as a binary PGM (P5) image, in shades of gray.
+
+    Args:
+        automaton (Automaton): The automaton
+        stream (IO[bytes]): The stream to write to
+        scale (int): The width and height of each cell, in pixels
+
+    """
+    gray = gray_table(automaton.palette)
+    width = (automaton.xmax + 1) * scale
+    stream.write(b"P5\n%d %d\n255\n" % (width, (automaton.ymax + 1) * scale))
+    for row in rows(automaton, scale):
+        stream.write(row.translate(gray))
+
+
+def write_png(automaton: Automaton, stream: IO[bytes], scale: int = 1, level: int = 6) -> None:
+    """Write the current generation as an indexed color PNG image.
+
+    Args:
+        automaton (Automaton): The automaton
+        stream (IO[bytes]): The stream to write to
+        scale (int): The width and height of each cell, in pixels
+        level (int): The zlib compression level, from 0 (none) to 9 (smallest)
+
+    """
+    palette = automaton.palette
+    red, green, blue = rgb_table(palette)
+    plte = bytearray(len(palette) * 3)
+    plte[0::3] = red[: len(palette)]
+    plte[1::3] = green[: len(palette)]
+    plte[2::3] = blue[: len(palette)]
+
+    stream.write(PNG_SIGNATURE)
+    width, height = (automaton.xmax + 1) * scale, (automaton.ymax + 1) * scale
+    _png_chunk(stream, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+    _png_chunk(stream, b"PLTE", plte)
+
+    compressor = zlib.compressobj(level)
+    pending = bytearray()
+    for row in rows(automaton, scale):
+        # Each row starts with its filter type (0: none)
+        pending += compressor.compress(b"\0" + row)
+        if len(pending) >= PNG_CHUNK:
+            _png_chunk(stream, b"IDAT", pending)
+            pending.clear()
+    pending += compressor.flush()
+    _png_chunk(stream, b"IDAT", pending)
+    _png_chunk(stream, b"IEND", b"")
+
+
+def _png_chunk(stream: IO[bytes], kind: bytes, data: bytes | bytearray) -> None:
+    """Write a PNG chunk: its length, type, data and CRC.
+
+    Args:
+        stream (IO[bytes]): The stream to write to
+        kind (bytes): The chunk type, such as b"IDAT"
+        data (Union[bytes, bytearray]): The chunk data
+
+    """
+    stream.write(struct.pack(">I", len(data)) + kind)
+    stream.write(data)
+    stream.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+
+class GifWriter:
+    """Writes generations as the frames of an animated GIF, one frame at a time.
+
+    The first frame sets the size of the animation, and its palette becomes the global color
+    table. Frames whose palette differs carry their own color table. Palettes are limited to
+    GIF_COLORS colors (see the module docstring).
+
+    Attributes:
+        stream (IO[bytes]): The stream to write to
+        scale (int): The width and height of each cell, in pixels
+        delay (int): The time each frame is shown for, in hundredths of a second
+        loop (int): The number of times to play the animation, or 0 to loop forever
+        frames (int): The number of frames written so far
+
+    """
+
+    def __init__(self, stream: IO[bytes], scale: int = 1, delay: int = 10, loop: int = 0) -> None:
+        """Initialize an instance of the GifWriter class.
+
+        Args:
+            stream (IO[bytes]): The stream to write to
+            scale (int): The width and height of each cell, in pixels
+            delay (int): The time each frame is shown for, in hundredths of a second
+            loop (int): The number of times to play the animation, or 0 to loop forever
+
+        """
+        self.stream = stream
+        self.scale = scale
+        self.delay = delay
+        self.loop = loop
+        self.frames = 0
+        self._size: tuple[int, int] | None = None
+        self._palette: tuple[Color, ...] = ()
+
+    def write(self, automaton: Automaton) -> None:
+        """Write the automaton's current generation as the next frame.
+
+        Args:
+            automaton (Automaton): The automaton
+
+        Raises:
+            ValueError: The palette has more than GIF_COLORS colors, or the automaton isn't the
+            size of the first frame
+
+        """
+        palette = automaton.palette
+        if len(palette) > GIF_COLORS:
+            msg = f"GIF frames can hold up to {GIF_COLORS} colors (got {len(palette)})"
+            raise ValueError(msg)
+        size = ((automaton.xmax + 1) * self.scale, (automaton.ymax + 1) * self.scale)
+        if self._size is None:
+            self._write_header(size, palette)
+        elif size != self._size:
+            msg = f"Every frame must be {self._size[0]}x{self._size[1]} pixels (got {size})"
+            raise ValueError(msg)
+
+        stream = self.stream
+        # Graphic control extension: the frame's delay
+        stream.write(b"\x21\xf9\x04\x00" + struct.pack("<H", self.delay) + b"\x00\x00")
+        # Image descriptor, followed by a local color table if the palette changed
+        local = palette != self._palette
+        packed = 0x80 | (GIF_CODE_SIZE - 1) if local else 0
+        stream.write(b"\x2c" + struct.pack("<HHHHB", 0, 0, *size, packed))
+        if local:
+            stream.write(_color_table(palette))
+
+        stream.write(bytes((GIF_CODE_SIZE,)))
+        pixels = bytearray()
+        data = bytearray()
+        for row in rows(automaton, self.scale):
+            pixels += row
+            full = len(pixels) - len(pixels) % GIF_CHUNK
+            for start in range(0, full, GIF_CHUNK):
+                data.append(GIF_CLEAR)
+                data += pixels[start : start + GIF_CHUNK]
+            del pixels[:full]
+            self._write_blocks(data)
+        if pixels:
+            data.append(GIF_CLEAR)
+            data += pixels
+        data.append(GIF_END)
+        self._write_blocks(data, final=True)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Finish the animation. The stream is left open."""
+        self.stream.write(b"\x3b")
+
+    def _write_header(self, size: tuple[int, int], palette: tuple[Color, ...]) -> None:
+        """Write the GIF header, global color table and looping extension.
+
+        Args:
+            size (Tuple[int, int]): The width and height of every frame, in pixels
+            palette (Tuple[Color, ...]): The global palette
+
+        """
+        self._size = size
+        self._palette = palette
+        # Logical screen descriptor: a global color table of GIF_COLORS colors, at 8 bits each
+        packed = 0x80 | 0x70 | (GIF_CODE_SIZE - 1)
+        self.stream.write(b"GIF89a" + struct.pack("<HHBBB", *size, packed, 0, 0))
+        self.stream.write(_color_table(palette))
+        self.stream.write(
+            b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\0",
+        )
+
+    def _write_blocks(self, data: bytearray, final: bool = False) -> None:
+        """Write LZW data as sub-blocks, keeping back any partial block unless this is the last.
+
+        Args:
+            data (bytearray): The data, which is consumed as it's written
+            final (bool): Whether to write everything, followed by the block terminator
+
+        """
+        full = len(data) - len(data) % GIF_BLOCK
+        for start in range(0, full, GIF_BLOCK):
+            self.stream.write(b"\xff" + data[start : start + GIF_BLOCK])
+        del data[:full]
+        if final:
+            if data:
+                self.stream.write(bytes((len(data),)) + data)
+            self.stream.write(b"\0")
+
+    def __enter__(self) -> Self:
+        """Use the writer as a context manager, which finishes the animation on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Finish the animation."""
+        self.close()
+
+
+def _color_table(palette: Sequence[Color]) -> bytes:
+    """Build a GIF color table, padded to GIF_COLORS colors.
+
+    Args:
+        palette (Sequence[Color]): The colors
+
+    Returns:
+        The red, green and blue channels of each color
+
+    """
+    red, green, blue = rgb_table(palette)
+    table = bytearray(GIF_COLORS * 3)
+    table[0::3] = red[:GIF_COLORS]
+    table[1::3] = green[:GIF_COLORS]
+    table[2::3] = blue[:GIF_COLORS]
+    return bytes(table)
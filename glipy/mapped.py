@@ -0,0 +1,321 @@
+"""Evolves automata whose cells live in memory-mapped files, for boards larger than memory.
+
+A MappedAutomaton keeps one byte per cell (the code of its state, see Engine) in a file, and
+writes each generation to a second file before swapping the two. Generations are computed in
+bands of rows: each band is read along with the rows its neighborhoods reach above and below it,
+evolved by an engine, and written out, so memory use depends on the width of the board and the
+height of a band rather than on the size of the board. Both files are read and written in order,
+so boards limited by disk space evolve at about the speed of sequential I/O once they outgrow the
+page cache.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+
+from .coordinate import Coordinate
+from .registry import get_engine
+from .table import CompileError, TransitionTable
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from .automaton import Automaton
+    from .cell import Cell
+    from .color import Color
+    from .engine import Engine
+    from .state import CellState
+
+# The number of cells evolved at once, unless a band height is given. Memory use grows with it
+BAND_CELLS = 1 << 20
+
+
+class MappedAutomaton:
+    """An automaton whose cells are stored in memory-mapped files instead of in memory.
+
+    The cell type must list its neighbors as offsets in a 'neighbors' class attribute (as
+    MooreCell, NeumannCell and 'moore_cell' do), and the board wraps around its edges. The state
+    type must have an engine (see Automaton.compile): either its own, through 'make_engine', or a
+    transition table compiled from the states passed in.
+
+    Attributes:
+        cell_type (Type[Cell]): The type of cell the automaton is working with
+        xmax (int): The maximum x coordinate
+        ymax (int): The maximum y coordinate
+        generation (int): The generation we're at in the simulation
+        population (int): The number of cells whose state isn't the state type's default
+        band_rows (int): The number of rows evolved at once
+        states (Tuple[CellState, ...]): The states the automaton can hold, indexed by their code
+        paths (Tuple[Path, Path]): The files holding the current and the next generation
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        cell_type: type[Cell],
+        initial_state: CellState,
+        xmax: int,
+        ymax: int,
+        *,
+        seeds: Iterable[CellState] = (),
+        directory: str | os.PathLike[str] | None = None,
+        band_rows: int | None = None,
+    ) -> None:
+        """Initialize an instance of the MappedAutomaton class, creating its files.
+
+        Args:
+            cell_type (Type[Cell]): The type of cell the automaton should use
+            initial_state (CellState): The state every cell starts with
+            xmax (int): The maximum x coordinate
+            ymax (int): The maximum y coordinate
+            seeds (Iterable[CellState]): Other states the board will hold. State types without
+            their own engine (such as ConwayState) are compiled to a transition table, which only
+            knows the states reachable from these and 'initial_state'
+            directory (Optional[Union[str, os.PathLike]]): Where to create the files, defaulting
+            to the system's temporary directory
+            band_rows (Optional[int]): The number of rows to evolve at once, defaulting to as many
+            as fit in BAND_CELLS cells
+
+        Raises:
+            TypeError: The cell type doesn't list its neighbors as offsets
+            ValueError: The state type can't be evolved by an engine
+
+        """
+        offsets = getattr(cell_type, "neighbors", None)
+        if not isinstance(offsets, tuple):
+            msg = f"{cell_type.__name__} must list its neighbors as offsets in 'neighbors'"
+            raise TypeError(msg)
+        self.cell_type = cell_type
+        self.xmax = xmax
+        self.ymax = ymax
+        self.generation = 0
+        self.band_rows = min(band_rows or max(1, BAND_CELLS // (xmax + 1)), ymax + 1)
+        self._offsets: tuple[Coordinate, ...] = offsets
+        self._radius = max((abs(offset.y) for offset in offsets), default=0)
+        self._state_type: type[CellState] = type(initial_state)
+        self._table: TransitionTable | None = None
+        self._engines: dict[int, Engine] = {}
+        if getattr(self._state_type, "make_engine", None) is None:
+            try:
+                self._table = TransitionTable.compile([initial_state, *seeds], len(offsets))
+            except CompileError as e:
+                msg = f"{self._state_type.__name__} can't be evolved by an engine: {e}"
+                raise ValueError(msg) from e
+
+        engine = self._engine(self.band_rows)
+        self.states: tuple[CellState, ...] = engine.states
+        self._background = self._encode(self._state_type())
+        code = self._encode(initial_state)
+
+        shape = (ymax + 1, xmax + 1)
+        paths = []
+        self._grids: list[np.memmap] = []
+        for _ in range(2):
+            handle, name = tempfile.mkstemp(prefix="glipy-", suffix=".cells", dir=directory)
+            os.close(handle)
+            paths.append(Path(name))
+            self._grids.append(np.memmap(name, dtype=np.uint8, mode="w+", shape=shape))
+        self.paths: tuple[Path, Path] = (paths[0], paths[1])
+        if code:
+            for y in range(0, ymax + 1, self.band_rows):
+                self._grids[0][y : y + self.band_rows] = code
+        self.population = 0 if code == self._background else shape[0] * shape[1]
+
+    def _engine(self, rows: int) -> Engine:
+        """Return the engine that evolves bands of a given height, building it the first time.
+
+        Args:
+            rows (int): The height of a band, not counting the rows its neighborhoods reach
+
+        Returns:
+            Engine
+
+        """
+        engine = self._engines.get(rows)
+        if engine is not None:
+            return engine
+        max_coord = Coordinate(self.xmax, rows + 2 * self._radius - 1)
+        if self._table is None:
+            make_engine = getattr(self._state_type, "make_engine")  # noqa: B009
+            engine = make_engine(self.cell_type, max_coord)
+            if engine is None:
+                msg = f"{self._state_type.__name__} has no engine for {self.cell_type.__name__}"
+                raise ValueError(msg)
+        else:
+            engine = get_engine("table")(self._table, self._positions(max_coord))
+        self._engines[rows] = engine
+        return engine
+
+    def _positions(self, max_coord: Coordinate) -> np.ndarray:
+        """Find the position of each cell's neighbors on a torus, for a TableEngine.
+
+        Args:
+            max_coord (Coordinate): The maximum coordinate of the band
+
+        Returns:
+            A (cells, neighbors) array of positions, counting row by row
+
+        """
+        height, width = max_coord.y + 1, max_coord.x + 1
+        ys, xs = np.divmod(np.arange(height * width, dtype=np.intp), width)
+        return np.stack(
+            [(ys + o.y) % height * width + (xs + o.x) % width for o in self._offsets],
+            axis=1,
+        )
+
+    def _encode(self, state: CellState) -> int:
+        """Return the code of a state.
+
+        Args:
+            state (CellState): The state
+
+        Raises:
+            ValueError: The engine can't represent the state
+
+        Returns:
+            The state's code
+
+        """
+        code = self._engine(self.band_rows).encode(state)
+        if code is None:
+            msg = f"{state!r} isn't one of the states this automaton can hold (see 'seeds')"
+            raise ValueError(msg)
+        return code
+
+    def evolve(self) -> None:
+        """Evolve the automaton once, band by band, into the other file."""
+        current, target = self._grids
+        height = self.ymax + 1
+        radius = self._radius
+        population = 0
+        for start in range(0, height, self.band_rows):
+            rows = min(self.band_rows, height - start)
+            # The rows above and below wrap around the board, like the cells' neighbors do
+            index = np.arange(start - radius, start + rows + radius) % height
+            band = current[index]
+            evolved = self._engine(rows).step(band.reshape(-1)).reshape(band.shape)
+            target[start : start + rows] = evolved[radius : radius + rows]
+            population += np.count_nonzero(evolved[radius : radius + rows] != self._background)
+        self._grids.reverse()
+        self.paths = (self.paths[1], self.paths[0])
+        self.population = int(population)
+        self.generation += 1
+
+    def get_state(self, coord: Coordinate) -> CellState:
+        """Return the state of a cell.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+
+        Returns:
+            CellState
+
+        """
+        return self.states[self._grids[0][coord.y, coord.x]]
+
+    def set_state(self, coord: Coordinate, state: CellState) -> None:
+        """Set the state of a cell.
+
+        Args:
+            coord (Coordinate): The cell's coordinate
+            state (CellState): The cell's new state
+
+        """
+        code = self._encode(state)
+        grid = self._grids[0]
+        previous = int(grid[coord.y, coord.x])
+        self.population += (code != self._background) - (previous != self._background)
+        grid[coord.y, coord.x] = code
+
+    def paste(self, pattern: Automaton, origin: Coordinate) -> None:
+        """Overwrite a rectangle with the states of an automaton, clipped to the board.
+
+        Args:
+            pattern (Automaton): The automaton whose states are copied
+            origin (Coordinate): Where the top left of the pattern goes
+
+        """
+        height = min(pattern.ymax + 1, self.ymax + 1 - origin.y)
+        width = min(pattern.xmax + 1, self.xmax + 1 - origin.x)
+        if height <= 0 or width <= 0:
+            return
+        rows = pattern.read(Coordinate(0, 0), Coordinate(width - 1, height - 1))
+        codes = np.array([[self._encode(state) for state in row] for row in rows], dtype=np.uint8)
+        region = self._grids[0][origin.y : origin.y + height, origin.x : origin.x + width]
+        self.population += int(
+            np.count_nonzero(codes != self._background)
+            - np.count_nonzero(region != self._background),
+        )
+        region[:] = codes
+
+    def read(self, start: Coordinate, end: Coordinate) -> list[list[CellState]]:
+        """Return the states in a rectangle, row by row.
+
+        Args:
+            start (Coordinate): The top left corner of the rectangle
+            end (Coordinate): The bottom right corner of the rectangle (inclusive)
+
+        Returns:
+            A list of rows of states
+
+        """
+        region = self._grids[0][start.y : end.y + 1, start.x : end.x + 1]
+        return [[self.states[code] for code in row] for row in region.tolist()]
+
+    @property
+    def codes(self) -> memoryview:
+        """A zero-copy view of each cell's index into 'palette', shaped (ymax + 1, xmax + 1).
+
+        As with Automaton.codes, this can be drawn or exported (see the ansi and image modules)
+        without reading the whole board into memory. It belongs to the current generation only,
+        since the next generation is written to the other file.
+
+        Returns:
+            A read-only, 2 dimensional memoryview of unsigned bytes
+
+        """
+        return memoryview(self._grids[0]).toreadonly()
+
+    @property
+    def palette(self) -> tuple[Color, ...]:
+        """The color of each state, indexed by the values found in 'codes'.
+
+        Returns:
+            A tuple of colors
+
+        """
+        return tuple(state.color for state in self.states)
+
+    def flush(self) -> None:
+        """Write the current generation's changes to its file."""
+        self._grids[0].flush()
+
+    def close(self) -> None:
+        """Release the memory maps and delete both files.
+
+        The maps stay readable through any views taken from 'codes' until those are released.
+        """
+        for grid in self._grids:
+            grid.flush()
+        self._grids = []
+        for path in self.paths:
+            path.unlink(missing_ok=True)
+
+    def __enter__(self) -> Self:
+        """Use the automaton as a context manager, which deletes its files on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the memory maps and delete both files."""
+        self.close()
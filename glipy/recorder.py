@@ -0,0 +1,174 @@
+"""Records the statistics of every generation, and writes them to a CSV or binary file in chunks.
+
+A Recorder attaches to an automaton (see Automaton.recorder), which then hands it each generation
+as it evolves. The statistics are kept up to date by the automaton itself (see
+Automaton.population, births, deaths and bounding_box), so recording a generation only appends a
+few numbers to preallocated arrays, one per column. Once the arrays are full, they're written out
+as a chunk and reused, so memory use doesn't grow with the length of a run.
+
+The binary format is columnar: after a header naming the columns, each chunk is its number of
+rows (a little-endian uint32) followed by each column in turn, as little-endian int64 values. It
+can be read back with 'read_binary'.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import IO, TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .automaton import Automaton
+
+# The statistics recorded for each generation. An empty board's bounding box is recorded as -1
+COLUMNS = ("generation", "population", "births", "deaths", "left", "top", "right", "bottom")
+FORMATS = ("csv", "binary")
+# Starts a binary file, followed by the column names separated by commas, and a newline
+MAGIC = b"GLIPY-STATS\n"
+# The number of generations kept in memory before they're written
+CHUNK_ROWS = 4096
+
+
+class Recorder:
+    """Writes the statistics of an automaton's generations to a stream, a chunk at a time.
+
+    Attributes:
+        automaton (Automaton): The automaton being recorded
+        stream (IO[bytes]): The stream the statistics are written to
+        file_format (str): One of FORMATS
+        chunk_rows (int): The number of generations kept in memory before they're written
+        rows (int): The number of generations recorded so far
+
+    """
+
+    def __init__(
+        self,
+        automaton: Automaton,
+        stream: IO[bytes],
+        file_format: str = "binary",
+        chunk_rows: int = CHUNK_ROWS,
+    ) -> None:
+        """Initialize an instance of the Recorder class, recording the current generation.
+
+        Args:
+            automaton (Automaton): The automaton to record
+            stream (IO[bytes]): The stream to write to
+            file_format (str): One of FORMATS
+            chunk_rows (int): The number of generations to keep in memory before writing them
+
+        Raises:
+            ValueError: The format is not valid
+
+        """
+        if file_format not in FORMATS:
+            msg = f"Invalid format: '{file_format}' (expected one of {', '.join(FORMATS)})"
+            raise ValueError(msg)
+        self.automaton = automaton
+        self.stream = stream
+        self.file_format = file_format
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._columns = [array("q", bytes(8 * chunk_rows)) for _ in COLUMNS]
+        self._length = 0
+        if file_format == "csv":
+            stream.write(",".join(COLUMNS).encode() + b"\n")
+        else:
+            stream.write(MAGIC + ",".join(COLUMNS).encode() + b"\n")
+        automaton.recorder = self
+        self.record()
+
+    def record(self) -> None:
+        """Record the automaton's current generation.
+
+        The automaton calls this after each generation, so it's only needed to record a
+        generation again, such as after editing cells directly.
+        """
+        automaton = self.automaton
+        bounds = automaton.bounding_box
+        if bounds is None:
+            left = top = right = bottom = -1
+        else:
+            (left, top), (right, bottom) = (bounds[0].x, bounds[0].y), (bounds[1].x, bounds[1].y)
+        i = self._length
+        columns = self._columns
+        columns[0][i] = automaton.generation
+        columns[1][i] = automaton.population
+        columns[2][i] = automaton.births
+        columns[3][i] = automaton.deaths
+        columns[4][i] = left
+        columns[5][i] = top
+        columns[6][i] = right
+        columns[7][i] = bottom
+        self._length += 1
+        self.rows += 1
+        if self._length == self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the generations kept in memory to the stream."""
+        length = self._length
+        if not length:
+            return
+        columns = [column[:length] for column in self._columns]
+        if self.file_format == "csv":
+            lines = (",".join(map(str, row)) for row in zip(*columns, strict=True))
+            self.stream.write("".join(f"{line}\n" for line in lines).encode())
+        else:
+            self.stream.write(struct.pack("<I", length))
+            for column in columns:
+                if sys.byteorder == "big":
+                    column.byteswap()
+                self.stream.write(column.tobytes())
+        self._length = 0
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Write the generations kept in memory, and stop recording. The stream is left open."""
+        self.flush()
+        if self.automaton.recorder is self:
+            self.automaton.recorder = None
+
+    def __enter__(self) -> Self:
+        """Use the recorder as a context manager, which closes it on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write the generations kept in memory, and stop recording."""
+        self.close()
+
+
+def read_binary(stream: IO[bytes]) -> dict[str, array]:
+    """Read the statistics written by a Recorder in the binary format.
+
+    Args:
+        stream (IO[bytes]): The stream to read from, positioned at the start of the file
+
+    Raises:
+        ValueError: The stream doesn't hold statistics in the binary format
+
+    Returns:
+        A dict of column name -> array('q') of values, one per generation
+
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        msg = "Not a binary statistics file"
+        raise ValueError(msg)
+    names = stream.readline().decode().rstrip("\n").split(",")
+    columns = {name: array("q") for name in names}
+    while header := stream.read(4):
+        (length,) = struct.unpack("<I", header)
+        for column in columns.values():
+            chunk = array("q")
+            chunk.frombytes(stream.read(8 * length))
+            if sys.byteorder == "big":
+                chunk.byteswap()
+            column.extend(chunk)
+    return columns
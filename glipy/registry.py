@@ -0,0 +1,108 @@
+"""Keeps track of engines by name, importing each one only when it's first used.
+
+Engines (see the engine module) pull in numpy, and third-party engines may be heavier still, so
+automata look them up here by name instead of importing them. An engine can be registered as the
+class itself, or as a "module:attribute" reference that is imported on the first lookup.
+
+Other packages can provide engines through the "glipy.engines" entry point group, which is only
+read when a name hasn't been registered. For example, in pyproject.toml:
+
+    [project.entry-points."glipy.engines"]
+    isotropic = "my_package.hashlife:HashLifeEngine"
+
+A replacement for a built-in engine must accept the same arguments as the engine it replaces.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .engine import Engine
+
+# The entry point group searched for engines that haven't been registered
+ENTRY_POINT_GROUP = "glipy.engines"
+
+# The built-in engines, by the name state types look them up with
+BUILTIN_ENGINES = {
+    "table": "glipy.engine:TableEngine",
+    "generations": "glipy.engine:GenerationsEngine",
+    "larger_than_life": "glipy.engine:LargerThanLifeEngine",
+    "isotropic": "glipy.engine:IsotropicEngine",
+}
+
+_engines: dict[str, type[Engine] | str] = {}
+
+
+def register_engine(name: str, engine: type[Engine] | str) -> None:
+    """Register an engine, replacing any engine (including a built-in one) of the same name.
+
+    Args:
+        name (str): The name to look the engine up with
+        engine (Union[Type[Engine], str]): The engine class, or a "module:attribute" reference to
+        import it from when it's first used
+
+    """
+    _engines[name] = engine
+
+
+def get_engine(name: str) -> type[Engine]:
+    """Return an engine class, importing it if this is the first time it's used.
+
+    Registered engines are found first, then those provided through entry points, then the
+    built-in engines.
+
+    Args:
+        name (str): The engine's name
+
+    Raises:
+        ValueError: No engine has that name
+
+    Returns:
+        The engine class
+
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        engine = _entry_point(name) or BUILTIN_ENGINES.get(name)
+    if engine is None:
+        msg = f"Unknown engine: '{name}' (expected one of {', '.join(engine_names())})"
+        raise ValueError(msg)
+    if isinstance(engine, str):
+        module, _, attribute = engine.partition(":")
+        engine = getattr(import_module(module), attribute)
+    _engines[name] = engine
+    return engine
+
+
+def engine_names() -> list[str]:
+    """Return the name of every engine that can be looked up, without importing any of them.
+
+    Returns:
+        A sorted list of names
+
+    """
+    from importlib.metadata import entry_points  # noqa: PLC0415
+
+    names = {*BUILTIN_ENGINES, *_engines}
+    names.update(entry_point.name for entry_point in entry_points(group=ENTRY_POINT_GROUP))
+    return sorted(names)
+
+
+def _entry_point(name: str) -> str | None:
+    """Find the reference an installed package gives for an engine, without importing it.
+
+    Args:
+        name (str): The engine's name
+
+    Returns:
+        A "module:attribute" reference, or None if no package provides the engine
+
+    """
+    # importlib.metadata scans every installed distribution, so it's deferred until a lookup
+    from importlib.metadata import entry_points  # noqa: PLC0415
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=name):
+        return entry_point.value
+    return None
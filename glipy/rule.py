@@ -0,0 +1,303 @@
+"""Parses rulestrings, such as those found in the header of RLE I/O."""
+
+import re
+from collections import namedtuple
+from functools import cache
+
+# The number of states in a Life-like rule (dead and alive)
+LIFE_STATE_COUNT = 2
+
+# Stores the rules parsed from a rulestring. 'state_count' is None for two state (Life-like) rules.
+# 'radius', 'middle' and 'neighborhood' ("M" for Moore, "N" for von Neumann) are only set by Larger
+# than Life rules. 'isotropic' is set by rules in Hensel notation, whose birth and survival rules
+# are lists of neighborhood classes such as "2a" (see 'hensel_classes')
+Rule = namedtuple(
+    "Rule",
+    [
+        "birth_rules",
+        "survival_rules",
+        "state_count",
+        "radius",
+        "middle",
+        "neighborhood",
+        "isotropic",
+    ],
+    defaults=[None, False, None, False],
+)
+
+# B3/S23, B2/S/C3, B2/S/3 or B2S, in any case
+BS_NOTATION = re.compile(r"B(\d*)/?S(\d*)(?:/[CG]?(\d+))?", re.IGNORECASE)
+
+# S/B or S/B/C, as in 23/3 or 345/2/4
+SB_NOTATION = re.compile(r"(\d*)/(\d*)(?:/(\d+))?")
+
+# Isotropic non-totalistic (Hensel notation), as in B2-a/S12 or B2ce3aiy/S23
+HENSEL_LETTERS = "cekainyqjrtwz"
+HENSEL_NOTATION = re.compile(
+    rf"[bB]((?:\d-?[{HENSEL_LETTERS}]*)*)/?[sS]((?:\d-?[{HENSEL_LETTERS}]*)*)",
+)
+
+# One example of each Hensel letter for up to 4 live neighbors, drawn as the 3x3 neighborhood
+# (rows separated by "/"). Every other neighborhood with the same letter is a rotation or
+# reflection of its example. Neighborhoods with 5 or more live neighbors take the letter of their
+# complement (see https://conwaylife.com/wiki/Isotropic_non-totalistic_rule)
+HENSEL_EXAMPLES = {
+    1: {"c": "o../.../...", "e": ".o./.../..."},
+    2: {
+        "c": "o.o/.../...",
+        "e": ".o./o../...",
+        "k": "..o/o../...",
+        "a": "oo./.../...",
+        "i": ".../o.o/...",
+        "n": "..o/.../o..",
+    },
+    3: {
+        "c": "o.o/.../o..",
+        "e": ".o./o.o/...",
+        "k": ".o./..o/o..",
+        "a": "oo./o../...",
+        "i": "ooo/.../...",
+        "n": "o.o/o../...",
+        "y": "o../..o/o..",
+        "q": ".oo/.../o..",
+        "j": ".oo/o../...",
+        "r": "o../o.o/...",
+    },
+    4: {
+        "c": "o.o/.../o.o",
+        "e": ".o./o.o/.o.",
+        "k": "oo./..o/o..",
+        "a": "ooo/o../...",
+        "i": "o.o/o.o/...",
+        "n": "ooo/.../o..",
+        "y": "o.o/..o/o..",
+        "q": ".oo/..o/o..",
+        "j": ".o./o.o/o..",
+        "r": "oo./o.o/...",
+        "t": "o../o.o/o..",
+        "w": ".oo/o../o..",
+        "z": "..o/o.o/o..",
+    },
+}
+
+# The bit a neighborhood index uses for the center cell. Bit 3 * (dy + 1) + (dx + 1) holds the cell
+# at offset (dx, dy), so bits 0-2 are the top row and bits 6-8 the bottom row
+CENTER_BIT = 4
+
+# Larger than Life, as in R5,C2,M1,S34..58,B34..45,NM
+LTL_NOTATION = re.compile(
+    r"R(\d+),C(\d+),M([01]),S(\d+)\.\.(\d+),B(\d+)\.\.(\d+),N([MN])",
+    re.IGNORECASE,
+)
+
+
+def parse_rule(rule: str) -> Rule:
+    """Parse a rulestring in B/S, B/S/C, S/B, S/B/C, Hensel or Larger than Life notation.
+
+    See https://conwaylife.com/wiki/Rulestring for details.
+
+    Args:
+        rule (str): The rulestring
+
+    Raises:
+        ValueError: The rulestring could not be parsed
+
+    Returns:
+        Rule
+
+    """
+    rule = rule.strip()
+    match = LTL_NOTATION.fullmatch(rule)
+    if match is not None:
+        radius, state_count, middle, s_min, s_max, b_min, b_max, neighborhood = match.groups()
+        return Rule(
+            list(range(int(b_min), int(b_max) + 1)),
+            list(range(int(s_min), int(s_max) + 1)),
+            None if int(state_count) <= LIFE_STATE_COUNT else int(state_count),
+            int(radius),
+            middle == "1",
+            neighborhood.upper(),
+        )
+
+    match = BS_NOTATION.fullmatch(rule)
+    if match is not None:
+        birth, survival, state_count = match.groups()
+    elif (match := HENSEL_NOTATION.fullmatch(rule)) is not None:
+        return Rule(parse_hensel(match[1]), parse_hensel(match[2]), None, isotropic=True)
+    else:
+        match = SB_NOTATION.fullmatch(rule)
+        if match is None:
+            msg = f"Invalid rulestring: '{rule}' (see https://conwaylife.com/wiki/Rulestring)"
+            raise ValueError(msg)
+        survival, birth, state_count = match.groups()
+
+    return Rule(
+        [int(n) for n in birth],
+        [int(n) for n in survival],
+        None if state_count is None or int(state_count) <= LIFE_STATE_COUNT else int(state_count),
+    )
+
+
+def symmetries(neighborhood: int) -> set[int]:
+    """Return every rotation and reflection of a 9 bit neighborhood index.
+
+    Args:
+        neighborhood (int): The neighborhood index (see CENTER_BIT)
+
+    Returns:
+        A set of neighborhood indexes
+
+    """
+    cells = [(bit % 3 - 1, bit // 3 - 1) for bit in range(9) if neighborhood >> bit & 1]
+    variants = set()
+    for _ in range(4):
+        cells = [(-y, x) for x, y in cells]
+        for flip in (1, -1):
+            variants.add(sum(1 << (3 * (y + 1) + flip * x + 1) for x, y in cells))
+    return variants
+
+
+@cache
+def hensel_classes() -> dict[str, frozenset[int]]:
+    """Map every Hensel neighborhood class (such as "2a", or "8") to its neighborhood indexes.
+
+    Indexes include both a dead and a live center cell (see CENTER_BIT).
+
+    Returns:
+        A dict of class -> neighborhood indexes
+
+    """
+    full = (1 << 9) - 1 - (1 << CENTER_BIT)
+    classes: dict[str, set[int]] = {"0": {0}, "8": {full}}
+    for count, examples in HENSEL_EXAMPLES.items():
+        for letter, drawing in examples.items():
+            example = sum(1 << bit for bit, c in enumerate(drawing.replace("/", "")) if c == "o")
+            neighborhoods = symmetries(example)
+            classes[f"{count}{letter}"] = neighborhoods
+            if count < len(HENSEL_EXAMPLES):
+                classes[f"{8 - count}{letter}"] = {full ^ n for n in neighborhoods}
+    return {
+        name: frozenset(n | center for n in neighborhoods for center in (0, 1 << CENTER_BIT))
+        for name, neighborhoods in classes.items()
+    }
+
+
+def parse_hensel(conditions: str) -> list[str]:
+    """Expand the birth or survival half of a Hensel rulestring into neighborhood classes.
+
+    A count with no letters includes every class of that count, letters include only those
+    classes, and a "-" before the letters includes every class except those.
+
+    Args:
+        conditions (str): The conditions, such as "2-a3" from B2-a3/S23
+
+    Raises:
+        ValueError: A count has no neighborhoods (9), or a letter names a class that doesn't
+        exist for its count (such as "2z", "1t", or any letter after 0 or 8)
+
+    Returns:
+        A list of neighborhood classes, such as ["2c", "2e", "2i", "2k", "2n", "3a", ...]
+
+    """
+    classes = hensel_classes()
+    expanded = []
+    for count, negate, letters in re.findall(r"(\d)(-?)([a-z]*)", conditions):
+        available = [name for name in classes if name[0] == count]
+        unknown = [f"{count}{letter}" for letter in letters if f"{count}{letter}" not in available]
+        if not available or unknown or (negate and not letters):
+            condition = ", ".join(unknown) or f"{count}{negate}"
+            msg = f"Unknown Hensel neighborhood class '{condition}' in '{conditions}'"
+            raise ValueError(msg)
+        if letters:
+            chosen = {f"{count}{letter}" for letter in letters}
+            available = [name for name in available if (name in chosen) != bool(negate)]
+        expanded.extend(sorted(available))
+    return expanded
+
+
+@cache
+def isotropic_table(birth_rules: tuple[str, ...], survival_rules: tuple[str, ...]) -> bytes:
+    """Compile Hensel neighborhood classes into a table of each neighborhood's next state.
+
+    Args:
+        birth_rules (Tuple[str, ...]): The classes a dead cell is born with
+        survival_rules (Tuple[str, ...]): The classes a live cell survives with
+
+    Returns:
+        512 bytes, where the byte at a neighborhood index (see CENTER_BIT) is 1 if the center
+        cell will be alive, or else 0
+
+    """
+    classes = hensel_classes()
+    table = bytearray(512)
+    for rules, center in ((birth_rules, 0), (survival_rules, 1)):
+        for name in rules:
+            for neighborhood in classes[name]:
+                if neighborhood >> CENTER_BIT & 1 == center:
+                    table[neighborhood] = 1
+    return bytes(table)
+
+
+def format_rule(rule: Rule) -> str:
+    """Write a rule as a rulestring, in the notation 'parse_rule' would read it from.
+
+    Rules in Hensel notation are written with a "-" wherever that is shorter.
+
+    Args:
+        rule (Rule): The rule
+
+    Raises:
+        ValueError: A Larger than Life rule's birth or survival counts aren't a single range
+
+    Returns:
+        The rulestring, such as "B3/S23", "B2/S/C3", "B2-a/S12" or "R5,C2,M1,S34..58,B34..45,NM"
+
+    """
+    if rule.isotropic:
+        return f"B{format_hensel(rule.birth_rules)}/S{format_hensel(rule.survival_rules)}"
+
+    if rule.radius is not None:
+        ranges = []
+        for counts in (rule.survival_rules, rule.birth_rules):
+            if not counts or sorted(counts) != list(range(min(counts), max(counts) + 1)):
+                msg = f"Larger than Life rules need a range of counts, not {counts}"
+                raise ValueError(msg)
+            ranges.append(f"{min(counts)}..{max(counts)}")
+        return (
+            f"R{rule.radius},C{rule.state_count or LIFE_STATE_COUNT},M{int(rule.middle)},"
+            f"S{ranges[0]},B{ranges[1]},N{rule.neighborhood or 'M'}"
+        )
+
+    birth = "".join(str(n) for n in sorted(rule.birth_rules))
+    survival = "".join(str(n) for n in sorted(rule.survival_rules))
+    state_count = "" if rule.state_count is None else f"/C{rule.state_count}"
+    return f"B{birth}/S{survival}{state_count}"
+
+
+def format_hensel(classes: list[str]) -> str:
+    """Write neighborhood classes as the birth or survival half of a Hensel rulestring.
+
+    This reverses 'parse_hensel'.
+
+    Args:
+        classes (List[str]): The neighborhood classes, such as ["2a", "3a", "3c", ...]
+
+    Returns:
+        The conditions, such as "2a3"
+
+    """
+    chosen = set(classes)
+    conditions = []
+    for count in "012345678":
+        available = [name for name in hensel_classes() if name[0] == count]
+        included = [name[1:] for name in available if name in chosen]
+        excluded = [name[1:] for name in available if name not in chosen]
+        if not included:
+            continue
+        if not excluded:
+            conditions.append(count)
+        elif len(excluded) < len(included):
+            conditions.append(f"{count}-{''.join(sorted(excluded, key=HENSEL_LETTERS.find))}")
+        else:
+            conditions.append(count + "".join(sorted(included, key=HENSEL_LETTERS.find)))
+    return "".join(conditions)
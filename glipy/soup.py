@@ -0,0 +1,181 @@
+"""Generates random soups: boards or regions filled with live cells at random, from a seed.
+
+Soups are produced as bytes of 0 (dead) or 1 (alive), row by row, without creating a state or a
+coordinate per cell. Each soup takes its cells from one call to Random.randbytes, which a 256
+entry table maps to dead or alive, so a given seed always produces the same sequence of soups.
+Symmetric soups copy each cell from the first cell of its orbit under the symmetry group, through
+an index prepared once per board size.
+"""
+
+from __future__ import annotations
+
+import random
+from functools import cache
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from .coordinate import Coordinate
+from .state import ConwayState
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from .automaton import Automaton
+    from .state import CellState
+
+# The symmetry groups soups can have: none, 180 degree rotation, 90 degree rotation, and every
+# rotation and reflection of a square (as in apgsearch)
+SYMMETRIES = ("C1", "C2", "C4", "D8")
+
+
+def _validate(width: int, height: int, density: float, symmetry: str) -> None:
+    """Check the parameters of a soup.
+
+    Args:
+        width (int): The width of the soup
+        height (int): The height of the soup
+        density (float): The chance of each cell being alive
+        symmetry (str): One of SYMMETRIES
+
+    Raises:
+        ValueError: A parameter is out of range, or the symmetry needs a square soup
+
+    """
+    if width < 1 or height < 1:
+        msg = f"Soups must be at least 1x1 (got {width}x{height})"
+        raise ValueError(msg)
+    if not 0 <= density <= 1:
+        msg = f"The density must be between 0 and 1 (got {density})"
+        raise ValueError(msg)
+    if symmetry not in SYMMETRIES:
+        msg = f"Unknown symmetry: '{symmetry}' (expected one of {', '.join(SYMMETRIES)})"
+        raise ValueError(msg)
+    if symmetry in {"C4", "D8"} and width != height:
+        msg = f"{symmetry} soups must be square (got {width}x{height})"
+        raise ValueError(msg)
+
+
+@cache
+def _orbits(width: int, height: int, symmetry: str) -> Callable[[bytes], tuple[int, ...]] | None:
+    """Prepare the index that copies each cell from the first cell of its orbit.
+
+    Args:
+        width (int): The width of the soup
+        height (int): The height of the soup
+        symmetry (str): One of SYMMETRIES
+
+    Returns:
+        A function picking each cell's value out of a soup, or None if no cell is copied
+
+    """
+    if symmetry == "C1":
+        return None
+    w, h = width - 1, height - 1
+    images = {
+        "C2": lambda x, y: [(x, y), (w - x, h - y)],
+        "C4": lambda x, y: [(x, y), (w - y, x), (w - x, h - y), (y, h - x)],
+        "D8": lambda x, y: [
+            *((x, y), (w - y, x), (w - x, h - y), (y, h - x)),
+            *((w - x, y), (y, x), (x, h - y), (w - y, h - x)),
+        ],
+    }[symmetry]
+    index = [
+        min(j * width + i for i, j in images(x, y)) for y in range(height) for x in range(width)
+    ]
+    if index == list(range(len(index))):
+        return None
+    return itemgetter(*index)
+
+
+def soups(
+    width: int,
+    height: int,
+    density: float = 0.5,
+    symmetry: str = "C1",
+    seed: int | str | bytes | None = None,
+) -> Iterator[bytes]:
+    """Generate an endless sequence of soups.
+
+    Args:
+        width (int): The width of each soup
+        height (int): The height of each soup
+        density (float): The chance of each cell being alive, in steps of 1/256
+        symmetry (str): One of SYMMETRIES. C4 and D8 soups must be square
+        seed (Optional[Union[int, str, bytes]]): Seeds the random number generator, so the same
+        seed produces the same soups. Defaults to a seed from the operating system
+
+    Raises:
+        ValueError: A parameter is out of range, or the symmetry needs a square soup
+
+    Returns:
+        An iterator of soups, each holding width * height cells (0 or 1) row by row
+
+    """
+    _validate(width, height, density, symmetry)
+    return _soups(width, height, density, symmetry, random.Random(seed))
+
+
+def _soups(
+    width: int,
+    height: int,
+    density: float,
+    symmetry: str,
+    rng: random.Random,
+) -> Iterator[bytes]:
+    """Generate an endless sequence of soups (see 'soups').
+
+    Args:
+        width (int): The width of each soup
+        height (int): The height of each soup
+        density (float): The chance of each cell being alive
+        symmetry (str): One of SYMMETRIES
+        rng (random.Random): The random number generator
+
+    Yields:
+        A soup, holding width * height cells (0 or 1) row by row
+
+    """
+    # A random byte below the threshold becomes a live cell
+    threshold = round(density * 256)
+    table = b"\1" * threshold + bytes(256 - threshold)
+    orbits = _orbits(width, height, symmetry)
+    cells = width * height
+    while True:
+        soup = rng.randbytes(cells).translate(table)
+        yield soup if orbits is None else bytes(orbits(soup))
+
+
+def fill_soup(  # noqa: PLR0913
+    automaton: Automaton,
+    start: Coordinate | None = None,
+    end: Coordinate | None = None,
+    *,
+    density: float = 0.5,
+    symmetry: str = "C1",
+    seed: int | str | bytes | None = None,
+    states: tuple[CellState, CellState] | None = None,
+) -> None:
+    """Fill a rectangle (or the whole automaton) with a random soup.
+
+    Args:
+        automaton (Automaton): The automaton to fill
+        start (Optional[Coordinate]): The top left corner of the rectangle. Defaults to (0, 0)
+        end (Optional[Coordinate]): The bottom right corner of the rectangle (inclusive).
+        Defaults to the max coordinate
+        density (float): The chance of each cell being alive, in steps of 1/256
+        symmetry (str): One of SYMMETRIES. C4 and D8 soups must fill a square
+        seed (Optional[Union[int, str, bytes]]): Seeds the random number generator
+        states (Optional[Tuple[CellState, CellState]]): The dead and the live state. Defaults to
+        those of ConwayState
+
+    """
+    start = start or Coordinate(0, 0)
+    end = end or automaton.max_coord
+    width, height = end.x - start.x + 1, end.y - start.y + 1
+    soup = next(soups(width, height, density, symmetry, seed))
+    dead, alive = states or (ConwayState(alive=False), ConwayState(alive=True))
+    pick = (dead, alive).__getitem__
+    automaton.write(
+        start,
+        [list(map(pick, soup[y : y + width])) for y in range(0, len(soup), width)],
+    )
@@ -4,11 +4,22 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, ClassVar, Protocol, Self
 
-from .color import Color
+from .cell import MooreCell, neighborhood_shape
+from .color import Color, gradient
+from .registry import get_engine
+from .rule import CENTER_BIT, isotropic_table, parse_hensel
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from .coordinate import Coordinate
+    from .engine import GenerationsEngine, IsotropicEngine, LargerThanLifeEngine
+
+# The class attributes the built-in state types keep their rules (and the colors that go with
+# them) in. They're shared by every instance, so copies of a state type in other processes, or
+# runs of other patterns, only follow the same rule if these are copied or restored
+RULE_ATTRIBUTES = ("birth_rules", "survival_rules", "state_count", "middle", "colors")
+
 
 class CellState(Protocol):
     """A protocol to reference when creating a new type of cell state."""
@@ -72,6 +83,16 @@ class ConwayState:
         """
         self.alive = alive
 
+    def __eq__(self, other: object) -> bool:
+        """Return whether another ConwayState is alive or dead alongside this one."""
+        if not isinstance(other, ConwayState):
+            return NotImplemented
+        return self.alive is other.alive
+
+    def __hash__(self) -> int:
+        """Hash the state by whether it is alive."""
+        return hash(self.alive)
+
     @property
     def color(self) -> Color:
         """Return the first index of self.colors if alive, else the second."""
@@ -123,3 +144,327 @@ class ConwayState:
                 if any(alive_count == r for r in self.birth_rules):
                     return ConwayState(alive=True)
                 return ConwayState(alive=False)
+
+
+class GenerationsState:
+    """A state that follows a Generations (B/S/C) rule, such as Brian's Brain (B2/S/C3).
+
+    Generations rules extend Conway's rules with refractory states. Instead of dying outright, a
+    live cell that fails its survival rules decays through 'state_count - 2' dying states before
+    becoming dead. Dying cells can't be born and don't count as live neighbors.
+
+    Attributes:
+        colors (Sequence[Color]): A color for each possible value. The first index is the color
+        for DEAD states, the 2nd is for ALIVE, and the rest are for each dying state in order
+        birth_rules (list[int]): A list of integers representing the rules for a cell to become
+        "resurrected"
+        survival_rules (list[int]): A list of integers representing the rules for a cell to stay
+        alive
+        state_count (int): The number of possible states, including dead and alive
+        value (int): 0 if the cell is DEAD, 1 if ALIVE, and higher values as the cell decays
+
+    """
+
+    colors: Sequence[Color] = [
+        Color("#315771"),
+        Color("#F6AE2D"),
+        *gradient(Color("#F6AE2D"), Color("#315771"), 3)[1:-1],
+    ]
+    birth_rules: ClassVar[list[int]] = [2]
+    survival_rules: ClassVar[list[int]] = []
+    state_count: ClassVar[int] = 3
+
+    def __init__(self, value: int = 0) -> None:
+        """Initialize an instance of the GenerationsState class.
+
+        Args:
+            value (int): 0 if the cell is DEAD, 1 if ALIVE, and higher values as the cell decays
+
+        """
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether another GenerationsState has the same value as this one."""
+        if not isinstance(other, GenerationsState):
+            return NotImplemented
+        return self.value == other.value
+
+    def __hash__(self) -> int:
+        """Hash the state by its value."""
+        return hash(self.value)
+
+    @property
+    def color(self) -> Color:
+        """Return the color at the index of this state's value."""
+        return self.colors[self.value]
+
+    @classmethod
+    def set_colors(cls, colors: list[Color]) -> None:
+        """Set the colors for the CellState.
+
+        Missing colors are filled in by fading from the alive color to the dead color, and extra
+        colors are dropped.
+
+        Args:
+            colors (List[Color]): The list of colors to change to
+
+        """
+        if len(colors) < cls.state_count:
+            dead = colors[0] if colors else cls.colors[0]
+            alive = colors[1] if len(colors) > 1 else cls.colors[1]
+            defaults = [dead, alive, *gradient(alive, dead, cls.state_count)[1:-1]]
+            colors.extend(defaults[len(colors) :])
+        elif len(colors) > cls.state_count:
+            colors = colors[: cls.state_count]
+
+        cls.colors = colors
+
+    @classmethod
+    def set_rule(
+        cls,
+        birth_rules: list[int],
+        survival_rules: list[int],
+        state_count: int,
+    ) -> None:
+        """Set the birth, survival and state count rules, resizing the colors to match.
+
+        Args:
+            birth_rules (list[int]): The neighbor counts a dead cell is born with
+            survival_rules (list[int]): The neighbor counts a live cell survives with
+            state_count (int): The number of possible states, including dead and alive
+
+        """
+        cls.birth_rules = birth_rules
+        cls.survival_rules = survival_rules
+        cls.state_count = state_count
+        cls.set_colors(list(cls.colors[:2]))
+
+    @classmethod
+    def make_engine(
+        cls,
+        cell_type: type,
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> GenerationsEngine | None:
+        """Build an engine that evolves this state type in bulk (see Automaton.compile).
+
+        Args:
+            cell_type (type[Cell]): The automaton's cell type. It must list its neighbors as
+            offsets in a 'neighbors' class attribute, as MooreCell and NeumannCell do
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        Returns:
+            An engine, or None if the cell type's neighbors aren't known ahead of time
+
+        """
+        offsets = getattr(cell_type, "neighbors", None)
+        if not isinstance(offsets, tuple):
+            return None
+        return get_engine("generations")(cls, offsets, max_coord, topology)
+
+    def change_state(self, neighbors: list[GenerationsState]) -> GenerationsState:
+        """Change the state of the cell.
+
+        Args:
+            neighbors (List[GenerationsState]): A list of neighbor's states
+
+        Returns:
+            The cell's new state
+
+        """
+        return self.transition(sum(n.value == 1 for n in neighbors))
+
+    def transition(self, alive_count: int) -> GenerationsState:
+        """Return the next state given the number of live neighbors.
+
+        Args:
+            alive_count (int): The number of live neighbors
+
+        Returns:
+            The cell's new state
+
+        """
+        if self.value == 0:
+            return type(self)(1 if alive_count in self.birth_rules else 0)
+        if self.value == 1 and alive_count in self.survival_rules:
+            return type(self)(1)
+        return type(self)((self.value + 1) % self.state_count)
+
+
+class LargerThanLifeState(GenerationsState):
+    """A state that follows a Larger than Life rule, such as Bosco's rule.
+
+    Bosco's rule (R5,C2,M1,S34..58,B34..45,NM) is the default.
+    Larger than Life rules are Generations rules over large neighborhoods, which are provided by
+    the automaton's cell type (see 'moore_cell' and 'neumann_cell' in the cell module). Its engine
+    counts neighbors with summed-area tables, so the cost per cell doesn't depend on the radius.
+
+    Attributes:
+        middle (bool): Whether a cell counts itself as one of its live neighbors
+
+    """
+
+    colors: Sequence[Color] = [Color("#315771"), Color("#F6AE2D")]
+    birth_rules: ClassVar[list[int]] = list(range(34, 46))
+    survival_rules: ClassVar[list[int]] = list(range(34, 59))
+    state_count: ClassVar[int] = 2
+    middle: ClassVar[bool] = True
+
+    @classmethod
+    def make_engine(
+        cls,
+        cell_type: type,
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> LargerThanLifeEngine | None:
+        """Build an engine that evolves this state type in bulk (see Automaton.compile).
+
+        Args:
+            cell_type (type[Cell]): The automaton's cell type. Its 'neighbors' class attribute must
+            fill a square or a diamond, as those of MooreCell, NeumannCell, 'moore_cell' and
+            'neumann_cell' do
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        Returns:
+            An engine, or None if the cell type's neighborhood isn't a square or a diamond
+
+        """
+        offsets = getattr(cell_type, "neighbors", None)
+        if not isinstance(offsets, tuple) or neighborhood_shape(offsets) is None:
+            return None
+        return get_engine("larger_than_life")(cls, offsets, max_coord, topology)
+
+    def change_state(self, neighbors: list[GenerationsState]) -> GenerationsState:
+        """Change the state of the cell.
+
+        Args:
+            neighbors (List[GenerationsState]): A list of neighbor's states
+
+        Returns:
+            The cell's new state
+
+        """
+        alive_count = sum(n.value == 1 for n in neighbors)
+        if self.middle and self.value == 1:
+            alive_count += 1
+        return self.transition(alive_count)
+
+
+class IsotropicState:
+    """A state that follows an isotropic non-totalistic rule, written in Hensel notation.
+
+    Unlike ConwayState, which only counts live neighbors, these rules can tell apart neighborhoods
+    with the same count by how the live neighbors are arranged (up to rotation and reflection).
+    For example, B2-a/S12 births cells with 2 live neighbors unless they are adjacent. Neighbors
+    must be passed to 'change_state' in the order of MooreCell.neighbors.
+
+    Attributes:
+        colors (Tuple[Color, Color]): A tuple of colors. The first index is the color for ALIVE
+        states. 2nd is DEAD
+        birth_rules (list[str]): The Hensel neighborhood classes (such as "2a") a dead cell is
+        born with
+        survival_rules (list[str]): The Hensel neighborhood classes a live cell survives with
+        alive (bool): Flag for whether the cell is ALIVE (True) or DEAD (False)
+
+    """
+
+    colors: Sequence[Color] = [Color("#F6AE2D"), Color("#315771")]
+    birth_rules: ClassVar[list[str]] = parse_hensel("3")
+    survival_rules: ClassVar[list[str]] = parse_hensel("23")
+
+    # The bit of the neighborhood index (see rule.CENTER_BIT) each neighbor is stored in
+    neighbor_bits: ClassVar[tuple[int, ...]] = tuple(
+        3 * (offset.y + 1) + offset.x + 1 for offset in MooreCell.neighbors
+    )
+
+    def __init__(self, alive: bool = False) -> None:
+        """Initialize an instance of the IsotropicState class.
+
+        Args:
+            alive (bool): Flag for whether the cell is ALIVE (True) or DEAD (False)
+
+        """
+        self.alive = alive
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether another IsotropicState is alive or dead alongside this one."""
+        if not isinstance(other, IsotropicState):
+            return NotImplemented
+        return self.alive is other.alive
+
+    def __hash__(self) -> int:
+        """Hash the state by whether it is alive."""
+        return hash(self.alive)
+
+    @property
+    def color(self) -> Color:
+        """Return the first index of self.colors if alive, else the second."""
+        if self.alive is True:
+            return self.colors[0]
+        return self.colors[1]
+
+    @classmethod
+    def set_colors(cls, colors: list[Color]) -> None:
+        """Set the colors for the CellState.
+
+        Args:
+            colors (List[Color]): The list of colors to change to
+
+        """
+        if len(colors) < len(IsotropicState.colors):
+            colors.extend(IsotropicState.colors[len(colors) :])
+        elif len(colors) > len(IsotropicState.colors):
+            colors = colors[: len(IsotropicState.colors)]
+
+        cls.colors = colors
+
+    @classmethod
+    def table(cls) -> bytes:
+        """Return the 512 entry table of next states for the current rules (see isotropic_table).
+
+        Returns:
+            The table, as bytes
+
+        """
+        return isotropic_table(tuple(cls.birth_rules), tuple(cls.survival_rules))
+
+    @classmethod
+    def make_engine(
+        cls,
+        cell_type: type,
+        max_coord: Coordinate,
+        topology: str = "torus",
+    ) -> IsotropicEngine | None:
+        """Build an engine that evolves this state type in bulk (see Automaton.compile).
+
+        Args:
+            cell_type (type[Cell]): The automaton's cell type, which must have a Moore neighborhood
+            max_coord (Coordinate): The maximum coordinate of the automaton
+            topology (str): How the edges of the automaton join (see the topology module)
+
+        Returns:
+            An engine, or None if the cell type's neighborhood isn't a Moore neighborhood
+
+        """
+        offsets = getattr(cell_type, "neighbors", None)
+        if not isinstance(offsets, tuple) or neighborhood_shape(offsets) != ("moore", 1):
+            return None
+        return get_engine("isotropic")(cls, max_coord, topology)
+
+    def change_state(self, neighbors: list[IsotropicState]) -> IsotropicState:
+        """Change the state of the cell by looking up its neighborhood in the rule's table.
+
+        Args:
+            neighbors (List[IsotropicState]): A list of neighbor's states, in the order of
+            MooreCell.neighbors
+
+        Returns:
+            The cell's new state
+
+        """
+        index = self.alive << CENTER_BIT
+        for n, bit in zip(neighbors, self.neighbor_bits, strict=True):
+            index |= n.alive << bit
+        return IsotropicState(alive=self.table()[index] == 1)
@@ -0,0 +1,235 @@
+"""Compiles finite, order-insensitive CellState types into transition lookup tables."""
+
+from __future__ import annotations
+
+from itertools import combinations_with_replacement
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .state import CellState
+
+# The largest number of entries a compiled table may hold for a single state
+MAX_TABLE_SIZE = 1 << 20
+# The number of times each neighborhood is probed, with its members in a different order each time
+PROBES = 4
+# The fewest calls to 'change_state' a table is compiled from, unless its state type is trusted to
+# be deterministic
+MIN_PROBES = 256
+
+
+class CompileError(Exception):
+    """The cell state type could not be compiled into a transition table."""
+
+
+def _orders(neighborhood: list[CellState], probes: int) -> list[list[CellState]]:
+    """Arrange a neighborhood's members in a different order for each probe.
+
+    Orders alternate between forwards and backwards, each rotated a little further than the last.
+
+    Args:
+        neighborhood (List[CellState]): The neighbors, in the order they were found
+        probes (int): The number of orders
+
+    Returns:
+        A list of orders, starting with the neighborhood as it is
+
+    """
+    orders = []
+    for probe in range(probes):
+        shift = probe * len(neighborhood) // probes
+        rotated = neighborhood[shift:] + neighborhood[:shift]
+        orders.append(rotated[::-1] if probe % 2 else rotated)
+    return orders
+
+
+def state_limit(neighbors: int) -> int:
+    """Find the most states a table can be compiled for without exceeding MAX_TABLE_SIZE.
+
+    Args:
+        neighbors (int): The number of neighbors every cell has
+
+    Returns:
+        The number of states. For example, 6 for Moore neighborhoods and 8 for Von Neumann ones
+
+    """
+    states = 1
+    while (neighbors + 1) ** (states + 1) <= MAX_TABLE_SIZE:
+        states += 1
+    return states
+
+
+def _probe(state: CellState, orders: list[list[CellState]]) -> CellState:
+    """Find a state's next state, once for each order of its neighborhood.
+
+    Args:
+        state (CellState): The state to probe
+        orders (List[List[CellState]]): The neighborhood, in each order to probe it in
+
+    Raises:
+        CompileError: The results are unequal
+
+    Returns:
+        The next state
+
+    """
+    result = state.change_state(orders[0])
+    if any(result != state.change_state(order) for order in orders[1:]):
+        msg = f"{type(state).__name__}.change_state is not deterministic"
+        raise CompileError(msg)
+    return result
+
+
+class TransitionTable:
+    """A lookup table of every transition a finite, order-insensitive cell state can make.
+
+    A neighborhood is identified by how many neighbors are in each state rather than by their
+    order. Each state is assigned a code, and a neighborhood's key is the sum of
+    (neighbors + 1) ** code over its members, which is unique for every combination of counts.
+
+    Attributes:
+        states (Tuple[CellState, ...]): The distinct states, indexed by their code
+        neighbors (int): The number of neighbors every cell has
+        weights (np.ndarray): The amount each state's code contributes to a neighborhood key
+        table (np.ndarray): The code of the next state, indexed by [code, key]
+
+    """
+
+    def __init__(self, states: tuple[CellState, ...], neighbors: int, table: np.ndarray) -> None:
+        """Initialize an instance of the TransitionTable class.
+
+        Args:
+            states (Tuple[CellState, ...]): The distinct states, indexed by their code
+            neighbors (int): The number of neighbors every cell has
+            table (np.ndarray): The code of the next state, indexed by [code, key]
+
+        """
+        self.states = states
+        self.neighbors = neighbors
+        self.weights = (neighbors + 1) ** np.arange(len(states), dtype=np.int64)
+        self.table = table
+
+    @classmethod
+    def compile(
+        cls,
+        seeds: Iterable[CellState],
+        neighbors: int,
+        max_states: int | None = None,
+    ) -> TransitionTable:
+        """Probe 'change_state' for every state and neighborhood reachable from the seeds.
+
+        Each neighborhood is probed PROBES times, with its members in a different order each time.
+        A state that returns unequal results is either non-deterministic or sensitive to neighbor
+        order, and cannot be compiled.
+
+        Tables that take fewer than MIN_PROBES calls are probed again until that many are made.
+        Probing only catches randomness that shows up while probing, so a state that is random
+        only rarely may still compile. State types can settle this with a 'deterministic' class
+        attribute: False is never compiled, and True is trusted, so each neighborhood is only
+        probed forwards and backwards to check that the order of neighbors doesn't matter.
+
+        Args:
+            seeds (Iterable[CellState]): The states to start from (usually those on the board)
+            neighbors (int): The number of neighbors every cell has
+            max_states (Optional[int]): The number of distinct states to give up after. Defaults
+            to, and can't exceed, the most a table of MAX_TABLE_SIZE entries can hold (see
+            'state_limit')
+
+        Raises:
+            CompileError: The states are unhashable, unbounded, or not deterministic
+
+        Returns:
+            TransitionTable
+
+        """
+        limit = state_limit(neighbors)
+        max_states = limit if max_states is None else min(max_states, limit)
+        states: list[CellState] = []
+        codes: dict[CellState, int] = {}
+        probes = PROBES
+
+        def encode(state: CellState) -> int:
+            try:
+                code = codes.get(state)
+            except TypeError:
+                msg = f"{type(state).__name__} is not hashable"
+                raise CompileError(msg) from None
+            if code is None:
+                if len(states) == max_states:
+                    msg = f"More than {max_states} distinct states were reached"
+                    raise CompileError(msg)
+                code = codes[state] = len(states)
+                states.append(state)
+            return code
+
+        for seed in seeds:
+            encode(seed)
+        if not states:
+            msg = "No states to compile"
+            raise CompileError(msg)
+        deterministic = getattr(type(states[0]), "deterministic", None)
+        if deterministic is False:
+            msg = f"{type(states[0]).__name__} is not deterministic"
+            raise CompileError(msg)
+        if deterministic:
+            probes = 2
+
+        radix = neighbors + 1
+        transitions: dict[tuple[int, int], int] = {}
+        orders: dict[int, list[list[CellState]]] = {}
+        probed = 0
+        while probed < len(states):
+            probed = len(states)
+            for combo in combinations_with_replacement(range(probed), neighbors):
+                key = sum(radix**c for c in combo)
+                if key not in orders:
+                    orders[key] = _orders([states[c] for c in combo], probes)
+                for code in range(probed):
+                    if (code, key) not in transitions:
+                        transitions[code, key] = encode(_probe(states[code], orders[key]))
+
+        # Small tables are probed again, so a random state can't have agreed with itself by chance
+        calls = probes * len(transitions)
+        while not deterministic and calls < MIN_PROBES:
+            for (code, key), result in transitions.items():
+                if _probe(states[code], orders[key]) != states[result]:
+                    msg = f"{type(states[code]).__name__}.change_state is not deterministic"
+                    raise CompileError(msg)
+            calls += probes * len(transitions)
+
+        size = radix ** len(states)
+        if size > MAX_TABLE_SIZE:
+            msg = f"A table for {len(states)} states would need {size} entries per state"
+            raise CompileError(msg)
+        table = np.zeros((len(states), size), dtype=np.uint8)
+        for (code, key), result in transitions.items():
+            table[code, key] = result
+
+        return cls(tuple(states), neighbors, table)
+
+    def step(
+        self,
+        codes: np.ndarray,
+        neighbor_index: np.ndarray,
+        edge: int | None = None,
+    ) -> np.ndarray:
+        """Compute the next generation of codes.
+
+        Args:
+            codes (np.ndarray): The flat array of each cell's state code
+            neighbor_index (np.ndarray): A (cells, neighbors) array of each cell's neighbors'
+            positions in 'codes'
+            edge (Optional[int]): The code of the cells past a dead edge, which are at the
+            position just past the last cell (see the topology module)
+
+        Returns:
+            The flat array of each cell's next state code
+
+        """
+        neighbor_codes = codes if edge is None else np.append(codes, np.uint8(edge))
+        keys = self.weights[neighbor_codes[neighbor_index]].sum(axis=1)
+        next_codes: np.ndarray = self.table[codes, keys]
+        return next_codes
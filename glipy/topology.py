@@ -0,0 +1,132 @@
+"""Maps the neighbors of every cell across the edges of a board, for each boundary topology.
+
+How a board's edges join decides which cells neighbor those along them:
+    - "torus": opposite edges join, so cells leaving one edge come back on the other
+    - "plane": the edges are dead ends. Every cell past them is in the background state
+    - "cylinder": the left and right edges join, and the top and bottom edges are dead ends
+    - "klein": a Klein bottle. Like a torus, but crossing the top or bottom edge reverses x
+    - "cross": a cross-surface (the real projective plane). Crossing the top or bottom edge
+      reverses x, and crossing the left or right edge reverses y
+
+Rather than checking the edges for every neighbor of every cell, the topology is folded into
+flat maps of positions (counting row by row) once, when a board is built. Automata read each
+cell's neighbors from these maps, and array engines gather a padded copy of the board with one
+indexing operation (see 'padding_map'), so the topology never adds a branch to evolving.
+
+Every cell past a dead edge maps to the position just past the last cell, (xmax + 1) * (ymax + 1),
+so a background state appended to a board's cells stands in for all of them.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .coordinate import Coordinate
+
+TOPOLOGIES = ("torus", "plane", "cylinder", "klein", "cross")
+# The topologies with dead edges, past which every cell is in the background state
+DEAD_EDGES = ("plane", "cylinder")
+
+# Whether x and y wrap around, and whether crossing the top or bottom edge reverses x, and
+# crossing the left or right edge reverses y
+_RULES = {
+    "torus": (True, True, False, False),
+    "plane": (False, False, False, False),
+    "cylinder": (True, False, False, False),
+    "klein": (True, True, True, False),
+    "cross": (True, True, True, True),
+}
+
+
+def _fold(coords: range, size: int, wraps: bool) -> list[tuple[int, int]]:
+    """Fold coordinates along one axis back onto the board.
+
+    Args:
+        coords (range): The coordinates, which may lie past either edge
+        size (int): The size of the board along this axis
+        wraps (bool): Whether the axis wraps around (True), or has dead edges (False)
+
+    Returns:
+        The index each coordinate lands at (-1 past a dead edge), and whether it crossed the
+        edges an odd number of times
+
+    """
+    folded = []
+    for coord in coords:
+        crossings, index = divmod(coord, size)
+        folded.append((index if wraps or not crossings else -1, crossings & 1))
+    return folded
+
+
+def _positions(xs: range, ys: range, max_coord: Coordinate, topology: str) -> list[int]:
+    """Find where each coordinate in a rectangle lands on the board, row by row.
+
+    Args:
+        xs (range): The x coordinates of the rectangle, which may lie past the edges
+        ys (range): The y coordinates of the rectangle, which may lie past the edges
+        max_coord (Coordinate): The maximum coordinate of the board
+        topology (str): One of TOPOLOGIES
+
+    Returns:
+        A flat list of positions, counting row by row
+
+    """
+    width, height = max_coord.x + 1, max_coord.y + 1
+    wrap_x, wrap_y, reverse_x, reverse_y = _RULES[topology]
+    outside = width * height
+    columns = _fold(xs, width, wrap_x)
+    # Each column's x, depending on whether its row crossed the top or bottom edge
+    straight = [x for x, _ in columns]
+    reversed_ = [width - 1 - x if x >= 0 else -1 for x in straight] if reverse_x else straight
+    positions: list[int] = []
+    for y, y_crossed in _fold(ys, height, wrap_y):
+        if y < 0:
+            positions.extend([outside] * len(columns))
+            continue
+        flipped_y = height - 1 - y if reverse_y else y
+        row = reversed_ if y_crossed else straight
+        positions.extend(
+            outside if x < 0 else (flipped_y if x_crossed else y) * width + x
+            for x, (_, x_crossed) in zip(row, columns, strict=True)
+        )
+    return positions
+
+
+def neighbor_map(offset: Coordinate, max_coord: Coordinate, topology: str = "torus") -> list[int]:
+    """Find the position of one neighbor of every cell.
+
+    Args:
+        offset (Coordinate): The position of the neighbor relative to its cell
+        max_coord (Coordinate): The maximum coordinate of the board
+        topology (str): One of TOPOLOGIES
+
+    Returns:
+        The neighbor's position for each cell, counting row by row. Neighbors past a dead edge
+        are at (xmax + 1) * (ymax + 1)
+
+    """
+    xs = range(offset.x, max_coord.x + 1 + offset.x)
+    ys = range(offset.y, max_coord.y + 1 + offset.y)
+    return _positions(xs, ys, max_coord, topology)
+
+
+def padding_map(max_coord: Coordinate, radius: int, topology: str = "torus") -> list[int]:
+    """Find where each cell of a board padded by 'radius' cells on every side is read from.
+
+    Array engines gather the padded board from this map, then read each cell's neighbors from
+    plain slices of it.
+
+    Args:
+        max_coord (Coordinate): The maximum coordinate of the board
+        radius (int): The number of cells added past each edge
+        topology (str): One of TOPOLOGIES
+
+    Returns:
+        The position of each cell of the padded board, counting row by row. Cells past a dead
+        edge are at (xmax + 1) * (ymax + 1)
+
+    """
+    xs = range(-radius, max_coord.x + 1 + radius)
+    ys = range(-radius, max_coord.y + 1 + radius)
+    return _positions(xs, ys, max_coord, topology)
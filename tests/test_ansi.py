@@ -0,0 +1,101 @@
+"""Tests encoding generations as ANSI escape sequences."""
+
+import random
+import re
+
+from ward import each, test
+
+from glipy.ansi import FrameEncoder, changed_spans
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.state import ConwayState
+
+ESCAPE = re.compile(r"\x1b\[(\d+);(\d+)H|\x1b\[(\d+)(?:;2;(\d+);(\d+);(\d+))?m|(.)", re.DOTALL)
+
+Screen = dict[tuple[int, int], tuple[str, object, object]]
+
+
+def play(screen: Screen, frame: bytes) -> None:
+    """Apply a frame to a screen, tracking each character and its colors."""
+    row = column = 1
+    foreground = background = None
+    for match in ESCAPE.finditer(frame.decode()):
+        move_row, move_column, code, *channels, char = match.groups()
+        if move_row:
+            row, column = int(move_row), int(move_column)
+        elif char:
+            screen[row, column] = (char, foreground, background)
+            column += 1
+        elif code in {"0", "49"}:
+            background = None
+            foreground = None if code == "0" else foreground
+        elif code == "38":
+            foreground = "#{:02X}{:02X}{:02X}".format(*map(int, channels))
+        else:
+            background = "#{:02X}{:02X}{:02X}".format(*map(int, channels))
+
+
+def shown(screen: Screen, automaton: Automaton, half_blocks: bool) -> list[list[object]]:
+    """Read back the color of each cell from a screen."""
+    colors = []
+    for y in range(automaton.ymax + 1):
+        row = []
+        for x in range(automaton.xmax + 1):
+            if not half_blocks:
+                char, _, background = screen[y + 1, 2 * x + 1]
+                assert screen[y + 1, 2 * x + 2] == (char, None, background)
+                row.append(background)
+                continue
+            char, foreground, background = screen[y // 2 + 1, x + 1]
+            half = foreground if char == "▀" and y % 2 == 0 else background
+            row.append(half)
+        colors.append(row)
+    return colors
+
+
+@test("changed_spans: nearby changes are merged, distant ones are kept apart")
+def _() -> None:
+    assert changed_spans(b"\0" * 12, b"\0" * 12) == []
+    assert changed_spans(b"\0" * 12, b"\1\0\0\1" + b"\0" * 8) == [slice(0, 4)]
+    assert changed_spans(b"\0" * 12, b"\1" + b"\0" * 10 + b"\1") == [slice(0, 1), slice(11, 12)]
+    assert changed_spans(b"\0\0\0\0", b"\0\0\0\1", step=2) == [slice(1, 2)]
+
+
+@test("FrameEncoder: frames draw every generation exactly ({mode}, {height} rows)")
+def _(
+    mode: str = each("spaces", "half blocks", "half blocks"),
+    height: int = each(12, 12, 11),
+) -> None:
+    half_blocks = mode == "half blocks"
+    rng = random.Random(5)
+    states = [
+        [ConwayState(alive=rng.randint(0, 1) == 1) for _ in range(16)] for _ in range(height)
+    ]
+    automaton: Automaton = Automaton(MooreCell, states, 15, height - 1)
+    encoder = FrameEncoder(automaton, half_blocks=half_blocks)
+    screen: Screen = {}
+    sizes = []
+    for _ in range(6):
+        frame = encoder.encode()
+        sizes.append(len(frame))
+        play(screen, frame)
+        expected = [[data.state.color.upper() for data in row] for row in automaton]
+        assert shown(screen, automaton, half_blocks) == expected
+        automaton.evolve()
+
+    # Later frames only redraw what changed
+    assert max(sizes[1:]) < sizes[0]
+
+
+@test("FrameEncoder: runs of one color are written as a single span")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, ConwayState(alive=False), 99, 0)
+    frame = FrameEncoder(automaton).encode()
+    assert frame.count(b"\x1b[48;2;") == 1
+    assert frame.count(b" ") == 2 * 100
+    assert FrameEncoder(automaton).encode() == frame
+    encoder = FrameEncoder(automaton)
+    encoder.encode()
+    assert encoder.encode() == b""
+    encoder.reset()
+    assert encoder.encode() == frame
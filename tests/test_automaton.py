@@ -0,0 +1,350 @@
+"""Tests Automaton behavior."""
+
+from __future__ import annotations
+
+import random
+import tracemalloc
+from itertools import product
+
+from ward import fixture, raises, test
+
+from glipy.automaton import MAX_COLORS, Automaton
+from glipy.cell import MooreCell
+from glipy.color import Color
+from glipy.coordinate import Coordinate
+from glipy.state import ConwayState
+
+from .test_table import CyclicState
+
+
+@fixture
+def blinker() -> Automaton:
+    """Return a 5x5 automaton holding a horizontal blinker."""
+    automaton: Automaton = Automaton(MooreCell, ConwayState(alive=False), 4, 4)
+    for x in range(1, 4):
+        automaton.set_state(Coordinate(x, 2), ConwayState(alive=True))
+    return automaton
+
+
+@test("Automaton: 'codes' is shaped (ymax + 1, xmax + 1) and indexes into 'palette'")
+def _(automaton: Automaton = blinker) -> None:
+    codes = automaton.codes
+    assert codes.shape == (5, 5)
+    for y, row in enumerate(automaton):
+        for x, data in enumerate(row):
+            assert automaton.palette[codes[y, x]] == data.state.color
+
+
+@test("Automaton: a 'codes' view taken before evolving reflects later generations")
+def _(automaton: Automaton = blinker) -> None:
+    codes = automaton.codes
+    alive = automaton.palette.index(ConwayState(alive=True).color)
+    automaton.evolve()
+    assert [codes[y, 2] == alive for y in range(5)] == [False, True, True, True, False]
+    assert codes.readonly
+
+
+@test("Automaton: iterating is re-entrant")
+def _(automaton: Automaton = blinker) -> None:
+    pairs = [(a, b) for a in automaton for b in automaton]
+    assert len(pairs) == len(automaton.matrix) ** 2
+
+
+def alive_cells(automaton: Automaton) -> set[tuple[int, int]]:
+    """Return the coordinates of every live cell in an automaton."""
+    return {
+        (x, y)
+        for y, row in enumerate(automaton.matrix)
+        for x, data in enumerate(row)
+        if data.state.alive
+    }
+
+
+def glider() -> Automaton:
+    """Return a 3x3 automaton holding a glider."""
+    automaton: Automaton = Automaton(MooreCell, ConwayState(alive=False), 2, 2)
+    for x, y in ((1, 0), (2, 1), (0, 2), (1, 2), (2, 2)):
+        automaton.set_state(Coordinate(x, y), ConwayState(alive=True))
+    return automaton
+
+
+for compiled, compact in product((False, True), repeat=2):
+
+    @test("Automaton: 'paste' wraps around the edges, or clips them ({compiled=}, {compact=})")
+    def _(compiled: bool = compiled, compact: bool = compact) -> None:
+        wrapped: Automaton = Automaton(MooreCell, ConwayState(alive=False), 4, 4, compact=compact)
+        clipped: Automaton = Automaton(MooreCell, ConwayState(alive=False), 4, 4, compact=compact)
+        if compiled:
+            assert wrapped.compile()
+            assert clipped.compile()
+            wrapped.evolve()
+            clipped.evolve()
+
+        wrapped.paste(glider(), Coordinate(3, -1))
+        clipped.paste(glider(), Coordinate(3, -1), wrap=False)
+        assert alive_cells(wrapped) == {(4, 4), (0, 0), (3, 1), (4, 1), (0, 1)}
+        assert alive_cells(clipped) == {(3, 1), (4, 1)}
+        assert all(
+            wrapped.palette[wrapped.codes[y, x]] == data.state.color
+            for y, row in enumerate(wrapped.matrix)
+            for x, data in enumerate(row)
+        )
+
+    @test("Automaton: 'paste' combines states in 'or' and 'xor' modes ({compiled=}, {compact=})")
+    def _(compiled: bool = compiled, compact: bool = compact) -> None:
+        automata = {}
+        for mode in ("overwrite", "or", "xor"):
+            automaton: Automaton = Automaton(
+                MooreCell,
+                ConwayState(alive=False),
+                2,
+                2,
+                compact=compact,
+            )
+            automaton.set_state(Coordinate(0, 0), ConwayState(alive=True))
+            automaton.set_state(Coordinate(1, 0), ConwayState(alive=True))
+            if compiled:
+                assert automaton.compile()
+            automaton.paste(glider(), Coordinate(0, 0), mode)
+            automata[mode] = alive_cells(automaton)
+
+        glider_cells = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+        assert automata["overwrite"] == glider_cells
+        assert automata["or"] == glider_cells | {(0, 0)}
+        assert automata["xor"] == glider_cells ^ {(0, 0), (1, 0)}
+
+    @test("Automaton: 'extract', 'fill' and 'clear' work on rectangles ({compiled=}, {compact=})")
+    def _(compiled: bool = compiled, compact: bool = compact) -> None:
+        automaton: Automaton = Automaton(
+            MooreCell,
+            ConwayState(alive=False),
+            5,
+            5,
+            compact=compact,
+        )
+        if compiled:
+            assert automaton.compile()
+        automaton.fill(ConwayState(alive=True), Coordinate(1, 1), Coordinate(3, 2))
+        assert alive_cells(automaton) == {(x, y) for x in range(1, 4) for y in range(1, 3)}
+
+        region = automaton.extract(Coordinate(2, 0), Coordinate(5, 1))
+        assert region.max_coord == Coordinate(3, 1)
+        assert alive_cells(region) == {(0, 1), (1, 1)}
+
+        automaton.clear(Coordinate(0, 0), Coordinate(2, 5))
+        assert alive_cells(automaton) == {(3, 1), (3, 2)}
+        automaton.clear()
+        assert not alive_cells(automaton)
+
+
+@test("Automaton: 'paste' rejects unknown modes")
+def _(automaton: Automaton = blinker) -> None:
+    with raises(ValueError):
+        automaton.paste(glider(), Coordinate(0, 0), "and")
+
+
+def scanned_stats(automaton: Automaton) -> tuple:
+    """Return the population, row/column populations and bounding box found by scanning."""
+    cells = alive_cells(automaton)
+    rows = [sum(y == cy for _, cy in cells) for y in range(automaton.ymax + 1)]
+    columns = [sum(x == cx for cx, _ in cells) for x in range(automaton.xmax + 1)]
+    box = None
+    if cells:
+        box = (
+            Coordinate(min(x for x, _ in cells), min(y for _, y in cells)),
+            Coordinate(max(x for x, _ in cells), max(y for _, y in cells)),
+        )
+    return len(cells), rows, columns, box
+
+
+for compiled, compact in product((False, True), repeat=2):
+
+    @test("Automaton: population statistics stay in step with the cells ({compiled=}, {compact=})")
+    def _(compiled: bool = compiled, compact: bool = compact) -> None:
+        automaton: Automaton = Automaton(
+            MooreCell,
+            ConwayState(alive=False),
+            9,
+            7,
+            compact=compact,
+        )
+        if compiled:
+            assert automaton.compile()
+
+        def check() -> None:
+            population, rows, columns, box = scanned_stats(automaton)
+            assert automaton.population == population
+            assert automaton.row_population.tolist() == rows
+            assert automaton.column_population.tolist() == columns
+            assert automaton.bounding_box == box
+
+        check()
+        automaton.paste(glider(), Coordinate(1, 1))
+        check()
+        for _ in range(6):
+            automaton.evolve()
+            check()
+        automaton.set_state(Coordinate(9, 0), ConwayState(alive=True))
+        check()
+        automaton.set_state(Coordinate(9, 0), ConwayState(alive=False))
+        check()
+        automaton.fill(ConwayState(alive=True), Coordinate(0, 5), Coordinate(1, 7))
+        check()
+        automaton.clear(Coordinate(0, 0), Coordinate(9, 5))
+        check()
+        automaton.clear()
+        check()
+
+
+@test("Automaton: a compact automaton evolves like a regular one, in far less memory")
+def _() -> None:
+    rng = random.Random(11)
+    states = [[CyclicState(rng.randint(0, 2)) for _ in range(40)] for _ in range(30)]
+
+    tracemalloc.start()
+    regular: Automaton = Automaton(MooreCell, states, 39, 29)
+    regular_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    compact: Automaton = Automaton(MooreCell, states, 39, 29, compact=True)
+    compact_size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert compact_size * 10 < regular_size
+
+    for _ in range(4):
+        regular.evolve()
+        compact.evolve()
+        assert compact.codes.tolist() == regular.codes.tolist()
+        assert [[d.state for d in row] for row in compact] == [
+            [d.state for d in row] for row in regular
+        ]
+
+    assert compact.compile()
+    regular.evolve()
+    compact.evolve()
+    assert compact.read(Coordinate(0, 0), compact.max_coord) == [
+        [d.state for d in row] for row in regular
+    ]
+
+
+class ShadowState(CyclicState):
+    """A CyclicState whose third state has the same color as the background."""
+
+    colors = (Color("000000"), Color("FF0000"), Color("000000"))
+
+    def change_state(self, neighbors: list[CyclicState]) -> ShadowState:
+        """Advance like a CyclicState."""
+        return ShadowState(super().change_state(neighbors).value)
+
+
+class UnlistedState(CyclicState):
+    """A CyclicState whose third state has a color that isn't in 'colors'."""
+
+    colors = (Color("000000"), Color("FF0000"))
+
+    @property
+    def color(self) -> Color:
+        """Return the color of this state's value."""
+        return Color("0000FF") if self.value == 2 else self.colors[self.value]  # noqa: PLR2004
+
+    def change_state(self, neighbors: list[CyclicState]) -> UnlistedState:
+        """Advance like a CyclicState."""
+        return UnlistedState(super().change_state(neighbors).value)
+
+
+for mode in ("plain", "compact", "compiled"):
+
+    @test("Automaton: liveness follows states, not colors ({mode})")
+    def _(mode: str = mode) -> None:
+        rng = random.Random(3)
+        states = [[ShadowState(rng.randint(0, 2)) for _ in range(10)] for _ in range(8)]
+        automaton: Automaton = Automaton(MooreCell, states, 9, 7, compact=mode == "compact")
+        if mode == "compiled":
+            assert automaton.compile()
+        automaton.set_state(Coordinate(0, 0), ShadowState(2))
+        assert automaton.live[0, 0]
+        for _ in range(4):
+            live = [[int(d.state != ShadowState(0)) for d in row] for row in automaton]
+            assert automaton.live.tolist() == live
+            assert automaton.population == sum(map(sum, live))
+            automaton.evolve()
+
+    @test("Automaton: states whose colors are missing from 'colors' extend 'palette' ({mode})")
+    def _(mode: str = mode) -> None:
+        automaton: Automaton = Automaton(
+            MooreCell,
+            UnlistedState(0),
+            4,
+            4,
+            compact=mode == "compact",
+        )
+        if mode == "compiled":
+            assert automaton.compile()
+        automaton.set_state(Coordinate(2, 2), UnlistedState(2))
+        assert automaton.palette == (Color("000000"), Color("FF0000"), Color("0000FF"))
+        assert automaton.codes[2, 2] == 2  # noqa: PLR2004
+        assert automaton.population == 1
+        # Surrounded by the state after it, the cell advances back to the background
+        automaton.evolve()
+        assert automaton.population == 0
+
+
+for compiled in (False, True):
+
+    @test("Automaton: 'write_regions' matches writing each rectangle in turn ({compiled=})")
+    def _(compiled: bool = compiled) -> None:
+        alive, dead = ConwayState(alive=True), ConwayState(alive=False)
+        regions = [
+            (Coordinate(0, 0), [[alive, dead, alive]]),
+            (Coordinate(6, 3), [[alive], [alive], [dead], [alive]]),
+            (Coordinate(-1, 5), [[alive, alive], [alive, alive]]),
+        ]
+        together: Automaton = Automaton(MooreCell, ConwayState(alive=False), 7, 6)
+        in_turn: Automaton = Automaton(MooreCell, ConwayState(alive=False), 7, 6)
+        if compiled:
+            assert together.compile()
+        together.write_regions(regions)
+        for origin, rows in regions:
+            in_turn.write(origin, rows)
+        assert together.read(Coordinate(0, 0), together.max_coord) == in_turn.read(
+            Coordinate(0, 0),
+            in_turn.max_coord,
+        )
+        assert together.population == in_turn.population == 7  # noqa: PLR2004
+        assert together.bounding_box == in_turn.bounding_box
+
+
+class RainbowState(CyclicState):
+    """A state whose every value has a color of its own, none of them listed in 'colors'."""
+
+    colors = (Color("000000"),)
+
+    @property
+    def color(self) -> Color:
+        """Return a color made from this state's value."""
+        return Color(f"{self.value:06X}")
+
+    def change_state(self, neighbors: list[CyclicState]) -> RainbowState:  # noqa: ARG002
+        """Count on by one, past the colors the palette can hold."""
+        return RainbowState(self.value + MAX_COLORS)
+
+
+for compact in (False, True):
+
+    @test("Automaton: colors past the palette's limit raise 'ValueError' ({compact=})")
+    def _(compact: bool = compact) -> None:
+        automaton: Automaton = Automaton(MooreCell, RainbowState(0), 19, 19, compact=compact)
+        for value in range(1, MAX_COLORS):
+            automaton.set_state(Coordinate(value % 20, value // 20), RainbowState(value))
+        assert len(automaton.palette) == MAX_COLORS
+        codes = automaton.codes.tobytes()
+
+        with raises(ValueError):
+            automaton.set_state(Coordinate(0, 0), RainbowState(MAX_COLORS))
+        assert automaton.read(Coordinate(0, 0), Coordinate(0, 0)) == [[RainbowState(0)]]
+        with raises(ValueError):
+            automaton.evolve()
+        assert automaton.generation == 0
+        assert automaton.codes.tobytes() == codes
+        assert automaton.read(Coordinate(1, 0), Coordinate(1, 0)) == [[RainbowState(1)]]
+        assert automaton.population == MAX_COLORS - 1
@@ -2,7 +2,7 @@
 
 from ward import fixture, test
 
-from glipy.cell import MooreCell, NeumannCell
+from glipy.cell import MooreCell, NeumannCell, moore_cell, neumann_cell
 from glipy.coordinate import Coordinate
 
 
@@ -90,3 +90,14 @@ def _() -> None:
     c = MooreCell(Coordinate(2, 2))
     neighbors = c.get_neighbors(max_coord())
     assert all(n in neighbors for n in [Coordinate(2, 0), Coordinate(0, 2)])
+
+
+@test("moore_cell and neumann_cell: neighborhoods of radius 2 wrap and hold 24 and 12 neighbors")
+def _() -> None:
+    moore = moore_cell(2)(Coordinate(0, 0)).get_neighbors(Coordinate(4, 4))
+    neumann = neumann_cell(2)(Coordinate(0, 0)).get_neighbors(Coordinate(4, 4))
+    assert len(set(moore)) == len(moore_cell(2).neighbors)
+    assert len(set(neumann)) == len(neumann_cell(2).neighbors)
+    assert Coordinate(3, 3) in moore
+    assert Coordinate(3, 3) not in neumann
+    assert Coordinate(0, 3) in neumann
@@ -0,0 +1,172 @@
+"""Tests the command line batch runner, and the RLE it writes."""
+
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from ward import raises, test
+
+from glipy import from_conway_rle, to_conway_rle
+from glipy.cli import BINARY_HEADER, BINARY_MAGIC, main
+from glipy.state import ConwayState, GenerationsState, IsotropicState, LargerThanLifeState
+
+GLIDER = "#N Glider\nx = 8, y = 6, rule = B3/S23\nbo$2bo$3o!\n"
+
+
+@contextmanager
+def preserved_rules() -> Iterator[None]:
+    """Restore the class-level rules of every state type that reading RLE may change."""
+    names = ("birth_rules", "survival_rules", "state_count", "middle", "colors")
+    saved = [
+        (state_type, {name: vars(state_type)[name] for name in names if name in vars(state_type)})
+        for state_type in (ConwayState, GenerationsState, LargerThanLifeState, IsotropicState)
+    ]
+    try:
+        yield
+    finally:
+        for state_type, attributes in saved:
+            for name, value in attributes.items():
+                setattr(state_type, name, value)
+
+
+def states(rle: str) -> list[list[bool]]:
+    """Return whether each cell of an RLE pattern is alive."""
+    return [[data.state.alive for data in row] for row in from_conway_rle(rle)]
+
+
+@test("to_conway_rle: patterns survive a round trip through RLE")
+def _() -> None:
+    for rle in (
+        GLIDER,
+        "x = 4, y = 3, rule = B2/S/C3\n.AB2$2A!\n",
+        "x = 3, y = 2, rule = B2-a/S12\nobo$o!\n",
+        "x = 9, y = 9, rule = R2,C2,M1,S3..6,B4..5,NN\n2$3bo!\n",
+    ):
+        with preserved_rules():
+            written = to_conway_rle(from_conway_rle(rle))
+        assert written.splitlines() == rle.splitlines()[-2:]
+
+
+for engine in ("auto", "python", "table"):
+
+    @test("glipy: RLE snapshots are written every N generations ({engine=})")
+    def _(engine: str = engine) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "glider.rle"
+            path.write_text(GLIDER)
+            status = main([str(path), "-g", "8", "-s", "4", "-o", directory, "-e", engine, "-q"])
+            assert status == 0
+
+            names = sorted(p.name for p in Path(directory).glob("glider.*.rle"))
+            assert names == ["glider.0.rle", "glider.4.rle", "glider.8.rle"]
+
+            expected = from_conway_rle(GLIDER)
+            for _ in range(8):
+                expected.evolve()
+            assert states((Path(directory) / "glider.8.rle").read_text()) == states(
+                to_conway_rle(expected),
+            )
+
+
+@test("glipy: binary snapshots hold a header and each cell's color index")
+def _() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "glider.rle"
+        path.write_text(GLIDER)
+        assert main([str(path), "-g", "3", "-f", "binary", "-o", directory, "-q"]) == 0
+
+        data = (Path(directory) / "glider.3.bin").read_bytes()
+        magic, width, height, generation = BINARY_HEADER.unpack_from(data)
+        assert (magic, width, height, generation) == (BINARY_MAGIC, 8, 6, 3)
+
+        expected = from_conway_rle(GLIDER)
+        for _ in range(3):
+            expected.evolve()
+        assert data[BINARY_HEADER.size :] == expected.codes.tobytes()
+
+
+@test("glipy: image snapshots are written per generation, and GIF frames to one animation")
+def _() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "glider.rle"
+        path.write_text(GLIDER)
+        assert main([str(path), "-g", "4", "-s", "2", "-f", "png", "-o", directory, "-q"]) == 0
+        names = sorted(p.name for p in Path(directory).glob("glider.*.png"))
+        assert names == ["glider.0.png", "glider.2.png", "glider.4.png"]
+
+        assert (
+            main(
+                [
+                    str(path),
+                    "-g",
+                    "4",
+                    "-s",
+                    "2",
+                    "-f",
+                    "gif",
+                    "--scale",
+                    "3",
+                    "-o",
+                    directory,
+                    "-q",
+                ],
+            )
+            == 0
+        )
+        animation = (Path(directory) / "glider.gif").read_bytes()
+        assert animation.startswith(b"GIF89a")
+        assert animation.endswith(b";")
+        assert animation.count(b"\x21\xf9\x04") == len(names)
+
+
+@test("glipy: a pattern without a rule runs B3/S23, whatever the pattern before it ran")
+def _() -> None:
+    # Two rows of three cells, whose middle cell is born with 6 neighbors in HighLife only
+    rows = "x = 7, y = 7\n2$2b3o2$2b3o!\n"
+    with preserved_rules():
+        expected = from_conway_rle(rows)
+        expected.evolve()
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = Path(directory) / "a.rle", Path(directory) / "b.rle"
+        first.write_text(rows.replace("y = 7", "y = 7, rule = B36/S23"))
+        second.write_text(rows)
+        with preserved_rules():
+            assert main([str(first), str(second), "-g", "1", "-o", directory, "-q"]) == 0
+            assert ConwayState.birth_rules == [3]
+            highlife = states((Path(directory) / "a.1.rle").read_text())
+            life = states((Path(directory) / "b.1.rle").read_text())
+        assert life == states(to_conway_rle(expected))
+        assert highlife != life
+
+
+@test("glipy: naming an engine fails patterns that engine doesn't evolve")
+def _() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        glider = Path(directory) / "glider.rle"
+        glider.write_text(GLIDER)
+        brain = Path(directory) / "brain.rle"
+        brain.write_text("x = 4, y = 3, rule = B2/S/C3\n.AB2$2A!\n")
+        with preserved_rules():
+            assert main([str(brain), "-g", "2", "-o", directory, "-e", "generations", "-q"]) == 0
+            assert main([str(glider), "-g", "2", "-o", directory, "-e", "generations", "-q"]) == 1
+            with raises(SystemExit):
+                main([str(glider), "-g", "2", "-o", directory, "-e", "no_such_engine", "-q"])
+
+
+@test("glipy: a pattern that fails is reported, and the rest of the batch still runs")
+def _() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        broken = Path(directory) / "broken.rle"
+        broken.write_text("not a pattern\n")
+        # Too many colors for a GIF, which fails after the animation is started
+        colorful = Path(directory) / "colorful.rle"
+        colorful.write_text("x = 3, y = 1, rule = B2/S/C300\n3A!\n")
+        glider = Path(directory) / "glider.rle"
+        glider.write_text(GLIDER)
+        paths = [str(broken), str(colorful), str(glider)]
+        with preserved_rules():
+            status = main([*paths, "-g", "2", "-s", "1", "-f", "gif", "-o", directory, "-q"])
+        assert status == 1
+        assert sorted(p.name for p in Path(directory).glob("*.gif")) == ["glider.gif"]
+        assert (Path(directory) / "glider.gif").read_bytes().startswith(b"GIF89a")
@@ -0,0 +1,34 @@
+"""Tests storing cell states compactly."""
+
+from ward import raises, test
+
+from glipy.compact import CompactStates
+from glipy.state import ConwayState
+
+
+@test("CompactStates: each distinct state is kept once, and cells index into the palette")
+def _() -> None:
+    states = [ConwayState(alive=n % 3 == 0) for n in range(10)]
+    compact = CompactStates(states)
+    assert compact.palette == [ConwayState(alive=True), ConwayState(alive=False)]
+    assert compact.cells.typecode == "B"
+    assert list(compact) == states
+
+    compact[1] = ConwayState(alive=True)
+    assert compact[1] == ConwayState(alive=True)
+    assert len(compact.palette) == 2  # noqa: PLR2004
+
+
+@test("CompactStates: the index array widens once there are more than 256 distinct states")
+def _() -> None:
+    compact = CompactStates(range(256))  # type: ignore[arg-type]
+    assert compact.cells.typecode == "B"
+    compact[0] = 256  # type: ignore[assignment]
+    assert compact.cells.typecode == "H"
+    assert list(compact) == [256, *range(1, 256)]
+
+
+@test("CompactStates: unhashable states raise 'TypeError'")
+def _() -> None:
+    with raises(TypeError):
+        CompactStates([[]])  # type: ignore[list-item]
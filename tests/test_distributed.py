@@ -0,0 +1,109 @@
+"""Tests evolving an automaton as tiles owned by separate worker processes."""
+
+import random
+
+from ward import each, raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell, moore_cell
+from glipy.compact import CompactStates
+from glipy.coordinate import Coordinate
+from glipy.distributed import DIRECTIONS, DistributedAutomaton, Tile, TileSetup, split
+from glipy.state import ConwayState
+
+
+def soup(width: int, height: int, seed: int) -> Automaton:
+    """Build a Conway automaton with randomly placed live cells."""
+    rng = random.Random(seed)
+    states = [
+        [ConwayState(alive=rng.randint(0, 1) == 1) for _ in range(width)] for _ in range(height)
+    ]
+    return Automaton(MooreCell, states, width - 1, height - 1)
+
+
+def alive(automaton: Automaton) -> list[list[bool]]:
+    """Return whether each cell of an automaton is alive."""
+    return [[data.state.alive for data in row] for row in automaton]
+
+
+@test("split: lengths are divided into nearly equal parts")
+def _() -> None:
+    assert split(10, 3) == [(0, 4), (4, 3), (7, 3)]
+    assert split(4, 4) == [(0, 1), (1, 1), (2, 1), (3, 1)]
+
+
+@test("DistributedAutomaton: tiles evolve exactly like a single automaton ({family}, {tiles})")
+def _(
+    family: str = each("AF_INET", "AF_UNIX", "AF_INET"),
+    tiles: tuple[int, int] = each((2, 2), (3, 1), (1, 1)),
+) -> None:
+    expected = soup(13, 9, seed=3)
+    with DistributedAutomaton(expected, tiles, family=family) as distributed:
+        for generations in (1, 4):
+            distributed.evolve(generations)
+            for _ in range(generations):
+                expected.evolve()
+            snapshot = distributed.gather()
+            assert alive(snapshot) == alive(expected)
+            assert distributed.population == expected.population
+            assert snapshot.generation == distributed.generation == expected.generation
+
+
+@test("DistributedAutomaton: rejects bad tilings, non-torus edges, and far-reaching neighborhoods")
+def _() -> None:
+    with raises(ValueError):
+        DistributedAutomaton(soup(3, 3, seed=1), (4, 1))
+    plane: Automaton = Automaton(MooreCell, ConwayState(alive=False), 9, 9, topology="plane")
+    with raises(ValueError):
+        DistributedAutomaton(plane, (2, 2))
+    far: Automaton = Automaton(moore_cell(2), ConwayState(alive=False), 9, 9)
+    with raises(ValueError):
+        DistributedAutomaton(far, (2, 2))
+
+
+@test("DistributedAutomaton: spawned workers follow the coordinator's rule")
+def _() -> None:
+    birth_rules = ConwayState.birth_rules
+    try:
+        ConwayState.birth_rules = [3, 6]
+        expected = soup(12, 12, seed=5)
+        with DistributedAutomaton(expected, (2, 2), start_method="spawn") as distributed:
+            distributed.evolve(4)
+            for _ in range(4):
+                expected.evolve()
+            assert alive(distributed.gather()) == alive(expected)
+    finally:
+        ConwayState.birth_rules = birth_rules
+
+
+class BrokenPeer:
+    """A connection to a neighbor that has nothing to send, and can't be sent to."""
+
+    def send(self, edges: object) -> None:  # noqa: ARG002
+        """Fail to send."""
+        msg = "broken pipe"
+        raise OSError(msg)
+
+    def recv(self) -> list:
+        """Receive no edges."""
+        return []
+
+
+@test("Tile: an edge that can't be sent raises, rather than being lost")
+def _() -> None:
+    states = CompactStates([ConwayState(alive=False)] * 4)
+    setup = TileSetup(
+        0,
+        MooreCell,
+        Coordinate(0, 0),
+        2,
+        2,
+        states,
+        {},
+        dict.fromkeys(DIRECTIONS, 1),
+        None,
+    )
+    tile = Tile(setup)
+    tile.peers[1] = BrokenPeer()  # type: ignore[assignment]
+    with raises(OSError):
+        tile.exchange()
@@ -0,0 +1,95 @@
+"""Tests evolving elementary (one dimensional) automata."""
+
+import io
+import random
+
+from ward import each, raises, test
+
+from glipy.elementary import ElementaryAutomaton, pack, unpack
+from glipy.image import write_pgm
+
+
+def reference(rule: int, cells: bytes, boundary: str, edge: int) -> bytes:
+    """Evolve a row once, one cell at a time."""
+    width = len(cells)
+    wrap = boundary == "wrap"
+    result = []
+    for x in range(width):
+        left = cells[x - 1] if x > 0 or wrap else edge
+        right = cells[(x + 1) % width] if x < width - 1 or wrap else edge
+        result.append(rule >> (4 * left + 2 * cells[x] + right) & 1)
+    return bytes(result)
+
+
+@test("pack/unpack: rows of cells round-trip through integers, with cell 0 as bit 0")
+def _() -> None:
+    cells = bytes([1, 0, 0, 1, 1, 0, 0, 0])
+    assert pack(cells) == 0b11001  # noqa: PLR2004
+    assert unpack(pack(cells), len(cells)) == cells
+
+
+@test("ElementaryAutomaton: every rule evolves like a cell by cell reference ({boundary}, {edge})")
+def _(boundary: str = each("wrap", "fixed", "fixed"), edge: int = each(0, 0, 1)) -> None:
+    rng = random.Random(7)
+    for rule in range(256):
+        cells = rng.randbytes(29).translate(bytes(range(2)) * 128)
+        automaton = ElementaryAutomaton(rule, len(cells), cells, boundary=boundary, edge=edge)
+        for _ in range(4):
+            cells = reference(rule, cells, boundary, edge)
+            automaton.evolve()
+            assert automaton.cells == cells, rule
+        assert automaton.generation == 4  # noqa: PLR2004
+
+
+@test("ElementaryAutomaton: rule 90 draws a Sierpinski triangle from a single cell")
+def _() -> None:
+    automaton = ElementaryAutomaton(90, 15)
+    assert automaton.population == 1
+    diagram = automaton.spacetime(4)
+    rows = [
+        bytes(row).translate(bytes.maketrans(b"\0\1", b".#")) for row in diagram.codes.tolist()
+    ]
+    assert rows == [
+        b".......#.......",
+        b"......#.#......",
+        b".....#...#.....",
+        b"....#.#.#.#....",
+        b"...#.......#...",
+    ]
+    assert automaton.generation == 4  # noqa: PLR2004
+    assert (diagram.xmax, diagram.ymax) == (14, 4)
+
+    stream = io.BytesIO()
+    write_pgm(diagram, stream)  # type: ignore[arg-type]
+    assert stream.getvalue().startswith(b"P5\n15 5\n255\n")
+    assert len(stream.getvalue()) == len(b"P5\n15 5\n255\n") + 15 * 5
+
+
+@test("ElementaryAutomaton: evolving many generations at once matches evolving one at a time")
+def _() -> None:
+    cells = random.Random(3).randbytes(500).translate(bytes(range(2)) * 128)
+    once = ElementaryAutomaton(110, 500, cells)
+    stepped = ElementaryAutomaton(110, 500, cells)
+    once.evolve(50)
+    for _ in range(50):
+        stepped.evolve()
+    assert once.row == stepped.row
+    assert once.generation == stepped.generation
+
+
+@test("ElementaryAutomaton: cells can be read and written, and bad parameters raise")
+def _() -> None:
+    automaton = ElementaryAutomaton(30, 8, bytes(8))
+    automaton[3] = 1
+    automaton[7] = 1
+    automaton[7] = 0
+    assert (automaton[3], automaton[7]) == (1, 0)
+    assert automaton.cells == bytes([0, 0, 0, 1, 0, 0, 0, 0])
+    with raises(IndexError):
+        automaton[8]
+    for kwargs in ({"rule": 256}, {"width": 0}, {"boundary": "reflect"}, {"edge": 2}):
+        arguments = {"rule": 30, "width": 8, **kwargs}
+        with raises(ValueError):
+            ElementaryAutomaton(**arguments)  # type: ignore[arg-type]
+    with raises(ValueError):
+        ElementaryAutomaton(30, 8, bytes(7))
@@ -0,0 +1,143 @@
+"""Tests engines against the per-cell change_state path they replace."""
+
+import random
+
+from ward import test
+
+from glipy import from_conway_rle
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell, moore_cell, neumann_cell
+from glipy.coordinate import Coordinate
+from glipy.rule import parse_hensel
+from glipy.state import ConwayState, GenerationsState, IsotropicState, LargerThanLifeState
+
+# The chance of a random cell starting alive
+DENSITY = 0.35
+
+
+def evolve_per_cell(automaton: Automaton) -> list[list[GenerationsState]]:
+    """Evolve a copy of an automaton's states by calling change_state for every cell."""
+    matrix = automaton.matrix
+    return [
+        [
+            data.state.change_state(
+                [
+                    matrix[nc.y][nc.x].state
+                    for nc in automaton.cell_type(Coordinate(x, y)).get_neighbors(
+                        automaton.max_coord,
+                    )
+                ],
+            )
+            for x, data in enumerate(row)
+        ]
+        for y, row in enumerate(matrix)
+    ]
+
+
+@test("GenerationsEngine: evolves Star Wars (B2/S345/C4) exactly like change_state")
+def _() -> None:
+    rule = (
+        GenerationsState.birth_rules,
+        GenerationsState.survival_rules,
+        GenerationsState.state_count,
+    )
+    GenerationsState.set_rule([2], [3, 4, 5], 4)
+    try:
+        rng = random.Random(4)
+        states = [[GenerationsState(rng.randint(0, 3)) for _ in range(15)] for _ in range(11)]
+        automaton: Automaton = Automaton(MooreCell, states, 14, 10)
+        for _ in range(6):
+            expected = evolve_per_cell(automaton)
+            automaton.evolve()
+            assert [[d.state for d in row] for row in automaton] == expected
+    finally:
+        GenerationsState.set_rule(*rule)
+
+
+@test("from_conway_rle: multi-state RLE builds a GenerationsState automaton")
+def _() -> None:
+    rule = (
+        GenerationsState.birth_rules,
+        GenerationsState.survival_rules,
+        GenerationsState.state_count,
+    )
+    try:
+        automaton = from_conway_rle("x = 4, y = 2, rule = B2/S/C3\n.AB$2A!")
+        values = [[d.state.value for d in row] for row in automaton]
+        assert values == [[0, 1, 2, 0], [1, 1, 0, 0]]
+        assert len(GenerationsState.colors) == GenerationsState.state_count
+    finally:
+        GenerationsState.set_rule(*rule)
+
+
+@test("LargerThanLifeEngine: evolves square and diamond neighborhoods exactly like change_state")
+def _() -> None:
+    rule = (
+        LargerThanLifeState.birth_rules,
+        LargerThanLifeState.survival_rules,
+        LargerThanLifeState.state_count,
+        LargerThanLifeState.middle,
+    )
+    try:
+        for cell_type, middle in ((moore_cell(2), True), (neumann_cell(3), False)):
+            LargerThanLifeState.set_rule([4, 5, 6], [3, 4, 5, 6, 7], 3)
+            LargerThanLifeState.middle = middle
+            rng = random.Random(9)
+            states = [[LargerThanLifeState(rng.randint(0, 2)) for _ in range(9)] for _ in range(8)]
+            automaton: Automaton = Automaton(cell_type, states, 8, 7)
+            for _ in range(4):
+                expected = evolve_per_cell(automaton)
+                automaton.evolve()
+                assert [[d.state for d in row] for row in automaton] == expected
+    finally:
+        LargerThanLifeState.set_rule(*rule[:3])
+        LargerThanLifeState.middle = rule[3]
+
+
+@test("LargerThanLifeEngine: large neighborhoods never build neighbor lists")
+def _() -> None:
+    automaton: Automaton = Automaton(moore_cell(10), LargerThanLifeState(0), 29, 29)
+    automaton.set_state(Coordinate(3, 3), LargerThanLifeState(1))
+    automaton.evolve()
+    assert all(not data.neighbors for row in automaton for data in row)
+
+
+@test("IsotropicEngine: evolves B2-a/S12 exactly like change_state")
+def _() -> None:
+    rule = (IsotropicState.birth_rules, IsotropicState.survival_rules)
+    try:
+        IsotropicState.birth_rules = parse_hensel("2-a")
+        IsotropicState.survival_rules = parse_hensel("12")
+        rng = random.Random(3)
+        states = [[IsotropicState(rng.random() < DENSITY) for _ in range(12)] for _ in range(10)]
+        automaton: Automaton = Automaton(MooreCell, states, 11, 9)
+        for _ in range(5):
+            expected = evolve_per_cell(automaton)
+            automaton.evolve()
+            assert [[d.state for d in row] for row in automaton] == expected
+    finally:
+        IsotropicState.birth_rules, IsotropicState.survival_rules = rule
+
+
+@test("IsotropicEngine: the default rule (B3/S23) evolves like ConwayState")
+def _() -> None:
+    rng = random.Random(5)
+    alive = [[rng.random() < DENSITY for _ in range(10)] for _ in range(10)]
+    conway: Automaton = Automaton(
+        MooreCell,
+        [[ConwayState(a) for a in row] for row in alive],
+        9,
+        9,
+    )
+    isotropic: Automaton = Automaton(
+        MooreCell,
+        [[IsotropicState(a) for a in row] for row in alive],
+        9,
+        9,
+    )
+    for _ in range(5):
+        conway.evolve()
+        isotropic.evolve()
+        assert [[d.state.alive for d in row] for row in conway] == [
+            [d.state.alive for d in row] for row in isotropic
+        ]
@@ -0,0 +1,81 @@
+"""Tests evolving patterns on boards that grow and shrink with them."""
+
+from ward import each, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.coordinate import Coordinate
+from glipy.growing import MIN_SIZE, GrowingAutomaton
+from glipy.state import ConwayState
+
+ALIVE = ConwayState(alive=True)
+# An R-pentomino, which grows for over a thousand generations, firing gliders
+R_PENTOMINO = ((1, 0), (2, 0), (0, 1), (1, 1), (1, 2))
+GLIDER = ((1, 0), (2, 1), (0, 2), (1, 2), (2, 2))
+
+
+@test("GrowingAutomaton: evolves like a torus large enough to never wrap ({mode})")
+def _(mode: str = each("compiled", "compact")) -> None:
+    growing = GrowingAutomaton(MooreCell, ConwayState, compact=mode == "compact")
+    torus: Automaton = Automaton(MooreCell, ConwayState(alive=False), 199, 199)
+    for x, y in R_PENTOMINO:
+        growing.set_state(Coordinate(x, y), ALIVE)
+        torus.set_state(Coordinate(x + 100, y + 100), ALIVE)
+    assert torus.compile()
+    if mode == "compiled":
+        assert growing.compile()
+
+    sizes = set()
+    for _ in range(120):
+        growing.evolve()
+        torus.evolve()
+        sizes.add((growing.xmax, growing.ymax))
+    assert growing.generation == torus.generation
+    assert growing.population == torus.population
+    assert growing.bounding_box is not None
+    start, end = growing.bounding_box
+    offset = Coordinate(100, 100)
+    assert growing.read(start, end) == torus.read(start + offset, end + offset)
+    # Growing by doubling only reallocates the board a few times
+    assert 1 < len(sizes) < 12  # noqa: PLR2004
+
+
+@test("GrowingAutomaton: coordinates stay the same across reallocations")
+def _() -> None:
+    growing = GrowingAutomaton(MooreCell, ConwayState)
+    for x, y in GLIDER:
+        growing.set_state(Coordinate(x, y), ALIVE)
+    origins = set()
+    for _ in range(200):
+        growing.evolve()
+        origins.add(growing.origin)
+    assert len(origins) > 1
+    # A glider moves by one cell diagonally every 4 generations
+    for x, y in GLIDER:
+        assert growing.get_state(Coordinate(x + 50, y + 50)) == ALIVE
+    assert growing.population == len(GLIDER)
+    assert growing.xmax + 1 == MIN_SIZE
+
+
+@test("GrowingAutomaton: writing far away grows the board, and it shrinks once cells die")
+def _() -> None:
+    growing = GrowingAutomaton(MooreCell, ConwayState)
+    block: Automaton = Automaton(MooreCell, ALIVE, 1, 1)
+    growing.paste(block, Coordinate(-150, 40))
+    growing.set_state(Coordinate(250, -20), ALIVE)
+    assert growing.bounding_box == (Coordinate(-150, -20), Coordinate(250, 41))
+    assert growing.xmax > 400  # noqa: PLR2004
+    assert growing.get_state(Coordinate(-149, 41)) == ALIVE
+    assert growing.get_state(Coordinate(10_000, 10_000)) == ConwayState(alive=False)
+
+    # The lone cell dies, leaving the block (a still life)
+    growing.evolve()
+    growing.evolve()
+    assert growing.population == 4  # noqa: PLR2004
+    assert growing.xmax + 1 == MIN_SIZE
+    assert growing.read(Coordinate(-151, 39), Coordinate(-148, 42)) == [
+        [ConwayState(alive=False)] * 4,
+        [ConwayState(alive=False), ALIVE, ALIVE, ConwayState(alive=False)],
+        [ConwayState(alive=False), ALIVE, ALIVE, ConwayState(alive=False)],
+        [ConwayState(alive=False)] * 4,
+    ]
@@ -0,0 +1,136 @@
+"""Tests recording, rewinding and seeking an automaton's generations."""
+
+from __future__ import annotations
+
+from ward import each, raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.color import Color
+from glipy.coordinate import Coordinate
+from glipy.history import History
+from glipy.soup import fill_soup
+from glipy.state import ConwayState
+
+GENERATIONS = 20
+
+
+class CounterState:
+    """A state that counts its generations, ignoring its neighbors."""
+
+    colors = (Color("#000000"),)
+    color = colors[0]
+
+    def __init__(self, value: int = 0) -> None:
+        """Initialize a CounterState."""
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by value."""
+        return isinstance(other, CounterState) and self.value == other.value
+
+    def __hash__(self) -> int:
+        """Hash by value."""
+        return hash(self.value)
+
+    def change_state(self, neighbors: list[CounterState]) -> CounterState:  # noqa: ARG002
+        """Count one more generation."""
+        return CounterState(self.value + 1)
+
+
+def board(mode: str) -> Automaton:
+    """Create a board filled with a soup, stored or evolved in a given way."""
+    automaton: Automaton = Automaton(
+        MooreCell,
+        ConwayState(alive=False),
+        31,
+        23,
+        compact=mode == "compact",
+    )
+    fill_soup(automaton, seed=5)
+    if mode == "compiled":
+        assert automaton.compile()
+    return automaton
+
+
+def read_all(automaton: Automaton) -> list:
+    """Read every state."""
+    return automaton.read(Coordinate(0, 0), automaton.max_coord)
+
+
+@test("History: seeking restores each recorded generation ({mode}, every {interval})")
+def _(
+    mode: str = each("matrix", "compact", "compiled", "matrix"),
+    interval: int = each(64, 64, 64, 3),
+) -> None:
+    automaton = board(mode)
+    history = History(automaton, keyframe_interval=interval)
+    boards = [read_all(automaton)]
+    for _ in range(GENERATIONS):
+        automaton.evolve()
+        boards.append(read_all(automaton))
+    assert history.generations == range(GENERATIONS + 1)
+
+    for generation in (7, 0, GENERATIONS, 13):
+        history.seek(generation)
+        assert automaton.generation == generation
+        assert read_all(automaton) == boards[generation]
+        assert automaton.population == sum(s.alive for row in boards[generation] for s in row)
+    history.rewind(4)
+    assert automaton.generation == 13 - 4
+    assert read_all(automaton) == boards[13 - 4]
+    assert list(history.get(2)) == [state for row in boards[2] for state in row]
+
+
+@test("History: evolving after a rewind replaces the later generations")
+def _() -> None:
+    automaton = board("compiled")
+    history = History(automaton, keyframe_interval=4)
+    for _ in range(10):
+        automaton.evolve()
+    history.rewind(5)
+    automaton.set_state(Coordinate(0, 0), ConwayState(alive=True))
+    history.record()
+    edited = read_all(automaton)
+    automaton.evolve()
+    evolved = read_all(automaton)
+    assert history.generations == range(7)
+
+    history.seek(5)
+    assert read_all(automaton) == edited
+    history.seek(6)
+    assert read_all(automaton) == evolved
+
+
+@test("History: the oldest generations are evicted to stay within the memory budget")
+def _() -> None:
+    automaton = board("compact")
+    history = History(automaton, max_bytes=4096, keyframe_interval=8)
+    for _ in range(60):
+        automaton.evolve()
+        assert history.nbytes <= 4096  # noqa: PLR2004
+    generations = history.generations
+    assert generations.start > 0
+    assert generations.stop == 61  # noqa: PLR2004
+    assert automaton.history is history
+    with raises(ValueError):
+        history.seek(0)
+    current = read_all(automaton)
+    history.seek(generations.start)
+    history.seek(60)
+    assert read_all(automaton) == current
+
+
+@test("History: boards with many states are recorded as wider indexes")
+def _() -> None:
+    states = [[CounterState(x + y * 20) for x in range(20)] for y in range(20)]
+    automaton: Automaton = Automaton(MooreCell, states, 19, 19, compact=True)
+    history = History(automaton)
+    automaton.evolve()
+    automaton.evolve()
+    assert len(history.palette) > 256  # noqa: PLR2004
+    history.seek(0)
+    assert read_all(automaton) == states
+    history.detach()
+    automaton.evolve()
+    assert history.generations == range(3)
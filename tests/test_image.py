@@ -0,0 +1,192 @@
+"""Tests writing generations as images and animations."""
+
+import io
+import struct
+import zlib
+
+from ward import raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.coordinate import Coordinate
+from glipy.image import GIF_COLORS, GifWriter, write_pgm, write_png, write_ppm
+from glipy.state import ConwayState, GenerationsState
+
+from .test_cli import preserved_rules
+
+
+def blinker() -> Automaton:
+    """Build a 5x4 automaton holding a horizontal blinker."""
+    automaton: Automaton = Automaton(MooreCell, ConwayState(alive=False), 4, 3)
+    for x in range(1, 4):
+        automaton.set_state(Coordinate(x, 1), ConwayState(alive=True))
+    return automaton
+
+
+def pixels(automaton: Automaton, scale: int = 1) -> list[tuple[int, int, int]]:
+    """Return the color of each pixel a scaled image of an automaton should have."""
+    colors = []
+    for row in automaton:
+        line = []
+        for data in row:
+            color = data.state.color
+            line += [(int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))] * scale
+        colors += line * scale
+    return colors
+
+
+def read_png(data: bytes) -> tuple[int, int, list[tuple[int, int, int]]]:
+    """Decode an indexed color PNG image written without filters."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks: dict[bytes, bytes] = {}
+    position = 8
+    while position < len(data):
+        (length,) = struct.unpack_from(">I", data, position)
+        kind = data[position + 4 : position + 8]
+        body = data[position + 8 : position + 8 + length]
+        (crc,) = struct.unpack_from(">I", data, position + 8 + length)
+        assert crc == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        position += 12 + length
+    width, height = struct.unpack_from(">II", chunks[b"IHDR"])
+    raw = zlib.decompress(chunks[b"IDAT"])
+    palette = chunks[b"PLTE"]
+    colors = []
+    for y in range(height):
+        line = raw[y * (width + 1) : (y + 1) * (width + 1)]
+        assert line[0] == 0
+        colors += [tuple(palette[3 * i : 3 * i + 3]) for i in line[1:]]
+    return width, height, colors
+
+
+def read_gif(data: bytes) -> list[list[tuple[int, int, int]]]:
+    """Decode every frame of a GIF animation with a straightforward LZW decoder."""
+    assert data[:6] == b"GIF89a"
+    width, height, packed = struct.unpack_from("<HHB", data, 6)
+    position = 13
+    table_size = 3 << ((packed & 7) + 1)
+    global_table = data[position : position + table_size]
+    position += table_size
+    frames = []
+    while data[position : position + 1] != b";":
+        if data[position : position + 1] == b"!":
+            position += 2
+            while data[position]:
+                position += data[position] + 1
+            position += 1
+            continue
+        assert data[position : position + 1] == b","
+        *_, frame_packed = struct.unpack_from("<HHHHB", data, position + 1)
+        position += 10
+        table = global_table
+        if frame_packed & 0x80:
+            size = 3 << ((frame_packed & 7) + 1)
+            table = data[position : position + size]
+            position += size
+        code_size = data[position]
+        position += 1
+        stream = bytearray()
+        while data[position]:
+            stream += data[position + 1 : position + 1 + data[position]]
+            position += data[position] + 1
+        position += 1
+        indexes = lzw_decode(bytes(stream), code_size)
+        assert len(indexes) == width * height
+        frames.append([tuple(table[3 * i : 3 * i + 3]) for i in indexes])
+    return frames
+
+
+def lzw_decode(stream: bytes, code_size: int) -> list[int]:
+    """Decode GIF LZW data, reading variable width codes least significant bit first."""
+    clear, end = 1 << code_size, (1 << code_size) + 1
+    bits = int.from_bytes(stream, "little")
+    position = 0
+    width = code_size + 1
+    table: list[list[int]] = []
+    previous: list[int] | None = None
+    out: list[int] = []
+    while True:
+        code = (bits >> position) & ((1 << width) - 1)
+        position += width
+        if code == clear:
+            table = [[i] for i in range(clear)] + [[], []]
+            width = code_size + 1
+            previous = None
+            continue
+        if code == end:
+            return out
+        if previous is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            table.append(previous + entry[:1])
+            if len(table) == 1 << width and width < 12:  # noqa: PLR2004
+                width += 1
+        out += entry
+        previous = entry
+
+
+@test("write_ppm and write_pgm: images hold each cell's color, scaled")
+def _() -> None:
+    automaton = blinker()
+    stream = io.BytesIO()
+    write_ppm(automaton, stream, scale=3)
+    header = b"P6\n15 12\n255\n"
+    data = stream.getvalue()
+    assert data.startswith(header)
+    body = data[len(header) :]
+    assert [tuple(body[i : i + 3]) for i in range(0, len(body), 3)] == pixels(automaton, 3)
+
+    stream = io.BytesIO()
+    write_pgm(automaton, stream)
+    header = b"P5\n5 4\n255\n"
+    assert stream.getvalue().startswith(header)
+    gray = stream.getvalue()[len(header) :]
+    expected = [round(0.299 * r + 0.587 * g + 0.114 * b) for r, g, b in pixels(automaton)]
+    assert list(gray) == expected
+
+
+@test("write_png: images decode to each cell's color, across many IDAT chunks")
+def _() -> None:
+    automaton = blinker()
+    stream = io.BytesIO()
+    write_png(automaton, stream, scale=2)
+    assert read_png(stream.getvalue()) == (10, 8, pixels(automaton, 2))
+
+    big: Automaton = Automaton(MooreCell, ConwayState(alive=False), 299, 299)
+    big.set_state(Coordinate(7, 9), ConwayState(alive=True))
+    stream = io.BytesIO()
+    write_png(big, stream, scale=2, level=0)
+    assert stream.getvalue().count(b"IDAT") > 1
+    assert read_png(stream.getvalue()) == (600, 600, pixels(big, 2))
+
+
+@test("GifWriter: every frame of an animation decodes to its generation")
+def _() -> None:
+    automaton = blinker()
+    stream = io.BytesIO()
+    expected = []
+    with preserved_rules(), GifWriter(stream, scale=5, delay=20) as writer:
+        for _ in range(3):
+            writer.write(automaton)
+            expected.append(pixels(automaton, 5))
+            automaton.evolve()
+        automaton.colors = ["#102030", "#405060"]
+        writer.write(automaton)
+        expected.append(pixels(automaton, 5))
+    assert writer.frames == len(expected)
+    assert read_gif(stream.getvalue()) == expected
+
+
+@test("GifWriter: frames must match the first frame's size and fit the palette")
+def _() -> None:
+    with GifWriter(io.BytesIO()) as writer:
+        writer.write(blinker())
+        with raises(ValueError):
+            writer.write(Automaton(MooreCell, ConwayState(alive=False), 2, 2))
+
+    with preserved_rules():
+        GenerationsState.set_rule([2], [], GIF_COLORS + 1)
+        many: Automaton = Automaton(MooreCell, GenerationsState(), 2, 2)
+        with raises(ValueError):
+            GifWriter(io.BytesIO()).write(many)
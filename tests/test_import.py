@@ -0,0 +1,39 @@
+"""Tests the cost of importing glipy."""
+
+import subprocess
+import sys
+
+from ward import test
+
+# The most time 'import glipy' may take, in microseconds (as reported by -X importtime)
+IMPORT_BUDGET_US = 75_000
+
+# Modules that must only be imported once they're used
+DEFERRED_MODULES = ("numpy", "requests", "importlib.metadata", "glipy.engine", "glipy.table")
+
+
+def import_glipy(code: str = "") -> subprocess.CompletedProcess:
+    """Import glipy in a fresh interpreter, reporting import times on stderr."""
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import glipy\n{code}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+@test("import glipy: heavy dependencies are deferred until they're needed")
+def _() -> None:
+    result = import_glipy(f"import sys\nprint(sorted(set(sys.modules) & set({DEFERRED_MODULES})))")
+    assert result.stdout.strip() == "[]"
+
+
+@test(f"import glipy: importing takes less than {IMPORT_BUDGET_US // 1000}ms")
+def _() -> None:
+    # Take the best of a few runs, so a busy machine doesn't fail the test
+    times = []
+    for _ in range(3):
+        line = import_glipy().stderr.strip().splitlines()[-1]
+        assert line.endswith("| glipy")
+        times.append(int(line.split("|")[1]))
+    assert min(times) < IMPORT_BUDGET_US
@@ -0,0 +1,96 @@
+"""Tests evolving automata stored in memory-mapped files."""
+
+import io
+import random
+import tempfile
+from pathlib import Path
+
+from ward import each, raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell, moore_cell
+from glipy.coordinate import Coordinate
+from glipy.image import write_png
+from glipy.mapped import MappedAutomaton
+from glipy.state import ConwayState, GenerationsState, LargerThanLifeState
+
+from .test_table import CyclicState
+
+
+def soup(cell_type: type, states: list, width: int, height: int) -> Automaton:
+    """Build an automaton with random states."""
+    rng = random.Random(9)
+    grid = [[rng.choice(states) for _ in range(width)] for _ in range(height)]
+    return Automaton(cell_type, grid, width - 1, height - 1)
+
+
+for name, cell_type, states in (
+    ("ConwayState", MooreCell, [ConwayState(alive=False), ConwayState(alive=True)]),
+    ("GenerationsState", MooreCell, [GenerationsState(value) for value in range(3)]),
+    ("LargerThanLifeState", moore_cell(2), [LargerThanLifeState(value) for value in range(2)]),
+    ("CyclicState", MooreCell, [CyclicState(value) for value in range(3)]),
+):
+
+    @test("MappedAutomaton: evolves {name} in bands exactly like an Automaton ({band_rows} rows)")
+    def _(
+        name: str = name,
+        cell_type: type = cell_type,
+        states: list = states,
+        band_rows: int = each(1, 4, 100),
+    ) -> None:
+        expected = soup(cell_type, states, 17, 13)
+        expected.compile()
+        with MappedAutomaton(
+            cell_type,
+            states[0],
+            16,
+            12,
+            seeds=states,
+            band_rows=band_rows,
+        ) as mapped:
+            mapped.paste(expected, Coordinate(0, 0))
+            for _ in range(4):
+                assert mapped.read(Coordinate(0, 0), Coordinate(16, 12)) == expected.read(
+                    Coordinate(0, 0),
+                    Coordinate(16, 12),
+                )
+                assert mapped.population == expected.population, name
+                mapped.evolve()
+                expected.evolve()
+            assert mapped.generation == expected.generation
+
+
+@test("MappedAutomaton: cells live in files, which are deleted on close")
+def _() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        mapped = MappedAutomaton(
+            MooreCell,
+            ConwayState(alive=False),
+            299,
+            199,
+            seeds=[ConwayState(alive=True)],
+            directory=directory,
+        )
+        assert all(path.stat().st_size == 300 * 200 for path in mapped.paths)
+        for x in range(3):
+            mapped.set_state(Coordinate(x, 5), ConwayState(alive=True))
+        mapped.evolve()
+        assert mapped.get_state(Coordinate(1, 4)) == ConwayState(alive=True)
+        assert mapped.get_state(Coordinate(0, 5)) == ConwayState(alive=False)
+        assert mapped.population == 3  # noqa: PLR2004
+
+        # Images are written straight from the mapped codes
+        stream = io.BytesIO()
+        write_png(mapped, stream)
+        assert stream.getvalue().startswith(b"\x89PNG")
+
+        mapped.close()
+        assert list(Path(directory).iterdir()) == []
+
+
+@test("MappedAutomaton: rejects states and cell types that no engine can handle")
+def _() -> None:
+    with raises(TypeError):
+        MappedAutomaton(type("Plain", (), {}), ConwayState(alive=False), 9, 9)
+    with MappedAutomaton(MooreCell, ConwayState(alive=False), 9, 9) as mapped, raises(ValueError):
+        mapped.set_state(Coordinate(0, 0), CyclicState(1))
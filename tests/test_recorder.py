@@ -0,0 +1,127 @@
+"""Tests recording the statistics of every generation."""
+
+import io
+
+from ward import each, raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.coordinate import Coordinate
+from glipy.recorder import COLUMNS, Recorder, read_binary
+from glipy.soup import fill_soup
+from glipy.state import ConwayState, GenerationsState
+
+
+def board(mode: str) -> Automaton:
+    """Create a board filled with a soup, stored or evolved in a given way."""
+    automaton: Automaton = Automaton(
+        MooreCell,
+        ConwayState(alive=False),
+        23,
+        17,
+        compact=mode == "compact",
+    )
+    fill_soup(automaton, seed=9)
+    if mode == "compiled":
+        assert automaton.compile()
+    return automaton
+
+
+def live(automaton: Automaton) -> set[Coordinate]:
+    """Find every live cell."""
+    rows = automaton.read(Coordinate(0, 0), automaton.max_coord)
+    return {
+        Coordinate(x, y)
+        for y, row in enumerate(rows)
+        for x, state in enumerate(row)
+        if state.alive
+    }
+
+
+@test("Automaton: births and deaths count the cells that changed in each generation ({mode})")
+def _(mode: str = each("matrix", "compact", "compiled")) -> None:
+    automaton = board(mode)
+    assert (automaton.births, automaton.deaths) == (0, 0)
+    for _ in range(10):
+        before = live(automaton)
+        automaton.evolve()
+        after = live(automaton)
+        assert automaton.births == len(after - before)
+        assert automaton.deaths == len(before - after)
+
+
+@test("Automaton: dying states of a Generations rule count as live")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, GenerationsState(), 15, 15)
+    for x in range(5, 8):
+        automaton.set_state(Coordinate(x, 7), GenerationsState(1))
+    population = automaton.population
+    automaton.evolve()
+    assert automaton.population == population + automaton.births - automaton.deaths
+    assert automaton.deaths == 0
+
+
+@test("Recorder: the binary format holds every generation's statistics, written in chunks")
+def _() -> None:
+    automaton = board("compiled")
+    stream = io.BytesIO()
+    expected = []
+    with Recorder(automaton, stream, chunk_rows=8) as recorder:
+        for _ in range(20):
+            bounds = automaton.bounding_box
+            assert bounds is not None
+            expected.append(
+                (
+                    automaton.generation,
+                    automaton.population,
+                    automaton.births,
+                    automaton.deaths,
+                    bounds[0].x,
+                    bounds[0].y,
+                    bounds[1].x,
+                    bounds[1].y,
+                ),
+            )
+            automaton.evolve()
+        # Two full chunks have been written so far
+        assert stream.getvalue().count(b"\x08\x00\x00\x00") >= 2  # noqa: PLR2004
+    assert automaton.recorder is None
+    assert recorder.rows == 21  # noqa: PLR2004
+
+    stream.seek(0)
+    columns = read_binary(stream)
+    assert tuple(columns) == COLUMNS
+    rows = list(zip(*columns.values(), strict=True))
+    assert rows[:20] == expected
+    assert rows[20][:2] == (20, automaton.population)
+
+
+@test("Recorder: the CSV format has a header and a line per generation")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, ConwayState(alive=False), 9, 9)
+    for x in range(3, 6):
+        automaton.set_state(Coordinate(x, 4), ConwayState(alive=True))
+    stream = io.BytesIO()
+    recorder = Recorder(automaton, stream, "csv")
+    automaton.evolve()
+    automaton.evolve()
+    recorder.close()
+    automaton.evolve()
+    assert stream.getvalue().decode().splitlines() == [
+        ",".join(COLUMNS),
+        "0,3,0,0,3,4,5,4",
+        "1,3,2,2,4,3,4,5",
+        "2,3,2,2,3,4,5,4",
+    ]
+
+
+@test("Recorder: an invalid format raises 'ValueError', and so does reading a CSV as binary")
+def _() -> None:
+    automaton = board("matrix")
+    with raises(ValueError):
+        Recorder(automaton, io.BytesIO(), "tsv")
+    stream = io.BytesIO()
+    Recorder(automaton, stream, "csv").close()
+    stream.seek(0)
+    with raises(ValueError):
+        read_binary(stream)
@@ -0,0 +1,27 @@
+"""Tests looking up engines by name."""
+
+from ward import raises, test
+
+from glipy.engine import GenerationsEngine, TableEngine
+from glipy.registry import BUILTIN_ENGINES, engine_names, get_engine, register_engine
+
+
+@test("get_engine: built-in engines are imported from their references")
+def _() -> None:
+    assert get_engine("generations") is GenerationsEngine
+    assert get_engine("table") is TableEngine
+
+
+@test("register_engine: engines can be registered as classes or as references")
+def _() -> None:
+    register_engine("test-class", TableEngine)
+    register_engine("test-reference", "glipy.engine:GenerationsEngine")
+    assert get_engine("test-class") is TableEngine
+    assert get_engine("test-reference") is GenerationsEngine
+    assert {"test-class", "test-reference", *BUILTIN_ENGINES} <= set(engine_names())
+
+
+@test("get_engine: unknown names raise 'ValueError'")
+def _() -> None:
+    with raises(ValueError):
+        get_engine("no-such-engine")
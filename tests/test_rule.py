@@ -0,0 +1,78 @@
+"""Tests parsing rulestrings."""
+
+from ward import raises, test
+
+from glipy import parse_rle_header
+from glipy.rule import Rule, format_rule, hensel_classes, parse_rule
+
+
+@test("parse_rule: B/S and S/B notation describe the same Life-like rule")
+def _() -> None:
+    assert parse_rule("B3/S23") == Rule([3], [2, 3], None)
+    assert parse_rule("b3s23") == Rule([3], [2, 3], None)
+    assert parse_rule("23/3") == Rule([3], [2, 3], None)
+
+
+@test("parse_rule: Generations rules keep their state count, and may have empty rules")
+def _() -> None:
+    assert parse_rule("B2/S/C3") == Rule([2], [], 3)
+    assert parse_rule("/2/3") == Rule([2], [], 3)
+    assert parse_rule("345/2/4") == Rule([2], [3, 4, 5], 4)
+
+
+@test("parse_rule: an unrecognized rulestring raises 'ValueError'")
+def _() -> None:
+    with raises(ValueError):
+        parse_rule("Q3/R23")
+
+
+@test("parse_rle_header: reads the state count of a Generations rule")
+def _() -> None:
+    header = parse_rle_header("x = 3, y = 2, rule = B2/S/C3")
+    assert (header.width, header.height, header.state_count) == (3, 2, 3)
+
+
+@test("parse_rule: Larger than Life rules expand their count ranges")
+def _() -> None:
+    rule = parse_rule("R5,C2,M1,S34..58,B34..45,NM")
+    assert rule.birth_rules == list(range(34, 46))
+    assert rule.survival_rules == list(range(34, 59))
+    assert (rule.state_count, rule.radius, rule.middle, rule.neighborhood) == (None, 5, True, "M")
+
+
+@test("parse_rule: Hensel notation expands letters, and '-' excludes them")
+def _() -> None:
+    rule = parse_rule("B2-a/S12")
+    assert rule.isotropic
+    assert rule.birth_rules == ["2c", "2e", "2i", "2k", "2n"]
+    assert rule.survival_rules == ["1c", "1e", "2a", "2c", "2e", "2i", "2k", "2n"]
+
+
+@test("parse_rule: Hensel letters that don't exist for their count raise 'ValueError'")
+def _() -> None:
+    for rulestring in ("B2z3/S23", "B1t/S23", "B0c/S23", "B3/S8e", "B3/S2-z", "B9a/S23"):
+        with raises(ValueError):
+            parse_rule(rulestring)
+    with raises(ValueError):
+        parse_rle_header("x = 3, y = 2, rule = B2z3/S23")
+
+
+@test("hensel_classes: every 9 bit neighborhood belongs to exactly one class")
+def _() -> None:
+    classes = hensel_classes()
+    assert sum(len(neighborhoods) for neighborhoods in classes.values()) == 2**9
+    assert set().union(*classes.values()) == set(range(2**9))
+
+
+@test("format_rule: rulestrings are written back in the notation they were parsed from")
+def _() -> None:
+    for rule in (
+        "B3/S23",
+        "B2/S/C3",
+        "B2-a/S12",
+        "B2ce3aiy/S23",
+        "R5,C2,M1,S34..58,B34..45,NM",
+        "R2,C10,M0,S3..5,B2..2,NN",
+    ):
+        assert format_rule(parse_rule(rule)) == rule
+    assert format_rule(parse_rule("23/3")) == "B3/S23"
@@ -0,0 +1,75 @@
+"""Tests generating random soups."""
+
+from itertools import islice
+
+from ward import each, raises, test
+
+from glipy import random_conway
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell
+from glipy.coordinate import Coordinate
+from glipy.soup import fill_soup, soups
+from glipy.state import ConwayState, IsotropicState
+
+
+def grid(soup: bytes, width: int) -> list[bytes]:
+    """Split a soup into rows."""
+    return [soup[y : y + width] for y in range(0, len(soup), width)]
+
+
+@test("soups: the same seed produces the same soups, and soups only hold 0 or 1")
+def _() -> None:
+    first = list(islice(soups(16, 16, seed=42), 3))
+    assert first == list(islice(soups(16, 16, seed=42), 3))
+    assert first != list(islice(soups(16, 16, seed=43), 3))
+    assert len(set(first)) == len(first)
+    assert all(len(soup) == 16 * 16 and set(soup) <= {0, 1} for soup in first)
+
+
+@test("soups: the share of live cells follows the density ({density})")
+def _(density: float = each(0.0, 0.25, 0.5, 1.0)) -> None:
+    soup = next(soups(200, 200, density=density, seed=1))
+    assert abs(sum(soup) / len(soup) - density) < 0.01  # noqa: PLR2004
+
+
+@test("soups: symmetric soups are unchanged by their symmetries ({symmetry}, {width}x{height})")
+def _(
+    symmetry: str = each("C2", "C4", "D8", "C2"),
+    width: int = each(7, 8, 9, 6),
+    height: int = each(7, 8, 9, 3),
+) -> None:
+    for soup in islice(soups(width, height, symmetry=symmetry, seed=3), 20):
+        rows = grid(soup, width)
+        assert [row[::-1] for row in rows[::-1]] == rows
+        if symmetry != "C2":
+            assert [bytes(row[x] for row in rows[::-1]) for x in range(width)] == rows
+        if symmetry == "D8":
+            assert [row[::-1] for row in rows] == rows
+
+
+@test("soups: invalid parameters raise 'ValueError'")
+def _() -> None:
+    for kwargs in ({"density": 1.5}, {"symmetry": "D4"}, {"width": 0}, {"symmetry": "C4"}):
+        arguments = {"width": 4, "height": 5, **kwargs}
+        with raises(ValueError):
+            soups(**arguments)
+
+
+@test("fill_soup: fills a region with a seeded soup of the given states")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, IsotropicState(alive=False), 9, 9)
+    states = (IsotropicState(alive=False), IsotropicState(alive=True))
+    fill_soup(automaton, Coordinate(2, 3), Coordinate(5, 8), seed=7, states=states)
+    soup = next(soups(4, 6, seed=7))
+    expected = [[IsotropicState(alive=cell == 1) for cell in row] for row in grid(soup, 4)]
+    assert automaton.read(Coordinate(2, 3), Coordinate(5, 8)) == expected
+    assert automaton.population == sum(soup)
+
+
+@test("random_conway: seeded boards are reproducible")
+def _() -> None:
+    first = random_conway(15, 9, seed="soup", density=0.3, symmetry="C2")
+    second = random_conway(15, 9, seed="soup", density=0.3, symmetry="C2")
+    assert [[d.state for d in row] for row in first] == [[d.state for d in row] for row in second]
+    assert first.population == sum(next(soups(16, 10, 0.3, "C2", "soup")))
+    assert isinstance(first.read(Coordinate(0, 0), Coordinate(0, 0))[0][0], ConwayState)
@@ -0,0 +1,167 @@
+"""Tests compiling cell states into transition tables."""
+
+from __future__ import annotations
+
+import random
+
+from ward import raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell, NeumannCell
+from glipy.color import Color
+from glipy.coordinate import Coordinate
+from glipy.state import ConwayState
+from glipy.table import CompileError, TransitionTable, state_limit
+
+
+class CyclicState:
+    """A 3 state rule where a cell advances if 3 or more neighbors are one state ahead."""
+
+    colors = (Color("000000"), Color("FF0000"), Color("00FF00"))
+
+    def __init__(self, value: int = 0) -> None:
+        """Initialize a CyclicState."""
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by value."""
+        return isinstance(other, CyclicState) and self.value == other.value
+
+    def __hash__(self) -> int:
+        """Hash by value."""
+        return hash(self.value)
+
+    @property
+    def color(self) -> Color:
+        """Return the color of this state's value."""
+        return self.colors[self.value]
+
+    @classmethod
+    def set_colors(cls, colors: list[Color]) -> None:
+        """Set the colors for the CellState."""
+        cls.colors = tuple(colors)
+
+    def change_state(self, neighbors: list[CyclicState]) -> CyclicState:
+        """Advance if at least 3 neighbors are one state ahead."""
+        ahead = (self.value + 1) % 3
+        if sum(n.value == ahead for n in neighbors) >= 3:  # noqa: PLR2004
+            return CyclicState(ahead)
+        return CyclicState(self.value)
+
+
+class CoinState(CyclicState):
+    """A state that ignores its neighbors and flips a coin."""
+
+    rng = random.Random(5)
+
+    def change_state(self, neighbors: list[CyclicState]) -> CoinState:  # noqa: ARG002
+        """Pick a random state."""
+        return CoinState(self.rng.randint(0, 2))
+
+
+class RareState(CyclicState):
+    """A state that follows CyclicState's rule, but changes at random once in a long while."""
+
+    deterministic = False
+    rng = random.Random(5)
+
+    def change_state(self, neighbors: list[CyclicState]) -> RareState:
+        """Advance like a CyclicState, or very rarely pick a random state."""
+        if self.rng.random() < 1e-6:  # noqa: PLR2004
+            return RareState(self.rng.randint(0, 2))
+        return RareState(super().change_state(neighbors).value)
+
+
+class TrustedState(CyclicState):
+    """A CyclicState that declares itself deterministic, and counts how often it's probed."""
+
+    deterministic = True
+    calls = 0
+
+    def change_state(self, neighbors: list[CyclicState]) -> TrustedState:
+        """Advance like a CyclicState."""
+        TrustedState.calls += 1
+        return TrustedState(super().change_state(neighbors).value)
+
+
+@test("TransitionTable: compiling discovers every state reachable from the seeds")
+def _() -> None:
+    table = TransitionTable.compile([ConwayState(alive=True)], 8)
+    assert set(table.states) == {ConwayState(alive=False), ConwayState(alive=True)}
+    assert table.table.shape == (2, 9**2)
+
+
+@test("TransitionTable: a random state raises 'CompileError'")
+def _() -> None:
+    for _ in range(20):
+        with raises(CompileError):
+            TransitionTable.compile([CoinState(0)], 8)
+
+
+@test("TransitionTable: a 'deterministic' class attribute overrides probing")
+def _() -> None:
+    # Probing can't tell a state that's only rarely random from a deterministic one
+    with raises(CompileError):
+        TransitionTable.compile([RareState(0)], 8)
+
+    TrustedState.calls = 0
+    trusted = TransitionTable.compile([TrustedState(value) for value in range(3)], 8)
+    assert len(trusted.states) == 3  # noqa: PLR2004
+    # Each of the 45 neighborhoods of 8 cells in 3 states is probed forwards and backwards for
+    # every state, rather than PROBES times
+    assert TrustedState.calls == 2 * 45 * 3
+
+
+class ClockState(CyclicState):
+    """A state that ignores its neighbors and counts to 7, over and over."""
+
+    colors = tuple(Color(f"#0000{value:02X}") for value in range(7))
+
+    def change_state(self, neighbors: list[CyclicState]) -> ClockState:  # noqa: ARG002
+        """Count on by one."""
+        return ClockState((self.value + 1) % 7)
+
+
+@test("TransitionTable: the number of states is capped by the size of the table")
+def _() -> None:
+    assert state_limit(len(MooreCell.neighbors)) == 6  # noqa: PLR2004
+    assert state_limit(len(NeumannCell.neighbors)) == 8  # noqa: PLR2004
+    with raises(CompileError) as error:
+        TransitionTable.compile([ClockState(0)], len(MooreCell.neighbors), max_states=8)
+    assert "More than 6" in str(error.raised)
+    assert len(TransitionTable.compile([ClockState(0)], len(NeumannCell.neighbors)).states) == 7  # noqa: PLR2004
+
+    automaton: Automaton = Automaton(NeumannCell, ClockState(0), 4, 4)
+    assert automaton.compile()
+
+
+@test("Automaton: a compiled automaton evolves exactly like an uncompiled one")
+def _() -> None:
+    rng = random.Random(7)
+    states = [[CyclicState(rng.randint(0, 2)) for _ in range(12)] for _ in range(10)]
+    plain: Automaton = Automaton(MooreCell, states, 11, 9)
+    compiled: Automaton = Automaton(MooreCell, states, 11, 9)
+    assert compiled.compile()
+    for _ in range(5):
+        plain.evolve()
+        compiled.evolve()
+        assert bytes(plain.codes) == bytes(compiled.codes)
+    assert [[d.state for d in row] for row in plain] == [
+        [d.state for d in row] for row in compiled
+    ]
+
+
+@test("Automaton: setting a state the table has never seen falls back to change_state")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, CyclicState(0), 4, 4)
+    assert automaton.compile()
+    automaton.set_state(Coordinate(2, 2), CoinState(1))
+    automaton.evolve()
+    assert automaton.generation == 1
+
+
+@test("Automaton: compiling a non-deterministic state returns False")
+def _() -> None:
+    automaton: Automaton = Automaton(MooreCell, CoinState(0), 4, 4)
+    assert not automaton.compile()
+    automaton.evolve()
@@ -0,0 +1,131 @@
+"""Tests the neighbor maps of each boundary topology, and automata that evolve on them."""
+
+import random
+
+from ward import each, raises, test
+
+from glipy.automaton import Automaton
+from glipy.cell import MooreCell, NeumannCell, moore_cell, neumann_cell
+from glipy.coordinate import Coordinate
+from glipy.rule import parse_hensel
+from glipy.state import ConwayState, GenerationsState, IsotropicState, LargerThanLifeState
+from glipy.topology import TOPOLOGIES, neighbor_map, padding_map
+
+# A board small enough to check by hand: 5 cells wide and 4 tall
+MAX_COORD = Coordinate(4, 3)
+OUTSIDE = 20
+
+
+def position(x: int, y: int) -> int:
+    """Find the position of a cell on the small board, counting row by row."""
+    return y * (MAX_COORD.x + 1) + x
+
+
+@test("neighbor_map: a torus matches the neighbors found by get_neighbors")
+def _() -> None:
+    for cell_type in (MooreCell, NeumannCell, moore_cell(2), neumann_cell(2)):
+        maps = [neighbor_map(offset, MAX_COORD) for offset in cell_type.neighbors]
+        for i, positions in enumerate(zip(*maps, strict=True)):
+            coord = Coordinate(i % 5, i // 5)
+            expected = [position(n.x, n.y) for n in cell_type(coord).get_neighbors(MAX_COORD)]
+            assert list(positions) == expected, cell_type.__name__
+
+
+@test("neighbor_map: dead edges lead past the last cell, and other edges fold back ({topology})")
+def _(
+    topology: str = each("torus", "plane", "cylinder", "klein", "cross"),
+    above: int = each(position(1, 3), OUTSIDE, OUTSIDE, position(3, 3), position(3, 3)),
+    left: int = each(position(4, 1), OUTSIDE, position(4, 1), position(4, 1), position(4, 2)),
+    corner: int = each(position(4, 3), OUTSIDE, OUTSIDE, position(0, 3), position(0, 0)),
+) -> None:
+    # Cell (1, 0) looks past the top edge, cell (0, 1) past the left edge, and cell (0, 0) both
+    assert neighbor_map(Coordinate(0, -1), MAX_COORD, topology)[position(1, 0)] == above
+    assert neighbor_map(Coordinate(-1, 0), MAX_COORD, topology)[position(0, 1)] == left
+    assert neighbor_map(Coordinate(-1, -1), MAX_COORD, topology)[position(0, 0)] == corner
+    # Cells away from the edges see their plain neighbors
+    assert neighbor_map(Coordinate(1, 1), MAX_COORD, topology)[position(2, 1)] == position(3, 2)
+
+
+@test("padding_map: the padded board holds the board, surrounded by its neighbors ({topology})")
+def _(topology: str = each(*TOPOLOGIES)) -> None:
+    padded = padding_map(MAX_COORD, 2, topology)
+    rows = [padded[i : i + 9] for i in range(0, len(padded), 9)]
+    assert [row[2:7] for row in rows[2:6]] == [list(range(y * 5, y * 5 + 5)) for y in range(4)]
+    for offset in (Coordinate(-2, 1), Coordinate(1, -2), Coordinate(2, 2)):
+        expected = neighbor_map(offset, MAX_COORD, topology)
+        found = [rows[y + 2 + offset.y][x + 2 + offset.x] for y in range(4) for x in range(5)]
+        assert found == expected
+
+
+@test("Automaton: a blinker on the top edge of a plane loses the cell past the edge")
+def _() -> None:
+    for topology, population in (("torus", 3), ("plane", 2), ("cylinder", 2), ("klein", 3)):
+        automaton: Automaton = Automaton(
+            MooreCell,
+            ConwayState(alive=False),
+            7,
+            7,
+            topology=topology,
+        )
+        for x in range(2, 5):
+            automaton.set_state(Coordinate(x, 0), ConwayState(alive=True))
+        automaton.evolve()
+        assert automaton.population == population, topology
+
+
+def random_board(state_type: type, rng: random.Random) -> list[list]:
+    """Fill a 13 x 11 board with live or dead states at random."""
+    return [[state_type(rng.random() < 0.35) for _ in range(13)] for _ in range(11)]  # noqa: PLR2004
+
+
+@test("Automaton: engines evolve exactly like change_state on a {topology}")
+def _(topology: str = each(*TOPOLOGIES)) -> None:
+    rule = (IsotropicState.birth_rules, IsotropicState.survival_rules)
+    try:
+        # A rule that tells neighborhoods apart by shape, so one read in the wrong order shows up
+        IsotropicState.birth_rules = parse_hensel("2-a")
+        IsotropicState.survival_rules = parse_hensel("12")
+        boards = (
+            (ConwayState, MooreCell),
+            (IsotropicState, MooreCell),
+            (GenerationsState, NeumannCell),
+            (LargerThanLifeState, moore_cell(2)),
+            (LargerThanLifeState, neumann_cell(2)),
+        )
+        for state_type, cell_type in boards:
+            states = random_board(state_type, random.Random(11))
+            compiled: Automaton = Automaton(cell_type, states, 12, 10, topology=topology)
+            assert compiled.compile()
+            by_cell: Automaton = Automaton(cell_type, states, 12, 10, topology=topology)
+            by_cell.decompile()
+            compact: Automaton = Automaton(
+                cell_type,
+                states,
+                12,
+                10,
+                compact=True,
+                topology=topology,
+            )
+            compact.decompile()
+            for _ in range(6):
+                for automaton in (compiled, by_cell, compact):
+                    automaton.evolve()
+                expected = by_cell.codes.tolist()
+                assert compiled.codes.tolist() == expected, state_type.__name__
+                assert compact.codes.tolist() == expected, state_type.__name__
+    finally:
+        IsotropicState.birth_rules, IsotropicState.survival_rules = rule
+
+
+@test("Automaton: an invalid topology, or one the cell type can't map, raises 'ValueError'")
+def _() -> None:
+    with raises(ValueError):
+        Automaton(MooreCell, ConwayState(), 4, 4, topology="sphere")
+
+    class ListedCell(MooreCell):
+        """A cell that only lists its neighbors through 'get_neighbors'."""
+
+        neighbors = None  # type: ignore[assignment]
+
+    with raises(ValueError):
+        Automaton(ListedCell, ConwayState(), 4, 4, topology="plane")